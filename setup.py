@@ -12,7 +12,7 @@ kwargs = {'author': '',
                  'Topic :: Scientific/Engineering'],
  'description': '',
  'download_url': '',
- 'entry_points': u'[openmdao.component]\nmama.subsystem.Summation=mama.subsystem:Summation\nmama.maneuver.Maneuver=mama.maneuver:Maneuver\nmama.spacecraft.Spacecraft=mama.spacecraft:Spacecraft\nmama.mission.Mission=mama.mission:Mission\nmama.maneuver.Orbit=mama.maneuver:Orbit\nmama.subsystem.Subsystem=mama.subsystem:Subsystem\nmama.mission.Phase=mama.mission:Phase\nmama.spacecraft.Stage=mama.spacecraft:Stage\nmama.subsystems.CargoSubsystem=mama.subsystems:CargoSubsystem\n\n[openmdao.container]\nmama.subsystem.Summation=mama.subsystem:Summation\nmama.maneuver.Maneuver=mama.maneuver:Maneuver\nmama.spacecraft.Spacecraft=mama.spacecraft:Spacecraft\nmama.mission.Mission=mama.mission:Mission\nmama.maneuver.Orbit=mama.maneuver:Orbit\nmama.subsystem.Subsystem=mama.subsystem:Subsystem\nmama.mission.Phase=mama.mission:Phase\nmama.spacecraft.Stage=mama.spacecraft:Stage\nmama.subsystems.CargoSubsystem=mama.subsystems:CargoSubsystem',
+ 'entry_points': u'[openmdao.component]\nmama.subsystem.Summation=mama.subsystem:Summation\nmama.maneuver.Maneuver=mama.maneuver:Maneuver\nmama.spacecraft.Spacecraft=mama.spacecraft:Spacecraft\nmama.mission.Mission=mama.mission:Mission\nmama.maneuver.Orbit=mama.maneuver:Orbit\nmama.subsystem.Subsystem=mama.subsystem:Subsystem\nmama.mission.Phase=mama.mission:Phase\nmama.spacecraft.Stage=mama.spacecraft:Stage\nmama.subsystems.CargoSubsystem=mama.subsystems:CargoSubsystem\n\n[openmdao.container]\nmama.subsystem.Summation=mama.subsystem:Summation\nmama.maneuver.Maneuver=mama.maneuver:Maneuver\nmama.spacecraft.Spacecraft=mama.spacecraft:Spacecraft\nmama.mission.Mission=mama.mission:Mission\nmama.maneuver.Orbit=mama.maneuver:Orbit\nmama.subsystem.Subsystem=mama.subsystem:Subsystem\nmama.mission.Phase=mama.mission:Phase\nmama.spacecraft.Stage=mama.spacecraft:Stage\nmama.subsystems.CargoSubsystem=mama.subsystems:CargoSubsystem\n\n[console_scripts]\nmama_ephemeris=mama.ephemeris:main',
  'include_package_data': True,
  'install_requires': ['openmdao.main'],
  'keywords': ['openmdao'],
@@ -20,7 +20,8 @@ kwargs = {'author': '',
  'maintainer': '',
  'maintainer_email': '',
  'name': 'mama',
- 'package_data': {'mama': ['sphinx_build/html/genindex.html',
+ 'package_data': {'mama': ['data/gravloss.npy',
+                           'sphinx_build/html/genindex.html',
                            'sphinx_build/html/srcdocs.html',
                            'sphinx_build/html/pkgdocs.html',
                            'sphinx_build/html/index.html',
@@ -76,6 +77,30 @@ kwargs = {'author': '',
                            'test/__init__.py',
                            'test/test_SKB00.py',
                            'test/test_SKB92.py',
+                           'test/test_dvcache.py',
+                           'test/test_kepler.py',
+                           'test/test_lambert.py',
+                           'test/test_ephemeris.py',
+                           'test/test_aerocapture.py',
+                           'test/test_transfer.py',
+                           'test/test_lowthrust.py',
+                           'test/test_j2.py',
+                           'test/test_flyby.py',
+                           'test/test_phasing.py',
+                           'test/test_staging.py',
+                           'test/test_architecture.py',
+                           'test/test_logging.py',
+                           'test/test_clone.py',
+                           'test/test_serialize.py',
+                           'test/test_resultcache.py',
+                           'test/test_rollup.py',
+                           'test/test_results.py',
+                           'test/test_timeline.py',
+                           'test/test_boiloff.py',
+                           'test/test_ledger.py',
+                           'test/test_events.py',
+                           'test/test_batch.py',
+                           'test/fixtures.py',
                            'test/test_tank.py']},
  'package_dir': {'': 'src'},
  'packages': ['mama', 'mama.test'],
@@ -0,0 +1,257 @@
+"""
+   aerocapture.py
+
+   Aerocapture and aerobraking with an exponential atmosphere.
+
+   Atmospheric passes are integrated in the orbit plane (drag only, no
+   lift) with a fixed step RK4 integrator, for many entry conditions at
+   once.  Each pass starts inbound where the density is a small fraction
+   of the density at periapsis (or at apoapsis, if the whole orbit is
+   that low) and ends, after periapsis, when the vehicle climbs back out
+   to the same radius or reaches apoapsis.  Stagnation point heating uses the Sutton-Graves
+   relation, and the heat load is integrated over every pass.
+
+   Units are km, km/s and seconds, except the ballistic coefficient
+   (kg/m^2), nose radius (m) and heat load (J/cm^2).
+"""
+
+import numpy as np
+
+
+# reference density at the surface or 1 bar level (kg/m^3), scale height (km)
+# and Sutton-Graves constant (kg^0.5/m)
+atmospheres = {
+    'Venus':   (65.0,  15.9, 1.8960e-4),
+    'Earth':   (1.225,  8.5, 1.7415e-4),
+    'Mars':    (0.020, 11.1, 1.9027e-4),
+    'Jupiter': (0.16,  27.0, 0.6556e-4),
+    'Saturn':  (0.19,  59.5, 0.6556e-4),
+    'Uranus':  (0.42,  27.7, 0.6556e-4),
+    'Neptune': (0.45,  19.7, 0.6556e-4),
+}
+
+WINDOW = 7.0        # scale heights above periapsis at which a pass starts
+
+DT = 0.25           # step as a fraction of the time to cross one scale height
+
+MAX_PASSES = 1000   # limit on the number of aerobraking passes
+
+MAX_ORBITS = 2.0    # limit on the length of a pass, in orbit periods
+
+
+def atmosphere(body):
+    """ exponential atmosphere parameters for the body
+    """
+    if body not in atmospheres:
+        raise Exception(body, 'has no atmosphere')
+    return atmospheres[body]
+
+
+def apsides(mu, E, h):
+    """ periapsis and apoapsis radius from specific energy and angular momentum
+        (apoapsis is infinite for escape orbits)
+    """
+    e = np.sqrt(np.maximum(1 + 2*E*h**2/mu**2, 0.0))
+    r_p = h**2 / mu / (1 + e)
+    with np.errstate(divide='ignore'):
+        r_a = np.where(E < 0, h**2 / mu / (1 - e), np.inf)
+    return r_p, r_a
+
+
+def _derivatives(r, vr, vt, mu, R, rho0, H, beta):
+    """ equations of motion with drag in polar coordinates
+    """
+    v = np.sqrt(vr**2 + vt**2)
+    rho = rho0 * np.exp(-(r - R)/H)
+    drag = 500 * rho * v / beta  # drag acceleration / velocity, km/s^2 per km/s
+    return (vr,
+            vt**2/r - mu/r**2 - drag*vr,
+            -vr*vt/r - drag*vt)
+
+
+def atmospheric_pass(mu, R, body, E, h, beta, rn=1.0):
+    """ integrate one atmospheric pass for arrays of orbits given by
+        specific energy E and angular momentum h
+
+        returns energy and angular momentum after the pass, the heat load
+        (J/cm^2) and a flag for cases that do not exit the atmosphere (they
+        impact, or do not finish the pass within MAX_ORBITS periods)
+    """
+    rho0, H, k = atmosphere(body)
+    E, h, beta, rn = [np.array(a, dtype=float) for a in np.broadcast_arrays(E, h, beta, rn)]
+    shape = E.shape
+    E, h, beta, rn = [a.ravel() for a in (E, h, beta, rn)]
+
+    r_p, r_a = apsides(mu, E, h)
+    r_start = np.minimum(r_p + WINDOW*H, r_a)
+
+    # cases with periapsis well above the atmosphere are not affected
+    active = r_p < r_start - 1e-6
+
+    r = r_start.copy()
+    v = np.sqrt(2*(E + mu/r))
+    vt = h / r
+    vr = -np.sqrt(np.maximum(v**2 - vt**2, 0.0))
+    dt = DT * H / np.sqrt(2*(E + mu/r_p))
+
+    heat = np.zeros_like(E)
+    impact = np.zeros(E.shape, dtype=bool)
+    outbound = np.zeros(E.shape, dtype=bool)
+    done = ~active
+
+    # limit the number of steps to a few orbit periods (of a circular orbit
+    # at the start radius for hyperbolic approaches)
+    with np.errstate(divide='ignore'):
+        a = np.where(E < 0, -mu/(2*E), r_start)
+    period = 2*np.pi * np.sqrt(a**3 / mu)
+    max_steps = int(np.where(active, MAX_ORBITS * period / dt, 0.0).max()) + 10
+
+    for step in range(max_steps):
+        if done.all():
+            break
+        i = ~done
+        y = (r[i], vr[i], vt[i])
+        args = (mu, R, rho0, H, beta[i])
+        dh = dt[i]
+
+        k1 = _derivatives(*(y + args))
+        k2 = _derivatives(*(tuple(y[j] + dh/2*k1[j] for j in range(3)) + args))
+        k3 = _derivatives(*(tuple(y[j] + dh/2*k2[j] for j in range(3)) + args))
+        k4 = _derivatives(*(tuple(y[j] + dh*k3[j] for j in range(3)) + args))
+        y = [y[j] + dh/6*(k1[j] + 2*k2[j] + 2*k3[j] + k4[j]) for j in range(3)]
+
+        # Sutton-Graves stagnation point heating (W/m^2)
+        rho = rho0 * np.exp(-(y[0] - R)/H)
+        speed = np.sqrt(y[1]**2 + y[2]**2) * 1000
+        heat[i] += k * np.sqrt(rho/rn[i]) * speed**3 * dh
+
+        # the pass ends after periapsis, on climbing back out of the
+        # atmosphere or at apoapsis (if apoapsis is below the start radius)
+        r[i], vr[i], vt[i] = y
+        passed = outbound[i]
+        exited = passed & ((y[0] >= r_start[i]) | (y[1] <= 0))
+        outbound[i] = passed | (y[1] > 0)
+        crashed = y[0] <= R
+        impact[np.flatnonzero(i)[crashed]] = True
+        done[np.flatnonzero(i)[exited | crashed]] = True
+
+    impact |= ~done
+
+    E_out = np.where(active, (vr**2 + vt**2)/2 - mu/r, E)
+    h_out = np.where(active, r*vt, h)
+
+    return (E_out.reshape(shape), h_out.reshape(shape),
+            (heat / 1e4).reshape(shape), impact.reshape(shape))
+
+
+def _velocity(mu, r, r_p, r_a):
+    """ velocity at radius r on the orbit with the given apsides
+    """
+    return np.sqrt(mu * (2/r - 2/(r_p + r_a)))
+
+
+def aerocapture(orbit, C3, entry_periapsis, beta, rn=1.0):
+    """ aerocapture from a hyperbolic approach into the specified Orbit
+
+        C3              - approach C3 (km^2/s^2)
+        entry_periapsis - vacuum periapsis altitude of the approach (km)
+        beta            - ballistic coefficient (kg/m^2)
+
+        all of which may be arrays.  Returns the propulsive delta-V still
+        required (to raise periapsis and trim apoapsis after the pass),
+        the delta-V saved compared to a propulsive capture at periapsis
+        and the heat load (J/cm^2).  Cases that do not capture, or impact,
+        are NaN.
+    """
+    mu = orbit.body_gravity()
+    R = orbit.body_radius()
+    r_p_target = R + min(orbit.periapsis, orbit.apoapsis)
+    r_a_target = R + max(orbit.periapsis, orbit.apoapsis)
+
+    C3, entry_periapsis = np.broadcast_arrays(np.asarray(C3, dtype=float),
+                                              np.asarray(entry_periapsis, dtype=float))
+    r_entry = R + entry_periapsis
+    E = C3 / 2
+    h = r_entry * np.sqrt(C3 + 2*mu/r_entry)
+
+    E_out, h_out, heat, impact = atmospheric_pass(mu, R, orbit.body, E, h, beta, rn)
+    r_p, r_a = apsides(mu, E_out, h_out)
+
+    # raise periapsis at the post-pass apoapsis, then trim apoapsis at periapsis
+    with np.errstate(invalid='ignore'):
+        dV1 = np.abs(_velocity(mu, r_a, r_p_target, r_a) - _velocity(mu, r_a, r_p, r_a))
+        dV2 = np.abs(_velocity(mu, r_p_target, r_p_target, r_a_target)
+                     - _velocity(mu, r_p_target, r_p_target, r_a))
+    dV = dV1 + dV2
+
+    # propulsive capture at periapsis of the target orbit
+    dV_capture = np.sqrt(C3 + 2*mu/r_p_target) - _velocity(mu, r_p_target, r_p_target, r_a_target)
+
+    failed = impact | (E_out >= 0)
+    dV = np.where(failed, np.nan, dV)
+    dV_saved = dV_capture - dV
+
+    return dV, dV_saved, heat
+
+
+def aerobrake(orbit, aero_periapsis, target_apoapsis, beta, rn=1.0, max_passes=MAX_PASSES):
+    """ aerobrake from the specified Orbit down to the target apoapsis
+
+        the periapsis is lowered to aero_periapsis (altitude, km) at
+        apoapsis, passes are flown until the apoapsis is at or below
+        target_apoapsis (km), then the periapsis is raised back to the
+        orbit periapsis.  aero_periapsis, target_apoapsis and beta may be
+        arrays.
+
+        Returns the propulsive delta-V (periapsis walk down and raise),
+        the delta-V saved compared to lowering apoapsis propulsively at
+        periapsis, the number of passes and the heat load (J/cm^2).
+        Cases that impact or do not finish within max_passes are NaN.
+    """
+    mu = orbit.body_gravity()
+    R = orbit.body_radius()
+    r_p0 = R + min(orbit.periapsis, orbit.apoapsis)
+    r_a0 = R + max(orbit.periapsis, orbit.apoapsis)
+
+    aero_periapsis, target_apoapsis, beta = [a.astype(float) for a in np.broadcast_arrays(
+        np.asarray(aero_periapsis), np.asarray(target_apoapsis), np.asarray(beta))]
+    shape = aero_periapsis.shape
+    r_aero = (R + aero_periapsis).ravel()
+    r_target = (R + target_apoapsis).ravel()
+    beta = beta.ravel()
+    rn = (np.asarray(rn, dtype=float) * np.ones(shape)).ravel()
+
+    # walk periapsis down into the atmosphere at apoapsis
+    dV_down = _velocity(mu, r_a0, r_p0, r_a0) - _velocity(mu, r_a0, r_aero, r_a0)
+
+    E = -mu / (r_aero + r_a0)
+    h = np.sqrt(2*mu * r_aero*r_a0 / (r_aero + r_a0))
+
+    passes = np.zeros(E.shape, dtype=int)
+    heat = np.zeros_like(E)
+    failed = np.zeros(E.shape, dtype=bool)
+    r_a = r_a0 * np.ones_like(E)
+    active = r_a > r_target
+
+    while active.any():
+        i = active
+        E[i], h[i], pass_heat, impact = atmospheric_pass(mu, R, orbit.body, E[i], h[i], beta[i], rn[i])
+        heat[i] += pass_heat
+        passes[i] += 1
+        r_a[i] = apsides(mu, E[i], h[i])[1]
+
+        failed[np.flatnonzero(i)[impact]] = True
+        failed |= active & (passes >= max_passes) & (r_a > r_target)
+        active = (r_a > r_target) & ~failed
+
+    # raise periapsis back to the orbit periapsis at the final apoapsis
+    r_p, r_a = apsides(mu, E, h)
+    dV_up = _velocity(mu, r_a, r_p0, r_a) - _velocity(mu, r_a, r_p, r_a)
+    dV = np.where(failed, np.nan, dV_down + dV_up)
+
+    # propulsive apoapsis reduction at periapsis
+    dV_propulsive = _velocity(mu, r_p0, r_p0, r_a0) - _velocity(mu, r_p0, r_p0, r_target)
+    dV_saved = dV_propulsive - dV
+
+    return (dV.reshape(shape), dV_saved.reshape(shape),
+            passes.reshape(shape), heat.reshape(shape))
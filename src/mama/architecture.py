@@ -0,0 +1,180 @@
+"""
+   architecture.py
+
+   Enumeration of spacecraft architectures.
+
+   Every combination of an engine from an engine catalog and a tank option
+   for each stage, for each of the stage counts, is a candidate
+   architecture.  Candidates are bounded with the ideal rocket equation
+   (full tanks, every empty stage dropped as soon as it is empty, no
+   reserves), which can only overestimate the delta-V the architecture
+   can deliver.  Candidates whose bound falls short of the mission delta-V,
+   or whose initial thrust to weight is too low, are pruned, all at once
+   with numpy.  Only the survivors are evaluated with the full mission,
+   lightest first, across a pool of processes.
+
+   Stage stacks are grown from the core stage outward, one forward stage
+   at a time, so whole branches are pruned before they are enumerated.
+   Adding forward stages only adds mass, and each one can add at most the
+   delta-V of a full tank burned from the current gross mass, so a partial
+   stack whose bound plus that much for each remaining stage falls short
+   (or whose thrust to weight is already too low) has no candidates worth
+   keeping.
+
+   Catalog entries may be any objects with the listed attributes, such
+   as the Engine and Tank tuples below or IPropulsion subsystems with a
+   mass attribute.  Units are kg, kN (thrust), seconds (Isp) and km/s.
+"""
+
+import itertools
+import multiprocessing
+
+from collections import namedtuple
+
+import numpy as np
+
+
+g = 9.8062E-3  # gravitational constant (km/s^2), as used by Spacecraft.burn
+
+Engine = namedtuple('Engine', 'name thrust Isp cooldown_burn mass')
+
+Tank = namedtuple('Tank', 'name capacity mass')
+
+# a candidate, the engine is on the core stage and tanks are in stage
+# order (core stage first)
+Architecture = namedtuple('Architecture', 'engine tanks')
+
+
+def candidates(engines, tanks, stage_counts):
+    """ engine and tank indices of every candidate architecture, for each
+        stage count as a pair of arrays (N,) and (N, stages)
+    """
+    for stages in stage_counts:
+        combinations = np.array(list(itertools.product(range(len(tanks)), repeat=stages)),
+                                dtype=int).reshape(-1, stages)
+        engine = np.repeat(np.arange(len(engines)), len(combinations))
+        yield engine, np.tile(combinations, (len(engines), 1))
+
+
+def extend(tanks, engine, tank):
+    """ every stage stack given by engine indices (N,) and tank indices
+        (N, stages) with each tank option as one more forward stage
+    """
+    options = len(tanks)
+    return (np.repeat(engine, options),
+            np.column_stack((np.repeat(tank, options, axis=0),
+                             np.tile(np.arange(options), len(engine)))))
+
+
+def bound(engines, tanks, engine, tank, payload, stage_mass=0.0):
+    """ ideal delta-V and gross mass of candidate architectures given by
+        engine indices (N,) and tank indices (N, stages), with the payload
+        and a fixed structural mass per stage
+    """
+    Isp = np.array([e.Isp for e in engines], dtype=float)[engine]
+    cooldown = np.array([e.cooldown_burn for e in engines], dtype=float)[engine]
+    fuel = np.array([t.capacity for t in tanks], dtype=float)[tank]
+    dry = np.array([t.mass for t in tanks], dtype=float)[tank] + stage_mass
+    dry[:, 0] += np.array([e.mass for e in engines], dtype=float)[engine]
+
+    c = Isp * g
+    gross = payload + dry.sum(axis=1) + fuel.sum(axis=1)
+
+    # stages burn from the forward stage back to the core stage
+    mass = gross.copy()
+    dV = np.zeros(len(engine))
+    for k in range(tank.shape[1] - 1, -1, -1):
+        usable = fuel[:, k] / (1 + cooldown)
+        dV += c * np.log(mass / (mass - usable))
+        mass -= fuel[:, k]
+        if k > 0:
+            mass -= dry[:, k]
+
+    return dV, gross
+
+
+def stage_bound(engines, tanks, engine, gross, stage_mass=0.0):
+    """ most delta-V one more forward stage can add to stage stacks with
+        engine indices (N,) and gross masses (N,)
+    """
+    c = np.array([e.Isp for e in engines], dtype=float)[engine] * g
+    cooldown = np.array([e.cooldown_burn for e in engines], dtype=float)[engine]
+    fuel = np.array([t.capacity for t in tanks], dtype=float)
+    dry = np.array([t.mass for t in tanks], dtype=float) + stage_mass
+
+    mass = gross[:, np.newaxis] + dry + fuel
+    usable = fuel / (1 + cooldown[:, np.newaxis])
+    return c * np.log(mass / (mass - usable)).max(axis=1)
+
+
+def prune(engines, tanks, stage_counts, dV, payload, min_TW=0.0, stage_mass=0.0):
+    """ candidate architectures that can deliver the payload through the
+        delta-V by the ideal bound (with an initial thrust to weight of at
+        least min_TW, in Earth g), ordered from the lightest
+
+        returns the surviving architectures, their gross masses and the
+        number of candidates enumerated
+    """
+    thrust = np.array([e.thrust for e in engines], dtype=float)
+    most = max(stage_counts)
+    survivors = []
+    count = 0
+
+    # single stage stacks, then one more forward stage at a time
+    engine = np.repeat(np.arange(len(engines)), len(tanks))
+    tank = np.tile(np.arange(len(tanks)), len(engines)).reshape(-1, 1)
+    for stages in range(1, most + 1):
+        if stages > 1:
+            engine, tank = extend(tanks, engine, tank)
+        ideal, gross = bound(engines, tanks, engine, tank, payload, stage_mass)
+        lift = thrust[engine] / (gross * g) >= min_TW
+
+        if stages in stage_counts:
+            count += len(engine)
+            keep = (ideal >= dV) & lift
+            for i in np.flatnonzero(keep):
+                survivors.append((gross[i], Architecture(engines[engine[i]],
+                                                         tuple(tanks[j] for j in tank[i]))))
+
+        # drop the stacks that can not reach the delta-V with more stages
+        if stages < most:
+            reach = ideal + (most - stages)*stage_bound(engines, tanks, engine, gross, stage_mass)
+            grow = lift & (reach >= dV)
+            engine, tank = engine[grow], tank[grow]
+
+    survivors.sort(key=lambda survivor: survivor[0])
+    return [s[1] for s in survivors], [s[0] for s in survivors], count
+
+
+def run(architectures, evaluate, processes=None):
+    """ evaluate each architecture with the full mission in a pool of
+        processes (processes=None uses all cores, 1 disables)
+
+        evaluate must be a module level function (so that it can be sent to
+        the pool) that builds the spacecraft and mission for an Architecture,
+        runs the mission and returns its result
+    """
+    if processes == 1 or len(architectures) < 2:
+        return [evaluate(architecture) for architecture in architectures]
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(evaluate, architectures)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def search(engines, tanks, stage_counts, dV, payload, evaluate,
+           min_TW=0.0, stage_mass=0.0, processes=None):
+    """ enumerate, prune and evaluate architectures
+        returns a list of (architecture, result) for the survivors, lightest
+        first, and the number of candidates that were enumerated
+    """
+    architectures, gross, count = prune(engines, tanks, stage_counts, dV, payload,
+                                        min_TW, stage_mass)
+    results = run(architectures, evaluate, processes)
+    return zip(architectures, results), count
@@ -0,0 +1,225 @@
+"""
+   batch.py
+
+   Batch simulation of many variants of a mission at once.
+
+   A BatchMission flies N variants of a mission as one pass over its phase
+   list.  The mass state of the variants is a BatchSpacecraft, a clone (see
+   clone) whose state arrays have a row per variant: dry mass, fuel, RCS
+   propellant and other fluids by stage and the mass of each item.  Every
+   phase operation (consumables, burns with reserves and the
+   forward-stage-first draining of fuel, expending fuel and propellant,
+   dropping subsystems and picking up mass) is the clone operation,
+   applied to all of the rows at once, and the event triggers of the
+   mission and its phases are detected for all of the variants together
+   (see events).
+
+   Variants differ in the inputs given to BatchMission.vary: item masses
+   (by their path in the spacecraft), the initial fuel or RCS propellant
+   of a stage ('fuel.<stage>', 'prop.<stage>') and the inputs of phases
+   and their maneuvers ('<phase>.<input>', such as 'burn.dV').  Everything
+   else, including the delta-V of maneuvers that calculate it, the
+   duration of phasing phases and the trip time of low-thrust spirals, is
+   taken from one run of the mission.
+
+   As with clones (see clone), boil-off depends on the fuel system
+   implementation and is not modelled.
+"""
+
+import numpy as np
+
+from clone import SpacecraftStructure, SpacecraftClone
+import results
+import events
+
+
+# inputs of phases (and their maneuvers) that may differ between variants
+phase_inputs = ('duration', 'expend_fuel', 'expend_prop', 'pickup_mass')
+maneuver_inputs = ('dV', 'bulk_reserve', 'dV_reserve', 'Isp_reserve', 'other_reserve')
+
+
+class BatchSpacecraft(SpacecraftClone):
+    """ the mass state of N variants of a spacecraft: a clone with a row
+        per variant in each of its state arrays
+    """
+
+    __slots__ = ()
+
+    def _value(self, values):
+        """ the values of the variants from the state arrays
+        """
+        return values
+
+    @property
+    def n(self):
+        return len(self._state['dry'])
+
+    def snapshot(self, MET):
+        """ the state of each variant for event detection: MET, mass, fuel
+            and fuel on each stage
+        """
+        return (np.array(MET, dtype=float), self.wet_mass, self.get_fuel(), self.stage_fuel())
+
+
+class BatchMission(object):
+    """ N variants of a mission, flown together
+    """
+
+    def __init__(self, mission, n):
+        self.mission = mission
+        self.n = n
+
+        # run the mission for the delta-V of each maneuver, then reset the
+        # spacecraft to its initial state for its structure
+        mission.run(cache=False)
+        mission.spacecraft.run(force=True)
+        self.structure = SpacecraftStructure(mission.spacecraft)
+        self.initial = {}
+
+        self.phases = []
+        for phase in mission.phases:
+            inputs = dict((name, np.repeat(float(getattr(phase, name)), n))
+                          for name in phase_inputs)
+            # duration as flown (phasing time, spiral trip time)
+            inputs['duration'] = np.repeat(float(phase.elapsed), n)
+            maneuver = phase.maneuver
+            for name in maneuver_inputs:
+                value = getattr(maneuver, name) if maneuver else 0.0
+                inputs[name] = np.repeat(float(value), n)
+            self.phases.append((phase, inputs))
+
+    def vary(self, path, values):
+        """ set an input (see the module documentation) for each variant
+        """
+        values = np.asarray(values, dtype=float) * np.ones(self.n)
+        if path in self.structure.index:
+            self.initial[path] = values
+            return
+        first, name = path.split('.', 1) if '.' in path else (path, '')
+        if first in ('fuel', 'prop') and name in self.structure.stage_names:
+            self.initial[path] = values
+            return
+        for phase, inputs in self.phases:
+            if phase.name == first and name in inputs:
+                inputs[name] = values
+                return
+        raise Exception(self.mission, 'can not vary ' + path)
+
+    def spacecraft(self):
+        """ the initial state of the variants of the spacecraft
+        """
+        state = self.structure.state
+        spacecraft = BatchSpacecraft(self.structure, dict((name, np.tile(state[name], (self.n, 1)))
+                                                          for name in state))
+        for path, values in self.initial.items():
+            if path in self.structure.index:
+                spacecraft.set_item_mass(path, values)
+            elif path.startswith('fuel.'):
+                stage = path.split('.', 1)[1]
+                spacecraft.add_fuel(stage, values - spacecraft.get_fuel(stage))
+            else:
+                stage = path.split('.', 1)[1]
+                spacecraft.add_prop(stage, values - spacecraft.get_prop(stage))
+        return spacecraft
+
+    def run(self):
+        """ fly all of the variants
+            returns the results table (see results) with a row per variant
+            and a column per phase; also sets aborted (a flag for each
+            variant) and fired (the MET of the event for each variant, NaN
+            if it did not fire, phase and trigger, in the same order as
+            Mission.fired) for the triggers that fired
+        """
+        spacecraft = self.spacecraft()
+        names = self.structure.stage_names
+        stages = len(names)
+
+        table = np.zeros((self.n, len(self.phases)), dtype=results.dtype(stages))
+        table['phase'] = [phase.name for phase, inputs in self.phases]
+
+        MET = np.repeat(float(self.mission.beg_MET), self.n)
+        self.aborted = np.zeros(self.n, dtype=bool)
+        self.fired = []
+        mission_triggers = list(self.mission.events)
+        pending = np.ones((len(mission_triggers), self.n), dtype=bool)
+
+        for column, (phase, inputs) in enumerate(self.phases):
+            active = ~self.aborted
+            duration = np.where(active, inputs['duration'], 0.0)
+            stage = phase.stage if phase.stage >= 0 else None
+
+            row = table[:, column]
+            row['beg_MET'] = MET
+            row['beg_mass'] = spacecraft.wet_mass
+            fuel_before = spacecraft.stage_fuel()
+            prop_before = spacecraft.stage_prop()
+            samples = [spacecraft.snapshot(MET)]
+
+            spacecraft.expend_consumables(duration, stage)
+
+            end_MET = MET + duration
+            if phase.maneuver:
+                before_burn = spacecraft.snapshot(end_MET)
+                reserves = [inputs[name] for name in maneuver_inputs[1:]]
+                if stage is None:
+                    burn_time = spacecraft.burn(inputs['dV'], phase.maneuver.stage, *reserves,
+                                                where=active)
+                else:
+                    burn_time = spacecraft.stage_burn(inputs['dV'], stage, *reserves, where=active)
+                # a low-thrust spiral burns for its whole trip time
+                if phase.maneuver.maneuver_type == 'Low-Thrust Spiral':
+                    burn_time = np.where(active, phase.maneuver.burn_time, 0.0)
+                row['dV'] = np.where(active, inputs['dV'], 0.0)
+                row['burn_time'] = burn_time
+
+                # the burn runs up to the end of the phase
+                before_burn[0][...] = end_MET - np.minimum(burn_time / 86400., duration)
+                samples.append(before_burn)
+                samples.append(spacecraft.snapshot(end_MET))
+
+            spacecraft.expend_fuel(phase.fuel_stage, np.where(active, inputs['expend_fuel'], 0.0))
+            spacecraft.expend_prop(phase.prop_stage, np.where(active, inputs['expend_prop'], 0.0))
+            if phase.drop_subsystem:
+                spacecraft.drop(phase.drop_subsystem, where=active)
+            spacecraft.pickup_mass(phase.pickup_stage, np.where(active, inputs['pickup_mass'], 0.0))
+            MET = end_MET
+            samples.append(spacecraft.snapshot(MET))
+
+            self.trigger_events(phase, samples, mission_triggers, pending, active, spacecraft)
+
+            row['end_MET'] = MET
+            row['end_mass'] = spacecraft.wet_mass
+            row['end_fuel'] = spacecraft.get_fuel()
+            row['end_prop'] = spacecraft.stage_prop()
+            row['fuel_drawn'] = fuel_before - spacecraft.stage_fuel()
+            row['prop_drawn'] = prop_before - spacecraft.stage_prop()
+
+        self.results = table
+        return table
+
+    def trigger_events(self, phase, samples, mission_triggers, pending, active, spacecraft):
+        """ detect the triggers of the phase and the pending triggers of the
+            mission over the samples of the phase, for all of the variants,
+            and take their actions
+        """
+        triggers = list(phase.events) + mission_triggers
+        if len(triggers) < 1:
+            return
+
+        # arrays of samples (N, samples), with stage fuel (N, samples, stages)
+        MET, mass, fuel, stage_fuel = [np.array(values).swapaxes(0, 1) for values in zip(*samples)]
+        state = events.state(MET, mass, fuel, stage_fuel, self.structure.stage_names)
+        times = events.crossing(triggers, state)
+
+        armed = np.vstack([np.ones((len(phase.events), self.n), dtype=bool), pending])
+        fired = armed & active & ~np.isnan(times)
+        pending[...] = pending & ~fired[len(phase.events):]
+
+        for trigger, where, MET in zip(triggers, fired, times):
+            if not where.any():
+                continue
+            self.fired.append((np.where(where, MET, np.nan), phase.name, trigger))
+            if trigger.action == 'drop':
+                spacecraft.drop(trigger.target, where=where)
+            elif trigger.action == 'abort':
+                self.aborted |= where
@@ -0,0 +1,163 @@
+"""
+   boiloff.py
+
+   Boil-off of cryogenic propellant.
+
+   The heat leak into a tank is conducted through its insulation, over the
+   surface area of the tank (a cylinder with ellipsoidal domes), from the
+   environment at the radiative equilibrium temperature of the tank's outer
+   surface in sunlight, or at a cold sink temperature in eclipse.  Over an
+   orbit the heat leak is weighted by the fraction of the orbit spent in
+   eclipse (from Orbit.eclipse).  In orbit about the Sun there is no
+   eclipse, and the insolation is the time average over the orbit of the
+   solar flux, which falls off with the square of the distance from the
+   Sun.  The heat leak boils off propellant at its
+   heat of vaporization, at a constant rate, so the loss over a phase is
+   found in closed form (limited by the propellant in the tank).
+
+   All functions work on arrays, with an element per tank, so every tank on
+   the vehicle is handled at once however long the phase.
+   Units are m, K, W, kg and days.
+"""
+
+import numpy as np
+
+from subsystems import IFuelSystem, ICryogenicTank
+from ephemeris import AU
+from openmdao.main.mp_support import has_interface
+
+
+sigma = 5.670373e-8  # Stefan-Boltzmann constant (W/m**2/K**4)
+
+# saturation temperature (K) and heat of vaporization (J/kg) at 1 atm
+propellants = {
+    'LH2':  (20.3,  446.0e3),
+    'LO2':  (90.2,  213.1e3),
+    'LCH4': (111.7, 510.0e3),
+}
+
+# defaults for tanks that do not specify them
+defaults = {
+    'dome_ecc':     np.sqrt(2)/2,
+    'absorptivity': 0.14,
+    'emissivity':   0.9,
+}
+
+T_eclipse = 100.0  # environment temperature in eclipse (K)
+
+insolation_1AU = 1366.1  # W/m**2, used if there is no orbit
+
+
+def spheroid_area(radius, ecc):
+    """ surface area of an oblate spheroid with the specified equatorial
+        radius and eccentricity (two domes of a tank)
+    """
+    radius = np.asarray(radius, dtype=float)
+    ecc = np.asarray(ecc, dtype=float)
+    e = np.where(ecc > 1e-6, ecc, 1e-6)
+    area = 2*np.pi*radius**2 * (1 + (1 - e**2)/e * np.arctanh(e))
+    return np.where(ecc > 1e-6, area, 4*np.pi*radius**2)
+
+
+def tank_area(diameter, length, dome_ecc):
+    """ surface area of a tank with ellipsoidal domes, given its overall
+        length (a sphere if the length is the diameter and dome_ecc is zero)
+    """
+    radius = np.asarray(diameter, dtype=float) / 2
+    dome_height = radius * np.sqrt(1 - np.asarray(dome_ecc, dtype=float)**2)
+    barrel = np.maximum(np.asarray(length, dtype=float) - 2*dome_height, 0.0)
+    return spheroid_area(radius, dome_ecc) + 2*np.pi*radius*barrel
+
+
+def sunlit_temperature(insolation, absorptivity, emissivity):
+    """ radiative equilibrium temperature of the outer surface of a tank in
+        sunlight (absorbing on its cross section, radiating from its area)
+    """
+    return (absorptivity * insolation / (4 * emissivity * sigma))**0.25
+
+
+def heat_leak(area, thickness, conductivity, T_env, T_prop):
+    """ heat conducted through the insulation into the tank (W)
+    """
+    return np.maximum(area * conductivity / thickness * (T_env - T_prop), 0.0)
+
+
+def losses(fuel, area, thickness, conductivity, propellant, duration,
+           insolation=insolation_1AU, eclipse=0.0,
+           absorptivity=defaults['absorptivity'], emissivity=defaults['emissivity']):
+    """ propellant boiled off from each tank over the duration (days),
+        given the fraction of the time spent in eclipse
+    """
+    area = np.asarray(area, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+    conductivity = np.asarray(conductivity, dtype=float)
+    T_prop = np.array([propellants[p][0] for p in np.atleast_1d(propellant)])
+    h_vap = np.array([propellants[p][1] for p in np.atleast_1d(propellant)])
+
+    T_sun = sunlit_temperature(insolation, np.asarray(absorptivity, dtype=float),
+                               np.asarray(emissivity, dtype=float))
+    Q = (1 - eclipse) * heat_leak(area, thickness, conductivity, T_sun, T_prop) \
+      + eclipse * heat_leak(area, thickness, conductivity, T_eclipse, T_prop)
+
+    rate = Q / h_vap  # kg/s
+    return np.minimum(np.asarray(fuel, dtype=float), rate * duration * 86400)
+
+
+def environment(orbit):
+    """ insolation and eclipse fraction for an orbit (or None)
+    """
+    if orbit is None:
+        return insolation_1AU, 0.0
+    if orbit.body == 'Sun':
+        # the time average of 1/r**2 over an ellipse is 1/(a*b)
+        R = orbit.body_radius()
+        r_p = R + min(orbit.periapsis, orbit.apoapsis)
+        r_a = R + max(orbit.periapsis, orbit.apoapsis)
+        return insolation_1AU * AU**2 / ((r_p + r_a)/2 * np.sqrt(r_p*r_a)), 0.0
+    try:
+        eclipse = orbit.eclipse() / orbit.period()
+    except ValueError:
+        eclipse = 0.0  # no eclipse (e.g. high orbits)
+    return orbit.insolation(), eclipse
+
+
+def tank_losses(tanks, duration, orbit=None):
+    """ propellant boiled off from each of a list of cryogenic tanks
+        (ICryogenicTank fuel systems) over the duration (days) in an orbit
+    """
+    def values(name):
+        return np.array([getattr(tank, name, defaults.get(name)) for tank in tanks], dtype=float)
+
+    insolation, eclipse = environment(orbit)
+    area = tank_area(values('diameter'), values('length'), values('dome_ecc'))
+    fuel = np.array([tank.get_fuel() for tank in tanks], dtype=float)
+    return losses(fuel, area, values('insulation_thickness'), values('insulation_conductivity'),
+                  [tank.propellant for tank in tanks], duration, insolation, eclipse,
+                  values('absorptivity'), values('emissivity'))
+
+
+def boil_off(stages, duration, orbit=None):
+    """ expend the boil-off of all of the fuel systems of the stages over the
+        duration (days), cryogenic tanks all at once, other fuel systems by
+        their own boil_off method
+        returns a list of (stage, fuel system, boil-off) for cryogenic tanks
+    """
+    cryogenic = []
+    for stage in stages:
+        for name in stage.get_children(IFuelSystem):
+            fuel_system = stage.get(name)
+            if has_interface(fuel_system, ICryogenicTank):
+                cryogenic.append((stage, fuel_system))
+            else:
+                fuel_system.boil_off(duration)
+
+    if len(cryogenic) < 1:
+        return []
+
+    loss = tank_losses([fuel_system for stage, fuel_system in cryogenic], duration, orbit)
+    expended = []
+    for (stage, fuel_system), mass in zip(cryogenic, loss):
+        if mass > 0:
+            fuel_system.expend_fuel(float(mass))
+        expended.append((stage, fuel_system, float(mass)))
+    return expended
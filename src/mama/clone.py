@@ -0,0 +1,353 @@
+"""
+   clone.py
+
+   Lightweight copy-on-write clones of a Spacecraft.
+
+   A SpacecraftStructure captures everything about a configured (and
+   executed) Spacecraft that does not change while flying a mission: the
+   stage and item tree, item geometry, the propulsion of each stage and
+   which subsystems are expendable.
+   It also holds the initial mass state as read-only numpy arrays: dry
+   mass, fuel, RCS propellant and other fluids by stage, and the mass of
+   each item.
+
+   A SpacecraftClone refers to the shared structure and only copies a
+   state array the first time it changes it, so thousands of variants of
+   one vehicle cost memory in proportion to what they change.  Clones
+   support the mass operations used by mission phases: burns follow the
+   same rules as Spacecraft.burn, fuel and propellant are expended and
+   added by stage, and mass dropped or picked up on a stage changes both
+   its dry and wet mass.  As with Spacecraft, only expendable (IExpendable)
+   subsystems can be dropped; a clone drops one by zeroing the mass of all
+   of its items (which is what CargoSubsystem.drop does).
+
+   Boil-off depends on the fuel system implementation and is not modelled
+   by clones.
+"""
+
+import numpy as np
+
+from openmdao.main.mp_support import has_interface
+
+from subsystem import Subsystem, MassItem, Fluid
+from subsystems import IPropulsion, IRCS, IFuelSystem, IExpendable
+from spacecraft import fuel_required
+
+
+state_arrays = ('dry', 'fuel', 'prop', 'fluid', 'item_mass')
+
+
+def _readonly(values):
+    array = np.array(values, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+class SpacecraftStructure(object):
+    """ the immutable structure and initial mass state of a Spacecraft
+    """
+
+    def __init__(self, spacecraft):
+        self.description = spacecraft.description
+        self.crew_consumable_rate = spacecraft.crew_consumable_rate
+
+        stages = spacecraft.stages
+        self.stage_names = tuple([stage.name for stage in stages])
+        self.crew_count = tuple([stage.crew_count for stage in stages])
+
+        # items of every stage, with their geometry
+        paths = []
+        item_stage = []
+        fluid = []
+        geometry = []
+        masses = []
+        for index, stage in enumerate(stages):
+            for path, item in self._items(stage, stage.name):
+                paths.append(path)
+                item_stage.append(index)
+                fluid.append(isinstance(item, Fluid))
+                geometry.append((item.x, item.y, item.z, item.radius, item.length))
+                masses.append(item.mass)
+        self.paths = tuple(paths)
+        self.index = dict((path, i) for i, path in enumerate(paths))
+        self.item_stage = np.array(item_stage, dtype=int)
+        self.item_stage.flags.writeable = False
+        self.item_fluid = np.array(fluid, dtype=bool)
+        self.item_fluid.flags.writeable = False
+        self.geometry = _readonly(geometry).reshape(-1, 5)
+
+        # paths of the expendable subsystems, the only ones that can be dropped
+        self.expendable = frozenset([path for stage in stages
+                                     for path in self._expendable(stage, stage.name)])
+
+        # propulsion of each stage (NaN if the stage has none)
+        self.main = _readonly([self._propulsion(stage, IPropulsion) for stage in stages]).reshape(-1, 3)
+        self.rcs = _readonly([self._propulsion(stage, IRCS)[:2] for stage in stages]).reshape(-1, 2)
+
+        # initial mass state by stage
+        dry = [stage.dry_mass for stage in stages]
+        fuel = [stage.get_fuel() for stage in stages]
+        prop = [stage.get_prop() for stage in stages]
+        wet = [stage.wet_mass for stage in stages]
+        self.residual = _readonly([f - self._available_fuel(stage, f) for stage, f in zip(stages, fuel)])
+
+        self.state = {
+            'dry':       _readonly(dry),
+            'fuel':      _readonly(fuel),
+            'prop':      _readonly(prop),
+            'fluid':     _readonly(np.array(wet) - np.array(dry) - np.array(fuel) - np.array(prop)),
+            'item_mass': _readonly(masses),
+        }
+
+    def _items(self, subsystem, path):
+        """ paths and mass items within a subsystem, recursively
+        """
+        for name in subsystem.list_containers():
+            child = subsystem.get(name)
+            if isinstance(child, MassItem):
+                yield path + '.' + name, child
+            elif isinstance(child, Subsystem):
+                for item in self._items(child, path + '.' + name):
+                    yield item
+
+    def _expendable(self, subsystem, path):
+        """ paths of the expendable subsystems within a subsystem, recursively
+        """
+        for name in subsystem.list_containers():
+            child = subsystem.get(name)
+            if isinstance(child, Subsystem):
+                if has_interface(child, IExpendable):
+                    yield path + '.' + name
+                for expendable in self._expendable(child, path + '.' + name):
+                    yield expendable
+
+    def _propulsion(self, stage, interface):
+        """ thrust, Isp and cooldown burn of the propulsion of a stage
+        """
+        systems = stage.get_children(interface)
+        if len(systems) < 1:
+            return (np.nan, np.nan, np.nan)
+        system = stage.get(systems[0])
+        return (system.thrust, system.Isp, getattr(system, 'cooldown_burn', 0.0))
+
+    def _available_fuel(self, stage, fuel):
+        """ fuel that can be burned from a stage
+        """
+        systems = stage.get_children(IFuelSystem)
+        if len(systems) < 1:
+            return fuel
+        system = stage.get(systems[0])
+        if hasattr(system, 'available_fuel'):
+            return system.available_fuel()
+        return fuel
+
+    def clone(self):
+        """ a new clone with the initial mass state
+        """
+        return SpacecraftClone(self, self.state)
+
+
+class SpacecraftClone(object):
+    """ a spacecraft that shares its structure, and its mass state until it
+        changes it, with other clones
+    """
+
+    __slots__ = ('structure', '_state', '_owned')
+
+    def __init__(self, structure, state):
+        self.structure = structure
+        self._state = dict(state)
+        self._owned = set()
+
+    def _write(self, name):
+        """ the named state array, copied first if it is shared
+        """
+        if name not in self._owned:
+            self._state[name] = self._state[name].copy()
+            self._state[name].flags.writeable = True
+            self._owned.add(name)
+        return self._state[name]
+
+    def _value(self, values):
+        """ a value of the clone from the state arrays
+        """
+        return float(values)
+
+    def clone(self):
+        """ a new clone with the current mass state of this clone
+        """
+        # from now on both clones share the arrays, so neither may write them
+        self._owned = set()
+        return type(self)(self.structure, self._state)
+
+    def changed(self):
+        """ names of the state arrays this clone has its own copy of
+        """
+        return sorted(self._owned)
+
+    @property
+    def dry_mass(self):
+        return self._value(self._state['dry'].sum(axis=-1))
+
+    @property
+    def wet_mass(self):
+        return self._value(self.stage_wet_mass().sum(axis=-1))
+
+    def stage_wet_mass(self):
+        """ wet mass of each stage
+        """
+        state = self._state
+        return state['dry'] + state['fuel'] + state['prop'] + state['fluid']
+
+    def stage_fuel(self):
+        """ fuel on each stage
+        """
+        return self._state['fuel'].copy()
+
+    def stage_prop(self):
+        """ RCS propellant on each stage
+        """
+        return self._state['prop'].copy()
+
+    def stage_index(self, stage):
+        """ index of a stage given its index or name
+        """
+        if isinstance(stage, basestring):
+            return self.structure.stage_names.index(stage)
+        return int(stage)
+
+    def get_fuel(self, stage=None):
+        if stage is not None:
+            return self._value(self._state['fuel'][..., self.stage_index(stage)])
+        return self._value(self._state['fuel'].sum(axis=-1))
+
+    def add_fuel(self, stage, fuel):
+        self._write('fuel')[..., self.stage_index(stage)] += fuel
+
+    def expend_fuel(self, stage, fuel):
+        self._write('fuel')[..., self.stage_index(stage)] -= fuel
+
+    def get_prop(self, stage=None):
+        if stage is not None:
+            return self._value(self._state['prop'][..., self.stage_index(stage)])
+        return list(self._state['prop'])
+
+    def add_prop(self, stage, prop):
+        self._write('prop')[..., self.stage_index(stage)] += prop
+
+    def expend_prop(self, stage, prop):
+        self._write('prop')[..., self.stage_index(stage)] -= prop
+
+    def drop_mass(self, stage, mass):
+        self._write('dry')[..., self.stage_index(stage)] -= mass
+
+    def pickup_mass(self, stage, mass):
+        self._write('dry')[..., self.stage_index(stage)] += mass
+
+    def get_item_mass(self, path):
+        return self._value(self._state['item_mass'][..., self.structure.index[path]])
+
+    def set_item_mass(self, path, mass, where=True):
+        """ change the mass of an item (where the mask is true), and the dry
+            (or fluid) mass of its stage
+            (fuel and RCS propellant should be changed with the fuel and prop
+            methods instead)
+        """
+        structure = self.structure
+        i = structure.index[path]
+        item_mass = self._write('item_mass')
+        delta = np.where(where, mass - item_mass[..., i], 0.0)
+        item_mass[..., i] += delta
+        if structure.item_fluid[i]:
+            self._write('fluid')[..., structure.item_stage[i]] += delta
+        else:
+            self._write('dry')[..., structure.item_stage[i]] += delta
+
+    def drop(self, subsystem, where=True):
+        """ drop an expendable subsystem (given by its path), zeroing the
+            mass of all of its items (where the mask is true)
+        """
+        if subsystem not in self.structure.expendable:
+            raise Exception(self, 'can not drop ' + subsystem + ', it is not expendable')
+        prefix = subsystem + '.'
+        for path in self.structure.paths:
+            if path.startswith(prefix):
+                self.set_item_mass(path, 0.0, where)
+
+    def expend_consumables(self, duration, stage=None):
+        """ calculates and jettisons crew consumable mass over the duration,
+            from every stage or just the specified stage
+        """
+        rate = self.structure.crew_consumable_rate
+        crew = np.array(self.structure.crew_count, dtype=float)
+        if stage is not None:
+            crew = np.where(np.arange(len(crew)) == self.stage_index(stage), crew, 0.0)
+        if crew.any():
+            duration = np.asarray(duration, dtype=float)[..., np.newaxis]
+            self._write('dry')[...] -= rate * duration * crew
+
+    def burn(self, dV, stage, bulk_reserve=0., dV_reserve=0., Isp_reserve=0., other_reserve=0.,
+             where=True):
+        """ burn for the specified delta-V (where the mask is true) with the
+            same rules as Spacecraft.burn, returns the burn time
+        """
+        structure = self.structure
+        stage = self.stage_index(stage)
+        dV = np.where(where, dV, 0.0)
+        main = dV > 0.15
+        thrust = np.where(main, structure.main[0, 0], structure.rcs[stage, 0])
+        Isp = np.where(main, structure.main[0, 1], structure.rcs[stage, 1])
+
+        mass = self.stage_wet_mass().sum(axis=-1)
+        with np.errstate(invalid='ignore'):
+            fuel_nominal, fuel_burn = fuel_required(mass, dV, Isp,
+                bulk_reserve, dV_reserve, Isp_reserve, other_reserve)
+        fuel_burn = np.where(dV > 0, fuel_burn, 0.0)
+
+        # RCS burns expend propellant from the specified stage
+        prop_burn = np.where(main, 0.0, fuel_burn)
+        if prop_burn.any():
+            self.expend_prop(stage, prop_burn)
+
+        # main burns draw fuel from forward stages first, and take the
+        # rest from the core stage
+        remaining = np.where(main, fuel_burn * (1 + structure.main[0, 2]), 0.0)
+        if remaining.any():
+            fuel = self._write('fuel')
+            for index in range(fuel.shape[-1] - 1, 0, -1):
+                available = fuel[..., index] - structure.residual[index]
+                stage_burn = np.clip(np.minimum(remaining, available), 0.0, None)
+                fuel[..., index] -= stage_burn
+                remaining = remaining - stage_burn
+            fuel[..., 0] -= np.maximum(remaining, 0.0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._value(np.where(dV > 0, mass * dV / thrust, 0.0))
+
+    def stage_burn(self, dV, stage, bulk_reserve=0., dV_reserve=0., Isp_reserve=0., other_reserve=0.,
+                   where=True):
+        """ burn for the specified delta-V (where the mask is true) with one
+            stage, with the same rules as Stage.burn, returns the burn time
+        """
+        structure = self.structure
+        stage = self.stage_index(stage)
+        dV = np.where(where, dV, 0.0)
+        main = dV > 0.1
+        thrust = np.where(main, structure.main[stage, 0], structure.rcs[stage, 0])
+        Isp = np.where(main, structure.main[stage, 1], structure.rcs[stage, 1])
+
+        mass = self.stage_wet_mass()[..., stage]
+        with np.errstate(invalid='ignore'):
+            fuel_nominal, fuel_burn = fuel_required(mass, dV, Isp,
+                bulk_reserve, dV_reserve, Isp_reserve, other_reserve)
+        fuel_burn = np.where(dV > 0, fuel_burn, 0.0)
+
+        fuel_burn_main = np.where(main, fuel_burn * (1 + structure.main[stage, 2]), 0.0)
+        if fuel_burn_main.any():
+            self.expend_fuel(stage, fuel_burn_main)
+        prop_burn = np.where(main, 0.0, fuel_burn)
+        if prop_burn.any():
+            self.expend_prop(stage, prop_burn)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._value(np.where(dV > 0, mass * dV / thrust, 0.0))
@@ -0,0 +1,156 @@
+"""
+   dvcache.py
+
+   Memoization of maneuver delta-V.
+
+   The delta-V for a maneuver depends only on the maneuver type, the orbit
+   (body, apoapsis, periapsis, inclination) and C3, so it is cached on
+   those quantities in a bounded LRU cache.  The cache is safe to use from
+   multiple threads.
+
+   A cache may also be backed by a read-only precomputed table (a numpy
+   structured array saved with save_table) which is memory-mapped, so the
+   same table can be shared by many processes.
+"""
+
+import threading
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+# maneuver types whose delta-V depends only on the cache key,
+# other maneuver types are always calculated
+cached_types = ('Departure from Apoapsis', 'Departure from Periapsis',
+                'Capture at Apoapsis',     'Capture at Periapsis',
+                'Circularize at Apoapsis', 'Circularize at Periapsis',
+                'Plane Change')
+
+table_dtype = np.dtype([
+    ('maneuver_type', 'S32'),
+    ('body',          'S16'),
+    ('apoapsis',      'f8'),
+    ('periapsis',     'f8'),
+    ('inclination',   'f8'),
+    ('C3',            'f8'),
+    ('dV',            'f8'),
+])
+
+
+class DeltaVCache(object):
+    """ bounded LRU cache of maneuver delta-V
+    """
+
+    def __init__(self, maxsize=1024, table=None):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.table_hits = 0
+        self._table = None
+        self._index = {}
+        if table is not None:
+            self.load_table(table)
+
+    def key(self, maneuver):
+        """ cache key for the specified maneuver
+        """
+        orbit = maneuver.orbit
+        return (str(maneuver.maneuver_type), str(orbit.body),
+                float(orbit.apoapsis), float(orbit.periapsis),
+                float(orbit.inclination), float(maneuver.C3))
+
+    def lookup(self, key):
+        """ get the cached delta-V for the key (None if not cached)
+        """
+        with self._lock:
+            if key in self._entries:
+                value = self._entries.pop(key)
+                self._entries[key] = value  # most recently used
+                self.hits += 1
+                return value
+            if key in self._index:
+                self.table_hits += 1
+                return float(self._table['dV'][self._index[key]])
+            self.misses += 1
+            return None
+
+    def store(self, key, dV):
+        """ add a delta-V to the cache, evicting the least recently used
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = dV
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_dV(self, maneuver):
+        """ get the delta-V for the maneuver, calculating it if not cached
+        """
+        if maneuver.maneuver_type not in cached_types:
+            return maneuver.calculate_dV()
+
+        key = self.key(maneuver)
+        dV = self.lookup(key)
+        if dV is None:
+            dV = maneuver.calculate_dV()
+            if dV is not None:
+                self.store(key, dV)
+        else:
+            maneuver.log('    dV for %s from cache = %1.3f km/s' % (maneuver.maneuver_type, dV))
+        return dV
+
+    def stats(self):
+        """ get cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.table_hits + self.misses
+            return {
+                'hits':       self.hits,
+                'table_hits': self.table_hits,
+                'misses':     self.misses,
+                'hit_rate':   float(self.hits + self.table_hits) / lookups if lookups else 0.0,
+                'size':       len(self._entries),
+                'maxsize':    self.maxsize,
+            }
+
+    def clear(self):
+        """ clear cached values and statistics (the table is retained)
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.table_hits = 0
+
+    def save_table(self, path):
+        """ save the cached values (and any loaded table) as a table
+            that can be loaded read-only by other processes
+        """
+        with self._lock:
+            values = dict((key, self._table['dV'][row]) for key, row in self._index.items())
+            values.update(self._entries)
+        table = np.array([key + (dV,) for key, dV in sorted(values.items())],
+                         dtype=table_dtype)
+        np.save(path, table)
+
+    def load_table(self, path):
+        """ memory-map a precomputed table
+        """
+        table = np.load(path, mmap_mode='r')
+        index = {}
+        for row in range(len(table)):
+            entry = table[row]
+            key = (str(entry['maneuver_type']), str(entry['body']),
+                   float(entry['apoapsis']), float(entry['periapsis']),
+                   float(entry['inclination']), float(entry['C3']))
+            index[key] = row
+        with self._lock:
+            self._table = table
+            self._index = index
+
+
+# default cache used by Maneuver.execute
+cache = DeltaVCache()
@@ -0,0 +1,267 @@
+"""
+   ephemeris.py
+
+   Analytic planetary ephemeris from mean orbital elements.
+
+   Heliocentric positions and velocities (km, km/s) in the J2000 ecliptic
+   frame, from the mean elements and rates in Standish, "Keplerian Elements
+   for Approximate Positions of the Major Planets" (JPL, table 1, valid
+   1800 AD - 2050 AD).  Epochs are in days past J2000 (JD 2451545.0).
+
+   The Earth entry is the Earth-Moon barycenter, which is also used for
+   the Moon.  The Sun is at the origin.
+
+   For trajectory work over many epochs the states can be sampled once
+   into a binary ephemeris table (see build_table, or run this module as
+   a script) that is read through numpy.memmap and interpolated with
+   cubic Hermite polynomials.  Once a table is loaded with load_table,
+   state() answers queries within its span from the table.
+"""
+
+import sys
+import argparse
+
+from datetime import datetime
+
+import numpy as np
+
+from kepler import solve_kepler
+
+
+AU = 1.49597870700e8        # km
+
+mu_sun = 1.32712440018e11   # km^3/s^2
+
+J2000 = datetime(2000, 1, 1, 12)
+
+# a (AU), e, I, L, long. peri., long. node (deg) and their rates (per century)
+elements = {
+    'Mercury': ([0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+                [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081]),
+    'Venus':   ([0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+                [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418]),
+    'Earth':   ([1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+                [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0]),
+    'Mars':    ([1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+                [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343]),
+    'Jupiter': ([5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+                [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106]),
+    'Saturn':  ([9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+                [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794]),
+    'Uranus':  ([19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+                [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589]),
+    'Neptune': ([30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+                [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664]),
+    'Pluto':   ([39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684],
+                [-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482]),
+}
+
+
+def days_past_J2000(date):
+    """ convert a datetime to days past J2000
+    """
+    delta = date - J2000
+    return delta.days + delta.seconds / 86400.0
+
+
+# bodies in an ephemeris table, in order
+table_bodies = ('Mercury', 'Venus', 'Earth', 'Mars', 'Jupiter',
+                'Saturn', 'Uranus', 'Neptune', 'Pluto', 'Moon')
+
+header_dtype = np.dtype([
+    ('magic',  'S8'),
+    ('start',  'f8'),   # epoch of first sample (days past J2000)
+    ('step',   'f8'),   # sample interval (days)
+    ('count',  'i8'),   # number of samples per body
+    ('bodies', 'i8'),   # number of bodies
+])
+
+HEADER_SIZE = 64
+
+MAGIC = 'MAMAEPH1'
+
+_table = None
+
+
+def mean_elements(body, epoch):
+    """ mean elements of the body at the epoch(s) (days past J2000)
+        returns a (km), e, I, L, long. peri. and long. node (rad)
+    """
+    if body == 'Moon':
+        body = 'Earth'
+    values, rates = elements[body]
+    T = np.asarray(epoch, dtype=float) / 36525.0  # centuries past J2000
+    a, e, I, L, w_bar, node = [values[k] + rates[k]*T for k in range(6)]
+    return (a*AU, e, np.radians(I), np.radians(L), np.radians(w_bar), np.radians(node))
+
+
+def state(body, epoch):
+    """ heliocentric position (km) and velocity (km/s) of the body
+        at the epoch(s) (days past J2000), arrays of shape (N,3)
+    """
+    epoch = np.atleast_1d(np.asarray(epoch, dtype=float))
+    if body == 'Sun':
+        zero = np.zeros((len(epoch), 3))
+        return zero, zero.copy()
+
+    if _table is not None and _table.covers(epoch):
+        return _table.state(body, epoch)
+
+    return mean_state(body, epoch)
+
+
+def mean_state(body, epoch):
+    """ heliocentric position (km) and velocity (km/s) of the body
+        at the epoch(s) (days past J2000) from the mean elements
+    """
+    epoch = np.atleast_1d(np.asarray(epoch, dtype=float))
+
+    a, e, I, L, w_bar, node = mean_elements(body, epoch)
+    w = w_bar - node   # argument of perihelion
+    M = L - w_bar      # mean anomaly
+
+    E = solve_kepler(M, e)
+    n = np.sqrt(mu_sun / a**3)
+    Edot = n / (1 - e*np.cos(E))
+
+    # position and velocity in the orbit plane
+    b = a * np.sqrt(1 - e**2)
+    x = a * (np.cos(E) - e)
+    y = b * np.sin(E)
+    vx = -a * np.sin(E) * Edot
+    vy = b * np.cos(E) * Edot
+
+    # rotate to the ecliptic frame
+    cw, sw = np.cos(w), np.sin(w)
+    cO, sO = np.cos(node), np.sin(node)
+    cI, sI = np.cos(I), np.sin(I)
+
+    Px = cw*cO - sw*sO*cI
+    Py = cw*sO + sw*cO*cI
+    Pz = sw*sI
+    Qx = -sw*cO - cw*sO*cI
+    Qy = -sw*sO + cw*cO*cI
+    Qz = cw*sI
+
+    r = np.column_stack((x*Px + y*Qx, x*Py + y*Qy, x*Pz + y*Qz))
+    v = np.column_stack((vx*Px + vy*Qx, vx*Py + vy*Qy, vx*Pz + vy*Qz))
+
+    return r, v
+
+
+class EphemerisTable(object):
+    """ a binary ephemeris table of fixed step position and velocity
+        samples, memory-mapped so that only the samples needed to answer
+        a query are read from the file
+    """
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=header_dtype, count=1)[0]
+        if header['magic'] != MAGIC:
+            raise Exception(path, 'is not an ephemeris table')
+        self.path = path
+        self.start = float(header['start'])
+        self.step = float(header['step'])
+        self.count = int(header['count'])
+        self.stop = self.start + self.step*(self.count - 1)
+        self.data = np.memmap(path, dtype='f8', mode='r', offset=HEADER_SIZE,
+                              shape=(int(header['bodies']), self.count, 6))
+
+    def covers(self, epoch):
+        """ True if all of the epochs are within the span of the table
+        """
+        epoch = np.asarray(epoch)
+        return epoch.min() >= self.start and epoch.max() <= self.stop
+
+    def state(self, body, epoch):
+        """ heliocentric position (km) and velocity (km/s) of the body
+            at the epoch(s) (days past J2000), interpolated from the table
+        """
+        epoch = np.atleast_1d(np.asarray(epoch, dtype=float))
+        if not self.covers(epoch):
+            raise ValueError('epochs outside of ephemeris table span (%1.1f to %1.1f)'
+                             % (self.start, self.stop))
+
+        # bracketing samples and fraction of the interval
+        s = (epoch - self.start) / self.step
+        k = np.clip(np.floor(s).astype(int), 0, self.count - 2)
+        t = (s - k)[:, np.newaxis]
+        h = self.step * 86400.0  # seconds
+
+        samples = self.data[table_bodies.index(body)]
+        p0, v0 = samples[k, :3], samples[k, 3:]
+        p1, v1 = samples[k+1, :3], samples[k+1, 3:]
+
+        # cubic Hermite basis functions and their derivatives
+        t2 = t*t
+        t3 = t2*t
+        r = (2*t3 - 3*t2 + 1)*p0 + (t3 - 2*t2 + t)*h*v0 + (3*t2 - 2*t3)*p1 + (t3 - t2)*h*v1
+        v = ((6*t2 - 6*t)*p0 + (3*t2 - 4*t + 1)*h*v0 + (6*t - 6*t2)*p1 + (3*t2 - 2*t)*h*v1) / h
+
+        return r, v
+
+
+def build_table(path, start, stop, step=1.0, chunk=10000):
+    """ sample the mean element ephemeris for all table bodies from start
+        to stop (days past J2000) at the specified step (days) and write
+        the samples to a binary ephemeris table
+    """
+    count = int(np.ceil((stop - start) / step)) + 1
+
+    header = np.zeros(1, dtype=header_dtype)
+    header['magic'] = MAGIC
+    header['start'] = start
+    header['step'] = step
+    header['count'] = count
+    header['bodies'] = len(table_bodies)
+
+    with open(path, 'wb') as f:
+        f.write(header.tostring().ljust(HEADER_SIZE, '\0'))
+
+    data = np.memmap(path, dtype='f8', mode='r+', offset=HEADER_SIZE,
+                     shape=(len(table_bodies), count, 6))
+    for i, body in enumerate(table_bodies):
+        for first in range(0, count, chunk):
+            last = min(first + chunk, count)
+            r, v = mean_state(body, start + step*np.arange(first, last))
+            data[i, first:last, :3] = r
+            data[i, first:last, 3:] = v
+    data.flush()
+    del data
+
+
+def load_table(path):
+    """ use the specified ephemeris table for state() queries within its span
+        (None to go back to the mean elements)
+    """
+    global _table
+    if path is None:
+        _table = None
+    else:
+        _table = EphemerisTable(path)
+    return _table
+
+
+def main(argv=None):
+    """ command line tool to build an ephemeris table
+    """
+    parser = argparse.ArgumentParser(description='build a binary ephemeris table')
+    parser.add_argument('path', help='ephemeris table file to write')
+    parser.add_argument('--start', default='2000-01-01',
+                        help='first date in the table (YYYY-MM-DD)')
+    parser.add_argument('--stop', default='2050-01-01',
+                        help='last date in the table (YYYY-MM-DD)')
+    parser.add_argument('--step', type=float, default=1.0,
+                        help='sample interval in days')
+    args = parser.parse_args(argv)
+
+    start = days_past_J2000(datetime.strptime(args.start, '%Y-%m-%d'))
+    stop = days_past_J2000(datetime.strptime(args.stop, '%Y-%m-%d'))
+    build_table(args.path, start, stop, args.step)
+
+    print 'wrote %d samples for %d bodies to %s' % \
+        (int(np.ceil((stop - start) / args.step)) + 1, len(table_bodies), args.path)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+   events.py
+
+   Event triggers for mission phases.
+
+   A Trigger fires when a quantity of the spacecraft state crosses a
+   threshold, such as 'drop the tank when the fuel on a stage falls below
+   X', 'abort if the fuel margin falls below zero' or 'jettison the cargo
+   at MET T', and then takes an action:
+
+       drop   drop the target subsystem (its path, starting with the stage)
+       abort  skip the rest of the mission
+
+   The quantities are:
+
+       MET           mission elapsed time (days)
+       mass          wet mass of the spacecraft
+       fuel          fuel remaining on the spacecraft
+       margin        least fuel remaining on any stage (negative when a
+                     burn has drawn more fuel than the stage had)
+       fuel.<stage>  fuel remaining on the named stage
+
+   Triggers are detected against the samples of the mission timeline over
+   each phase, and their actions are taken at the end of the phase in
+   which they are detected.  The time of the event is interpolated between
+   the samples on either side of the crossing.
+
+   Detection works on arrays: the state is a dict of arrays of samples,
+   with any number of leading axes (such as a variant of a mission in a
+   batch), and all of the triggers are checked at once, so conditional
+   staging does not force a loop over the variants.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+actions = ('drop', 'abort')
+
+# sign of the difference from the threshold that triggers, and whether
+# the comparison is strict
+operators = {
+    '<':  (-1, True),
+    '<=': (-1, False),
+    '>':  (1, True),
+    '>=': (1, False),
+}
+
+
+class Trigger(namedtuple('Trigger', 'quantity operator threshold action target')):
+    """ an event trigger: take an action when a quantity of the spacecraft
+        state crosses a threshold
+    """
+
+    def __new__(cls, quantity, operator, threshold, action, target=''):
+        if operator not in operators:
+            raise Exception(quantity, 'unknown trigger operator: ' + str(operator))
+        if action not in actions:
+            raise Exception(quantity, 'unknown trigger action: ' + str(action))
+        if action == 'drop' and not target:
+            raise Exception(quantity, 'drop trigger needs a target subsystem')
+        return super(Trigger, cls).__new__(cls, quantity, operator, float(threshold),
+                                           action, target)
+
+    def __str__(self):
+        event = '%s %s %g' % (self.quantity, self.operator, self.threshold)
+        if self.target:
+            return 'when %s: %s %s' % (event, self.action, self.target)
+        return 'when %s: %s' % (event, self.action)
+
+
+def state(times, mass, fuel, stage_fuel, stage_names):
+    """ the state used to detect triggers, from sample times, mass, fuel
+        (arrays of the same shape) and fuel on each stage (with an extra
+        last axis for the stages)
+    """
+    stage_fuel = np.asarray(stage_fuel, dtype=float)
+    result = {
+        'MET':    np.asarray(times, dtype=float),
+        'mass':   np.asarray(mass, dtype=float),
+        'fuel':   np.asarray(fuel, dtype=float),
+        'margin': stage_fuel.min(axis=-1),
+    }
+    for i, name in enumerate(stage_names):
+        result['fuel.' + name] = stage_fuel[..., i]
+    return result
+
+
+def timeline_state(timeline, stage_names, beg_MET, end_MET):
+    """ the state at the samples of a mission timeline from beg_MET to
+        end_MET (inclusive)
+    """
+    times, mass, fuel, Cg = timeline.arrays()
+    window = (times >= beg_MET) & (times <= end_MET)
+    return state(times[window], mass[window], fuel[window],
+                 timeline.stage_fuel()[window], stage_names)
+
+
+def values(triggers, state):
+    """ the quantity of each trigger in the state, as an array with a
+        leading axis for the triggers
+    """
+    try:
+        quantities = [state[trigger.quantity] for trigger in triggers]
+    except KeyError, err:
+        raise Exception(triggers, 'unknown trigger quantity: ' + str(err))
+    return np.array(np.broadcast_arrays(*quantities), dtype=float)
+
+
+def detect(triggers, state):
+    """ whether each trigger is met at each sample of the state
+        returns a boolean array (triggers, ...) of the shape of the state
+    """
+    x = values(triggers, state)
+    shape = (len(triggers),) + (1,)*(x.ndim - 1)
+    threshold = np.array([t.threshold for t in triggers]).reshape(shape)
+    sign = np.array([operators[t.operator][0] for t in triggers]).reshape(shape)
+    strict = np.array([operators[t.operator][1] for t in triggers]).reshape(shape)
+
+    difference = sign*(x - threshold)
+    return np.where(strict, difference > 0, difference >= 0)
+
+
+def crossing(triggers, state):
+    """ the time each trigger is first met over the samples of the state
+        (the last axis), interpolated between the sample before and the
+        first sample at which it is met (NaN if it is not met)
+        returns an array (triggers, ...) of the shape of the state without
+        its last axis
+    """
+    met = detect(triggers, state)
+    x = values(triggers, state)
+    times = np.broadcast_arrays(state['MET'], x)[0]
+    threshold = np.array([t.threshold for t in triggers])
+    shape = x.shape[:-1]
+
+    # first sample at which each trigger is met, and the one before it
+    samples = met.shape[-1]
+    met = met.reshape(-1, samples)
+    rows = np.arange(met.shape[0])
+    j = met.argmax(axis=-1)
+    i = np.maximum(j - 1, 0)
+
+    x = x.reshape(-1, samples)
+    times = times.reshape(-1, samples)
+    threshold = np.repeat(threshold, met.shape[0] // len(triggers))
+    span = x[rows, j] - x[rows, i]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(span != 0, (threshold - x[rows, i]) / span, 1.0)
+    fraction = np.clip(fraction, 0.0, 1.0)
+
+    time = times[rows, i] + fraction*(times[rows, j] - times[rows, i])
+    time = np.where(met.any(axis=-1), time, np.nan)
+    return time.reshape(shape)
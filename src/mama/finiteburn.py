@@ -0,0 +1,318 @@
+"""
+   finiteburn.py
+
+   Finite burn gravity loss calculation.
+
+   Integrates planar powered flight (thrust along the velocity vector)
+   from the periapsis of an initial orbit until the vehicle reaches the
+   specific energy for the desired C3.  The gravity loss is the difference
+   between the delta-V actually expended (from the mass ratio) and the
+   ideal impulsive delta-V.
+
+   All cases are integrated together with a fixed step RK4 integrator,
+   with the step size for each case scaled to its estimated burn time.
+   Results are kept in an on-disk cache keyed on the quantized inputs
+   (and the version of the algorithm), so repeated trade study points are
+   not integrated again.  The cache is shared by all processes, which take
+   turns with it by holding a lock file.
+
+   The gravity loss is converged in the number of steps to better than
+   0.01 m/s.  Thrust is along the velocity vector; the losses agree with
+   the curve fits (see gravloss) to within 5% for T/W from 0.14 to 0.2,
+   but are higher at lower T/W (by 11% for one burn and 16% for two burns
+   at T/W 0.11), where the fits are extrapolated less reliably.
+"""
+
+import os
+import time
+import errno
+import shelve
+
+from math import sqrt
+
+import numpy as np
+
+
+g = 9.8062E-3  # km/s**2
+
+STEPS = 400    # integration steps per burn
+
+# change when the algorithm changes, to invalidate cached results
+version = '2'
+
+# quantization of cache keys
+precision = {
+    'TW':        4,  # decimal places
+    'Isp':       1,
+    'C3':        3,
+    'periapsis': 1,
+    'apoapsis':  1,
+}
+
+cache_dir = os.path.join(os.path.expanduser('~'), '.mama')
+
+_cache = None
+
+
+def _derivatives(r, vr, vt, m, TW, Isp, mu):
+    """ equations of motion for powered flight in polar coordinates,
+        mass is normalized to the initial mass of the burn
+    """
+    v = np.sqrt(vr**2 + vt**2)
+    a = TW * g / m
+    dr  = vr
+    dvr = vt**2/r - mu/r**2 + a*vr/v
+    dvt = -vr*vt/r + a*vt/v
+    dm  = -TW / Isp * np.ones_like(m)
+    return dr, dvr, dvt, dm
+
+
+def _step(y, h, TW, Isp, mu):
+    """ advance the state by one RK4 step of size h
+    """
+    args = [TW, Isp, mu]
+    k1 = _derivatives(*(list(y) + args))
+    k2 = _derivatives(*([y[j] + h/2*k1[j] for j in range(4)] + args))
+    k3 = _derivatives(*([y[j] + h/2*k2[j] for j in range(4)] + args))
+    k4 = _derivatives(*([y[j] + h*k3[j] for j in range(4)] + args))
+    return [y[j] + h/6*(k1[j] + 2*k2[j] + 2*k3[j] + k4[j]) for j in range(4)]
+
+
+def _burn_time(r, vr, vt, TW, Isp, mu, energy):
+    """ estimate burn time from the ideal delta-V to reach the target energy
+    """
+    v0 = np.sqrt(vr**2 + vt**2)
+    dV = np.sqrt(2*(energy + mu/r)) - v0
+    return (1 - np.exp(-dV/(Isp*g))) * Isp / TW
+
+
+def _coast(r, vr, vt, mu, t):
+    """ coast (unpowered) for the specified time, which may be negative
+    """
+    y = [r, vr, vt, np.ones_like(r)]
+    zero = np.zeros_like(r)
+    h = t / STEPS
+    for step in range(STEPS):
+        y = _step(y, h, zero, np.ones_like(r), mu)
+    return y[0], y[1], y[2]
+
+
+def _burn(r, vr, vt, TW, Isp, mu, energy):
+    """ integrate a single burn until the target specific energy is reached
+        returns the final state and the mass ratio (final/initial)
+    """
+    n = len(r)
+    m = np.ones(n)
+
+    # size the step for each case from its estimated burn time
+    E0 = (vr**2 + vt**2)/2 - mu/r
+    dt = _burn_time(r, vr, vt, TW, Isp, mu, energy) / STEPS
+
+    done = energy <= E0
+    for step in range(4*STEPS):
+        if done.all():
+            break
+        i = ~done
+        y = (r[i], vr[i], vt[i], m[i])
+        y1 = _step(y, dt[i], TW[i], Isp[i], mu[i])
+
+        # interpolate to the target energy for cases that reached it this step
+        E_old = (y[1]**2 + y[2]**2)/2 - mu[i]/y[0]
+        E_new = (y1[1]**2 + y1[2]**2)/2 - mu[i]/y1[0]
+        crossed = E_new >= energy[i]
+        frac = np.where(crossed, (energy[i] - E_old) / (E_new - E_old), 1.0)
+        y1 = [y[j] + frac*(y1[j] - y[j]) for j in range(4)]
+
+        r[i], vr[i], vt[i], m[i] = y1
+        done[np.flatnonzero(i)[crossed]] = True
+
+    if not done.all():
+        raise Exception('finite burn did not reach the target energy in %d steps '
+                        'for %d of %d cases' % (4*STEPS, (~done).sum(), n))
+
+    return r, vr, vt, m
+
+
+def integrate(mu, r_p, v_p, TW, Isp, C3, burns=1):
+    """ calculate gravity loss (m/s) for finite burn departures,
+        all arguments (except burns) are broadcast against each other
+
+        mu  - gravitational parameter of body (km^3/s^2)
+        r_p - periapsis radius of initial orbit (km)
+        v_p - velocity at periapsis of initial orbit (km/s)
+        TW  - initial thrust to weight (Earth g's)
+        Isp - specific impulse (s)
+        C3  - departure C3 (km^2/s^2)
+
+        for multiple burns the energy change is split evenly between
+        burns, with a Keplerian coast back to periapsis between burns
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in (mu, r_p, v_p, TW, Isp, C3)])
+    shape = arrays[0].shape
+    mu, r_p, v_p, TW, Isp, C3 = [a.ravel() for a in arrays]
+
+    r  = r_p.copy()
+    vr = np.zeros_like(r)
+    vt = v_p.copy()
+
+    E0 = v_p**2/2 - mu/r_p
+    Ef = C3/2
+    mass_ratio = np.ones_like(r)
+
+    for burn in range(1, burns+1):
+        energy = E0 + (Ef - E0) * burn / burns
+        TW_burn = TW / mass_ratio  # thrust to weight at start of this burn
+
+        # start the burn early so that it is centered on periapsis
+        t_burn = _burn_time(r, vr, vt, TW_burn, Isp, mu, energy)
+        r, vr, vt = _coast(r, vr, vt, mu, -t_burn/2)
+
+        r, vr, vt, m = _burn(r, vr, vt, TW_burn, Isp, mu, energy)
+        mass_ratio = mass_ratio * m
+
+        if burn < burns:
+            # coast back to periapsis of the intermediate orbit
+            h = r * vt
+            E = (vr**2 + vt**2)/2 - mu/r
+            e = np.sqrt(1 + 2*E*h**2/mu**2)
+            r = h**2 / mu / (1 + e)
+            vr = np.zeros_like(r)
+            vt = h / r
+
+    dV_ideal = np.sqrt(C3 + 2*mu/r_p) - v_p
+    dV_actual = Isp * g * np.log(1/mass_ratio)
+
+    g_loss = (dV_actual - dV_ideal) * 1000
+    return g_loss.reshape(shape)
+
+
+class GravityLossCache(object):
+    """ on-disk cache of finite burn gravity losses,
+        keyed on the body, number of burns and quantized inputs
+
+        the cache is only opened while a lock file is held, so it can be
+        shared by processes (such as those of serialize.run)
+    """
+
+    def __init__(self, path=None, timeout=60.0):
+        if path is None:
+            path = os.path.join(cache_dir, 'gravloss')
+        self.path = path
+        self.timeout = timeout
+
+    def key(self, body, burns, TW, Isp, C3, periapsis, apoapsis):
+        return '%s|%s|%d|%.*f|%.*f|%.*f|%.*f|%.*f' % (version, body, burns,
+            precision['TW'], TW, precision['Isp'], Isp, precision['C3'], C3,
+            precision['periapsis'], periapsis, precision['apoapsis'], apoapsis)
+
+    def lock(self):
+        """ take the lock file, breaking it if it is older than the timeout
+            (left by a process that died holding it)
+        """
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                pass
+        lock = self.path + '.lock'
+        while True:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except OSError, err:
+                if err.errno != errno.EEXIST:
+                    raise
+            try:
+                if time.time() - os.path.getmtime(lock) > self.timeout:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.01)
+
+    def unlock(self):
+        try:
+            os.remove(self.path + '.lock')
+        except OSError:
+            pass
+
+    def lookup(self, keys):
+        """ get the cached values for a list of keys (None if not cached)
+        """
+        self.lock()
+        try:
+            db = shelve.open(self.path)
+            try:
+                return [db.get(key) for key in keys]
+            finally:
+                db.close()
+        finally:
+            self.unlock()
+
+    def get(self, key):
+        return self.lookup([key])[0]
+
+    def put(self, values):
+        self.lock()
+        try:
+            db = shelve.open(self.path)
+            try:
+                db.update(values)
+            finally:
+                db.close()
+        finally:
+            self.unlock()
+
+
+def get_cache():
+    """ get the default gravity loss cache
+    """
+    global _cache
+    if _cache is None:
+        _cache = GravityLossCache()
+    return _cache
+
+
+def gravity_loss(orbit, TW, Isp, C3, burns=1, cache=None):
+    """ calculate gravity loss (m/s) for departure from the specified orbit,
+        TW, Isp and C3 may be scalars or arrays
+
+        inputs are quantized (see precision) and looked up in the cache,
+        only the cases that are not already cached are integrated
+    """
+    if cache is None:
+        cache = get_cache()
+
+    TW, Isp, C3 = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in (TW, Isp, C3)])
+    shape = TW.shape
+    TW  = np.round(TW.ravel(),  precision['TW'])
+    Isp = np.round(Isp.ravel(), precision['Isp'])
+    C3  = np.round(C3.ravel(),  precision['C3'])
+
+    periapsis = round(min(orbit.periapsis, orbit.apoapsis), precision['periapsis'])
+    apoapsis  = round(max(orbit.periapsis, orbit.apoapsis), precision['apoapsis'])
+
+    keys = [cache.key(orbit.body, burns, TW[i], Isp[i], C3[i], periapsis, apoapsis)
+            for i in range(len(TW))]
+
+    g_loss = np.empty(len(TW))
+    missing = []
+    for i, value in enumerate(cache.lookup(keys)):
+        if value is None:
+            missing.append(i)
+        else:
+            g_loss[i] = value
+
+    if missing:
+        Mu = orbit.body_gravity()
+        R = orbit.body_radius()
+        r_p = R + periapsis
+        a = R + (periapsis + apoapsis) / 2
+        v_p = sqrt(Mu * (2/r_p - 1/a))
+
+        missing = np.array(missing)
+        g_loss[missing] = integrate(Mu, r_p, v_p, TW[missing], Isp[missing], C3[missing], burns)
+        cache.put(dict((keys[i], float(g_loss[i])) for i in missing))
+
+    return g_loss.reshape(shape)
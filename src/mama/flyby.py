@@ -0,0 +1,110 @@
+"""
+   flyby.py
+
+   Patched conic gravity assists.
+
+   A flyby turns the hyperbolic excess velocity (Vinf) relative to a body.
+   When the incoming and outgoing Vinf differ in magnitude, or the turn is
+   more than the body can provide on its own, a powered flyby makes up the
+   difference with an impulse at periapsis.  The periapsis radius is found
+   from the turn angle, by bisection for arrays of flybys at once.
+
+   Flyby sequences are scored by solving the Lambert problem for each leg
+   over arrays of encounter epochs.
+
+   Units are km, km/s and days past J2000.
+"""
+
+import numpy as np
+
+import ephemeris
+import lambert
+import orbit
+
+
+ITERATIONS = 60  # bisection iterations on log(periapsis radius)
+
+
+def turn_angle(vinf_in, vinf_out):
+    """ angle (rad) between incoming and outgoing Vinf vectors (N,3)
+    """
+    vinf_in = np.atleast_2d(np.asarray(vinf_in, dtype=float))
+    vinf_out = np.atleast_2d(np.asarray(vinf_out, dtype=float))
+    vi = np.sqrt((vinf_in**2).sum(axis=1))
+    vo = np.sqrt((vinf_out**2).sum(axis=1))
+    return np.arccos(np.clip((vinf_in*vinf_out).sum(axis=1) / (vi*vo), -1.0, 1.0))
+
+
+def powered_flyby(mu, R, vinf_in, vinf_out):
+    """ powered flyby of a body with gravitational parameter mu and radius R
+        with incoming and outgoing Vinf vectors (N,3)
+
+        returns the delta-V of the impulse at periapsis and the periapsis
+        altitude that provides the turn (below zero if the turn can not be
+        made without hitting the body)
+    """
+    vinf_in = np.atleast_2d(np.asarray(vinf_in, dtype=float))
+    vinf_out = np.atleast_2d(np.asarray(vinf_out, dtype=float))
+    vi2 = (vinf_in**2).sum(axis=1)
+    vo2 = (vinf_out**2).sum(axis=1)
+    delta = turn_angle(vinf_in, vinf_out)
+
+    # the turn provided by the incoming and outgoing hyperbolas decreases
+    # with periapsis radius, bisect for the radius that gives delta
+    lo = np.log(R * 1e-3) * np.ones_like(delta)
+    hi = np.log(R * 1e4) * np.ones_like(delta)
+    for i in range(ITERATIONS):
+        rp = np.exp((lo + hi) / 2)
+        turn = np.arcsin(1 / (1 + rp*vi2/mu)) + np.arcsin(1 / (1 + rp*vo2/mu))
+        too_low = turn > delta
+        lo = np.where(too_low, np.log(rp), lo)
+        hi = np.where(too_low, hi, np.log(rp))
+    rp = np.exp((lo + hi) / 2)
+
+    dV = np.abs(np.sqrt(vo2 + 2*mu/rp) - np.sqrt(vi2 + 2*mu/rp))
+    return dV, rp - R
+
+
+def body_flyby(body, vinf_in, vinf_out):
+    """ powered flyby of the named body
+    """
+    return powered_flyby(orbit.body_gravity(body), orbit.BODY_RADIUS[body], vinf_in, vinf_out)
+
+
+def sequence(bodies, epochs, min_altitude=0.0):
+    """ score flyby sequences through the list of bodies, for rows of
+        encounter epochs (N, len(bodies)) in days past J2000
+
+        returns the departure C3, the total powered flyby delta-V, the
+        arrival Vinf and the flyby periapsis altitudes (N, len(bodies)-2).
+        Sequences with a flyby below min_altitude (km) or with encounters
+        out of order have a NaN flyby delta-V.
+    """
+    epochs = np.atleast_2d(np.asarray(epochs, dtype=float))
+    count = len(epochs)
+
+    states = [ephemeris.state(body, epochs[:, k]) for k, body in enumerate(bodies)]
+
+    # Lambert solutions for each leg
+    legs = []
+    valid = np.ones(count, dtype=bool)
+    for k in range(len(bodies) - 1):
+        tof = (epochs[:, k+1] - epochs[:, k]) * 86400.0
+        valid &= tof > 0
+        legs.append(lambert.solve(states[k][0], states[k+1][0], np.where(tof > 0, tof, 1.0)))
+
+    C3 = ((legs[0][0] - states[0][1])**2).sum(axis=1)
+    Vinf = np.sqrt(((legs[-1][1] - states[-1][1])**2).sum(axis=1))
+
+    flyby_dV = np.zeros(count)
+    altitudes = np.zeros((count, len(bodies) - 2))
+    for k in range(1, len(bodies) - 1):
+        v_body = states[k][1]
+        dV, altitudes[:, k-1] = body_flyby(bodies[k], legs[k-1][1] - v_body, legs[k][0] - v_body)
+        flyby_dV += dV
+        valid &= altitudes[:, k-1] >= min_altitude
+
+    C3[~valid] = np.nan
+    Vinf[~valid] = np.nan
+    flyby_dV[~valid] = np.nan
+    return C3, flyby_dV, Vinf, altitudes
@@ -0,0 +1,133 @@
+"""
+   gravloss.py
+
+   Gravity loss curve fits, stored as a single coefficient table.
+
+   Each data set is a family of quintic fits in thrust-to-weight (T/W)
+   for the four terms m1, b1, m2, b2 where:
+
+       m = m1 * r + b1
+       b = m2 * r + b2
+       gravity loss (m/s) = m * C3 + b
+
+   r is the radius of the (circular) departure orbit in km and C3 is the
+   departure C3 in km^2/s^2.
+
+   The table is kept in a binary file (data/gravloss.npy) with shape
+   (DATA_SETS, 4, ORDER+1), coefficients ordered highest power first as
+   for numpy.polyval.  Data sets for which no fit is available are NaN.
+   The file is memory-mapped on first use; it can be regenerated from the
+   coefficients below with:
+
+       python -m mama.gravloss
+"""
+
+import os
+
+import numpy as np
+
+
+DATA_SETS = 16
+
+ORDER = 5
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'gravloss.npy')
+
+# data set descriptions
+descriptions = {
+    1: 'one burn departure from circular Earth orbit, Isp of 900s',
+    2: 'two burn departure from circular Earth orbit, Isp of 900s',
+}
+
+# fit coefficients for each data set (m1, b1, m2, b2), highest power first
+coefficients = {
+    1: [[-0.001780493, -0.022793191, +0.077236216, -0.088317529, +0.044187306, -0.008675645],
+        [-373.5457107, +1416.037449, -2123.882421, +1586.194924, -600.5083743, +96.9251525],
+        [+5.236463124, -17.13945421, +21.76682131, -13.46112409, +4.118567455, -0.524766446],
+        [-46715.84466, +152665.0942, -193425.3839, +119181.2715, -36249.91164, +4573.564918]],
+
+    2: [[+0.065289684, -0.212965428, +0.268721507, -0.164266201, +0.049233822, -0.0060403],
+        [-609.7173222, +1985.167045, -2499.028265, +1522.748139, -454.2432999, +55.31565955],
+        [+2.310083708, -7.485235246, +9.36476806,  -5.658397,    +1.666878713, -0.198921842],
+        [-19557.5509, +63349.30543, -79217.25722, +47829.47535, -14073.25171, +1676.106499]],
+}
+
+_table = None
+
+
+def build_table():
+    """ build the coefficient table from the coefficients defined above
+    """
+    table = np.empty((DATA_SETS, 4, ORDER+1))
+    table.fill(np.nan)
+    for data_set, coefs in coefficients.items():
+        table[data_set-1] = coefs
+    return table
+
+
+def write_table(path=DATA_FILE):
+    """ write the coefficient table to a binary data file
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    np.save(path, build_table())
+
+
+def get_table():
+    """ get the coefficient table, memory-mapping the data file on first use
+        (falls back to building the table in memory if there is no data file)
+    """
+    global _table
+    if _table is None:
+        if os.path.exists(DATA_FILE):
+            _table = np.load(DATA_FILE, mmap_mode='r')
+        else:
+            _table = build_table()
+    return _table
+
+
+def has_data_set(data_set):
+    """ True if a fit is available for the specified data set (1-16)
+    """
+    if data_set < 1 or data_set > DATA_SETS:
+        return False
+    return not np.isnan(get_table()[data_set-1]).any()
+
+
+def gravity_loss(data_set, TW, r, C3):
+    """ calculate gravity loss (m/s) using the specified data set(s)
+
+        all arguments may be scalars or arrays, which are broadcast
+        against each other so that an entire sweep can be evaluated in
+        a single call
+    """
+    data_set = np.asarray(data_set, dtype=int)
+    TW = np.asarray(TW, dtype=float)
+
+    # data sets are numbered from 1, and not all of them have a fit
+    missing = (data_set < 1) | (data_set > DATA_SETS)
+    if not missing.any():
+        missing = np.isnan(get_table()[data_set-1]).any(axis=-1).any(axis=-1)
+    if missing.any():
+        raise ValueError('no gravity loss fit for data set(s) %s'
+                         % sorted(set(np.atleast_1d(data_set[missing]).tolist())))
+
+    # evaluate all four fits at once using Horner's method,
+    # the result has the broadcast shape of data_set and TW plus (4,)
+    coefs = get_table()[data_set-1]
+    acc = np.zeros(np.broadcast(data_set, TW).shape + (4,))
+    for k in range(ORDER+1):
+        acc = acc * TW[..., np.newaxis] + coefs[..., k]
+
+    m1, b1, m2, b2 = [acc[..., i] for i in range(4)]
+
+    m = m1 * r + b1
+    b = m2 * r + b2
+    g_loss = m * C3 + b
+
+    return g_loss
+
+
+if __name__ == '__main__':
+    write_table()
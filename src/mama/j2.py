@@ -0,0 +1,71 @@
+"""
+   j2.py
+
+   Secular J2 (oblateness) perturbations.
+
+   Over many revolutions the oblateness of the central body causes the
+   right ascension of the ascending node (RAAN) to regress and the
+   argument of periapsis to rotate, at constant rates that depend only on
+   the size, shape and inclination of the orbit.  The drift of the node
+   turns the orbit plane away from its initial orientation, which must be
+   paid for with a plane change later in the mission.
+
+   All functions accept arrays of orbits and durations.  Altitudes are in
+   km, angles in degrees and durations in days.
+"""
+
+import numpy as np
+
+
+def rates(mu, R, J2, periapsis, apoapsis, inclination):
+    """ secular rates of the RAAN and argument of periapsis (deg/day) for
+        orbits with the specified periapsis and apoapsis altitudes and
+        inclination about a body with gravitational parameter mu, radius R
+        and oblateness J2
+    """
+    r_p = R + np.minimum(periapsis, apoapsis)
+    r_a = R + np.maximum(periapsis, apoapsis)
+    a = (r_p + r_a) / 2
+    e = (r_a - r_p) / (r_a + r_p)
+    p = a * (1 - e**2)  # semi-latus rectum
+    n = np.sqrt(mu / a**3)
+    i = np.radians(inclination)
+
+    k = n * J2 * (R / p)**2 * 86400 * 180/np.pi
+    raan_rate = -1.5 * k * np.cos(i)
+    arg_periapsis_rate = 0.75 * k * (5*np.cos(i)**2 - 1)
+    return raan_rate, arg_periapsis_rate
+
+
+def plane_angle(inclination1, raan1, inclination2, raan2):
+    """ angle between two orbit planes (deg)
+    """
+    i1, i2 = np.radians(inclination1), np.radians(inclination2)
+    dRAAN = np.radians(np.asarray(raan2) - np.asarray(raan1))
+    cos_angle = np.cos(i1)*np.cos(i2) + np.sin(i1)*np.sin(i2)*np.cos(dRAAN)
+    return np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
+
+def drift(mu, R, J2, periapsis, apoapsis, inclination, duration, raan=0.0):
+    """ change in RAAN and argument of periapsis (deg) over the duration
+        (days), and the plane change (deg) needed to restore the original
+        orbit plane (with the specified initial RAAN)
+    """
+    raan_rate, arg_periapsis_rate = rates(mu, R, J2, periapsis, apoapsis, inclination)
+    dRAAN = raan_rate * duration
+    dArgP = arg_periapsis_rate * duration
+    return dRAAN, dArgP, plane_angle(inclination, raan, inclination, raan + dRAAN)
+
+
+def orbit_drift(orbit, duration):
+    """ drift of the specified Orbit over the duration (days), which may be
+        an array.  Returns the change in RAAN and argument of periapsis (deg),
+        the plane change penalty (deg) and the delta-V to make that plane
+        change at apoapsis (km/s)
+    """
+    apoapsis = max(orbit.apoapsis, orbit.periapsis)
+    dRAAN, dArgP, angle = drift(orbit.body_gravity(), orbit.body_radius(), orbit.body_J2(),
+                                orbit.periapsis, orbit.apoapsis, orbit.inclination,
+                                np.asarray(duration, dtype=float), orbit.raan)
+    dV = 2 * orbit.velocity(apoapsis) * np.sin(np.radians(angle) / 2)
+    return dRAAN, dArgP, angle, dV
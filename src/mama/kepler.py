@@ -0,0 +1,120 @@
+"""
+   kepler.py
+
+   Two-body propagation of an orbit by solving Kepler's equation.
+
+   Kepler's equation (M = E - e sin E) is solved for all epochs at once
+   with batched Newton (Halley) iterations over numpy arrays.  Positions and
+   velocities are in km and km/s in the inertial frame of the body, with
+   the orbit oriented by its RAAN, inclination and argument of periapsis
+   (with both angles zero the x axis is toward periapsis and the orbit is
+   inclined about the x axis).
+"""
+
+import numpy as np
+
+
+def solve_kepler(M, e, tol=1e-12, max_iter=30):
+    """ solve Kepler's equation for eccentric anomaly (elliptic orbits)
+        M and e may be scalars or arrays
+    """
+    M = np.remainder(np.asarray(M, dtype=float), 2*np.pi)
+    e = np.asarray(e, dtype=float)
+
+    # starting guess (Danby) that converges for all eccentricities
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    for i in range(max_iter):
+        esinE = e*np.sin(E)
+        ecosE = e*np.cos(E)
+        f = E - esinE - M
+        # Halley's method
+        dE = f / (1 - ecosE - 0.5*f*esinE/(1 - ecosE))
+        E = E - dE
+        if np.abs(dE).max() < tol:
+            break
+    return E
+
+
+def true_anomaly(E, e):
+    """ true anomaly from eccentric anomaly
+    """
+    return 2 * np.arctan2(np.sqrt(1+e)*np.sin(E/2), np.sqrt(1-e)*np.cos(E/2))
+
+
+def propagate(mu, a, e, t, i=0.0, M0=0.0, raan=0.0, arg_periapsis=0.0):
+    """ position, velocity and true anomaly at times t (s)
+
+        mu   - gravitational parameter (km^3/s^2)
+        a    - semi-major axis (km)
+        e    - eccentricity
+        i    - inclination (deg)
+        M0   - mean anomaly at t=0 (rad), zero for periapsis
+        raan - right ascension of the ascending node (deg)
+        arg_periapsis - argument of periapsis (deg)
+
+        returns r (N,3), v (N,3) and true anomaly (N) in radians
+    """
+    t = np.asarray(t, dtype=float)
+    n = np.sqrt(mu / a**3)  # mean motion
+
+    E = solve_kepler(M0 + n*t, e)
+    cosE = np.cos(E)
+    sinE = np.sin(E)
+    b = a * np.sqrt(1 - e**2)
+
+    # position and velocity in the orbit plane
+    x = a * (cosE - e)
+    y = b * sinE
+    Edot = n / (1 - e*cosE)
+    vx = -a * sinE * Edot
+    vy = b * cosE * Edot
+
+    # rotate the orbit plane by the argument of periapsis, inclination
+    # and RAAN, P toward periapsis and Q 90 degrees ahead of it
+    ci, si = np.cos(np.radians(i)), np.sin(np.radians(i))
+    cO, sO = np.cos(np.radians(raan)), np.sin(np.radians(raan))
+    cw, sw = np.cos(np.radians(arg_periapsis)), np.sin(np.radians(arg_periapsis))
+    P = np.array([cO*cw - sO*sw*ci, sO*cw + cO*sw*ci, sw*si])
+    Q = np.array([-cO*sw - sO*cw*ci, -sO*sw + cO*cw*ci, cw*si])
+    r = np.outer(x, P) + np.outer(y, Q)
+    v = np.outer(vx, P) + np.outer(vy, Q)
+
+    nu = true_anomaly(E, e)
+
+    return r, v, nu
+
+
+def elements(orbit):
+    """ gravitational parameter, semi-major axis and eccentricity
+        for the specified Orbit
+    """
+    R = orbit.body_radius()
+    r_p = R + min(orbit.apoapsis, orbit.periapsis)
+    r_a = R + max(orbit.apoapsis, orbit.periapsis)
+    a = (r_p + r_a) / 2
+    e = (r_a - r_p) / (r_a + r_p)
+    return orbit.body_gravity(), a, e
+
+
+def propagate_orbit(orbit, duration, samples=100):
+    """ propagate the specified Orbit from periapsis over the duration (s)
+
+        returns t (s), r (km), v (km/s) and true anomaly (rad)
+        at the specified number of evenly spaced samples
+    """
+    mu, a, e = elements(orbit)
+    t = np.linspace(0.0, duration, samples)
+    r, v, nu = propagate(mu, a, e, t, orbit.inclination,
+                         raan=orbit.raan, arg_periapsis=orbit.arg_periapsis)
+    return t, r, v, nu
+
+
+def in_shadow(r, R, sun=(1.0, 0.0, 0.0)):
+    """ True for positions r (N,3) in the cylindrical shadow of a body
+        of radius R, with the sun in the direction specified
+    """
+    sun = np.asarray(sun, dtype=float)
+    sun = sun / np.sqrt(np.dot(sun, sun))
+    along = np.dot(r, sun)
+    perp = np.sqrt(np.maximum((r**2).sum(axis=1) - along**2, 0.0))
+    return (along < 0) & (perp < R)
@@ -0,0 +1,180 @@
+"""
+   lambert.py
+
+   Lambert solver and porkchop plot generator.
+
+   The Lambert problem is solved with the universal variable formulation
+   (Bate, Mueller & White; Curtis, algorithm 5.2) for zero revolution
+   prograde transfers.  The universal variable is found by Newton's
+   method safeguarded by bisection, for every transfer in a grid at once.
+
+   Porkchop grids of departure C3 and arrival Vinf are computed over
+   departure and arrival epochs (days past J2000) using the mean element
+   ephemeris, and large grids are split by departure epoch across a pool
+   of processes.  The resulting C3 and Vinf grids can be passed to
+   Maneuver.dV_for_C3 to map maneuver delta-V over the launch window.
+"""
+
+import multiprocessing
+
+import numpy as np
+
+import ephemeris
+
+
+ITERATIONS = 50             # maximum iterations
+
+TOLERANCE = 1e-10           # convergence tolerance on the universal variable
+
+PARALLEL_THRESHOLD = 250000  # grid size above which a process pool is used
+
+
+def stumpff(z):
+    """ Stumpff functions C(z) and S(z)
+    """
+    z = np.asarray(z, dtype=float)
+    C = 0.5 - z/24
+    S = 1.0/6 - z/120
+
+    pos = z > 1e-8
+    sz = np.sqrt(z[pos])
+    C[pos] = (1 - np.cos(sz)) / z[pos]
+    S[pos] = (sz - np.sin(sz)) / sz**3
+
+    neg = z < -1e-8
+    sz = np.sqrt(-z[neg])
+    C[neg] = (np.cosh(sz) - 1) / -z[neg]
+    S[neg] = (np.sinh(sz) - sz) / sz**3
+
+    return C, S
+
+
+def solve(r1, r2, tof, mu=ephemeris.mu_sun):
+    """ solve Lambert's problem for prograde (about +z) transfers
+
+        r1, r2 - position vectors (N,3) in km
+        tof    - time of flight (N) in seconds
+        mu     - gravitational parameter (km^3/s^2)
+
+        returns velocities v1, v2 (N,3) in km/s
+    """
+    r1 = np.atleast_2d(np.asarray(r1, dtype=float))
+    r2 = np.atleast_2d(np.asarray(r2, dtype=float))
+    tof = np.atleast_1d(np.asarray(tof, dtype=float))
+
+    R1 = np.sqrt((r1**2).sum(axis=1))
+    R2 = np.sqrt((r2**2).sum(axis=1))
+
+    # transfer angle, prograde with respect to the z axis
+    cos_dtheta = np.clip((r1*r2).sum(axis=1) / (R1*R2), -1.0, 1.0)
+    cross_z = r1[:, 0]*r2[:, 1] - r1[:, 1]*r2[:, 0]
+    dtheta = np.where(cross_z >= 0, np.arccos(cos_dtheta), 2*np.pi - np.arccos(cos_dtheta))
+
+    A = np.sin(dtheta) * np.sqrt(R1*R2 / (1 - cos_dtheta))
+    sqrt_mu = np.sqrt(mu)
+
+    # the time of flight equation F(z) is increasing in z, find its root
+    # with Newton's method, falling back to bisection of the bracket
+    # whenever a Newton step leaves it
+    z_lo = -100.0 * np.ones_like(tof)
+    z_hi = 4*np.pi**2 * np.ones_like(tof) - 1e-6
+    z = np.zeros_like(tof)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(ITERATIONS):
+            C, S = stumpff(z)
+            y = R1 + R2 + A * (z*S - 1) / np.sqrt(C)
+            F = (y/C)**1.5 * S + A*np.sqrt(y) - sqrt_mu*tof
+
+            low = (y < 0) | (F < 0)
+            z_lo = np.where(low, z, z_lo)
+            z_hi = np.where(low, z_hi, z)
+
+            dF = np.where(np.abs(z) > 1e-8,
+                (y/C)**1.5 * ((C - 1.5*S/C)/(2*z) + 0.75*S**2/C)
+                    + A/8 * (3*S/C*np.sqrt(y) + A*np.sqrt(C/y)),
+                np.sqrt(2)/40 * y**1.5 + A/8 * (np.sqrt(y) + A*np.sqrt(0.5/y)))
+            z_new = z - F/dF
+
+            bisect = ~((z_new > z_lo) & (z_new < z_hi)) | (y < 0)
+            z_new = np.where(bisect, (z_lo + z_hi)/2, z_new)
+            converged = np.abs(z_new - z) < TOLERANCE
+            z = z_new
+            if converged.all():
+                break
+
+    C, S = stumpff(z)
+    y = R1 + R2 + A * (z*S - 1) / np.sqrt(C)
+    f = 1 - y/R1
+    g = A * np.sqrt(y/mu)
+    gdot = 1 - y/R2
+
+    v1 = (r2 - f[:, np.newaxis]*r1) / g[:, np.newaxis]
+    v2 = (gdot[:, np.newaxis]*r2 - r1) / g[:, np.newaxis]
+
+    return v1, v2
+
+
+def _porkchop_rows(args):
+    """ compute porkchop grid rows for a set of departure epochs
+    """
+    departure_body, arrival_body, departure_epochs, arrival_epochs = args
+
+    r_dep, v_dep = ephemeris.state(departure_body, departure_epochs)
+    r_arr, v_arr = ephemeris.state(arrival_body, arrival_epochs)
+
+    n_dep = len(departure_epochs)
+    n_arr = len(arrival_epochs)
+    i, j = [a.ravel() for a in np.meshgrid(np.arange(n_dep), np.arange(n_arr), indexing='ij')]
+
+    tof = (arrival_epochs[j] - departure_epochs[i]) * 86400.0
+    C3 = np.empty(n_dep*n_arr)
+    C3.fill(np.nan)
+    Vinf = C3.copy()
+
+    valid = tof > 0
+    if valid.any():
+        i, j = i[valid], j[valid]
+        v1, v2 = solve(r_dep[i], r_arr[j], tof[valid])
+        C3[valid] = ((v1 - v_dep[i])**2).sum(axis=1)
+        Vinf[valid] = np.sqrt(((v2 - v_arr[j])**2).sum(axis=1))
+
+    return C3.reshape(n_dep, n_arr), Vinf.reshape(n_dep, n_arr)
+
+
+def porkchop(departure_body, arrival_body, departure_epochs, arrival_epochs, processes=None):
+    """ departure C3 (km^2/s^2) and arrival Vinf (km/s) for transfers
+        between two bodies over a grid of departure and arrival epochs
+        (days past J2000), grids have shape (departures, arrivals)
+        and are NaN where the arrival is not after the departure
+
+        grids larger than PARALLEL_THRESHOLD are computed in a pool
+        of processes (processes=None uses all cores, 1 disables)
+    """
+    departure_epochs = np.atleast_1d(np.asarray(departure_epochs, dtype=float))
+    arrival_epochs = np.atleast_1d(np.asarray(arrival_epochs, dtype=float))
+
+    size = len(departure_epochs) * len(arrival_epochs)
+    if processes == 1 or size < PARALLEL_THRESHOLD:
+        return _porkchop_rows((departure_body, arrival_body, departure_epochs, arrival_epochs))
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    chunks = np.array_split(departure_epochs, min(processes*4, len(departure_epochs)))
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(_porkchop_rows,
+            [(departure_body, arrival_body, chunk, arrival_epochs) for chunk in chunks])
+    finally:
+        pool.close()
+        pool.join()
+
+    C3 = np.concatenate([result[0] for result in results])
+    Vinf = np.concatenate([result[1] for result in results])
+    return C3, Vinf
+
+
+def total_dV(departure, arrival, C3, Vinf):
+    """ total delta-V (km/s) for a departure and an arrival maneuver
+        over porkchop grids of departure C3 and arrival Vinf
+    """
+    return np.abs(departure.dV_for_C3(C3)) + np.abs(arrival.dV_for_C3(Vinf**2))
@@ -0,0 +1,91 @@
+"""
+   ledger.py
+
+   Resource ledger of a spacecraft.
+
+   The ledger keeps the mass of each resource on each stage of a spacecraft
+   in an array with a row per stage and a column per resource:
+
+       fuel         main propulsion fuel
+       prop         RCS propellant
+       consumables  net crew consumables (provisions carried at the start
+                    are part of the fixed mass, so this is zero or negative)
+       cargo        expendable (IExpendable) subsystems
+       fixed        everything else, plus any mass dropped or picked up
+
+   It is opened with the masses of an executed spacecraft, after which every
+   change to the resources of a stage is posted to it as a credit or debit,
+   and the wet mass of each stage (and of the spacecraft) is the sum of its
+   row (and of the array) rather than a roll-up of the subsystem tree.
+   Credits and debits take arrays of stages and amounts, so changes to
+   many stages are posted at once.
+"""
+
+import numpy as np
+
+from subsystems import IExpendable
+
+
+resources = ('fuel', 'prop', 'consumables', 'cargo', 'fixed')
+
+
+class Ledger(object):
+    """ mass of each resource on each stage of a spacecraft
+    """
+
+    def __init__(self, stages, balance=None):
+        self.stages = tuple(stages)
+        if balance is None:
+            balance = np.zeros((len(self.stages), len(resources)))
+        self.balance = np.array(balance, dtype=float).reshape(len(self.stages), len(resources))
+
+    @classmethod
+    def open(cls, spacecraft):
+        """ a ledger with the current masses of an (executed) spacecraft
+        """
+        ledger = cls([stage.name for stage in spacecraft.stages])
+        for i, stage in enumerate(spacecraft.stages):
+            fuel = stage.get_fuel()
+            prop = stage.get_prop()
+            cargo = sum([stage.get(name).wet_mass for name in stage.get_children(IExpendable)])
+            ledger.balance[i] = (fuel, prop, 0.0, cargo, stage.wet_mass - fuel - prop - cargo)
+        return ledger
+
+    def index(self, stage):
+        """ index of a stage given its index or name
+        """
+        if isinstance(stage, basestring):
+            return self.stages.index(stage)
+        return stage
+
+    def column(self, resource):
+        return resources.index(resource)
+
+    def credit(self, stage, resource, amount):
+        """ add an amount of a resource to a stage (or to each of an
+            array of stages)
+        """
+        np.add.at(self.balance[:, self.column(resource)], self.index(stage), amount)
+
+    def debit(self, stage, resource, amount):
+        """ remove an amount of a resource from a stage (or from each of
+            an array of stages)
+        """
+        self.credit(stage, resource, -np.asarray(amount, dtype=float))
+
+    def get(self, stage, resource):
+        return float(self.balance[self.index(stage), self.column(resource)])
+
+    def stage_wet_mass(self, stage=None):
+        """ wet mass of a stage (or of each stage)
+        """
+        wet = self.balance.sum(axis=1)
+        if stage is None:
+            return wet
+        return float(wet[self.index(stage)])
+
+    def wet_mass(self):
+        return float(self.balance.sum())
+
+    def copy(self):
+        return Ledger(self.stages, self.balance)
@@ -0,0 +1,47 @@
+"""
+   lowthrust.py
+
+   Low-thrust spirals between circular orbits (Edelbaum).
+
+   The delta-V of a continuous thrust spiral between circular orbits with
+   an inclination change is given by Edelbaum's approximation.  With
+   constant thrust and Isp the mass flow rate is constant, so the final
+   mass follows from the rocket equation and the trip time is the
+   propellant mass divided by the mass flow rate.  All functions accept
+   arrays, so many thrust and power levels can be evaluated at once.
+
+   Units are km/s, kg, kN (thrust), kW (power) and seconds.
+"""
+
+from math import pi
+
+import numpy as np
+
+
+g = 9.8062E-3  # gravitational constant (km/s^2), as used by Spacecraft.burn
+
+
+def edelbaum(V0, V1, di):
+    """ delta-V for a low-thrust spiral between circular orbits with
+        velocities V0 and V1 and an inclination change of di (radians)
+    """
+    V0, V1, di = [np.asarray(x, dtype=float) for x in (V0, V1, di)]
+    return np.sqrt(V0**2 + V1**2 - 2*V0*V1*np.cos(pi/2 * di))
+
+
+def power_limited_thrust(power, Isp, efficiency=0.6):
+    """ thrust (kN) of an electric thruster with the specified input
+        power (kW), Isp (s) and efficiency, F = 2 eta P / (Isp g)
+    """
+    power, Isp, efficiency = [np.asarray(x, dtype=float) for x in (power, Isp, efficiency)]
+    return 2 * efficiency * power / (Isp * g) / 1000
+
+
+def spiral(dV, mass, thrust, Isp):
+    """ final mass (kg) and trip time (s) for a constant thrust spiral
+        with the specified delta-V starting at the specified mass
+    """
+    dV, mass, thrust, Isp = [np.asarray(x, dtype=float) for x in (dV, mass, thrust, Isp)]
+    final_mass = mass * np.exp(-dV / (Isp * g))
+    mdot = thrust / (Isp * g)
+    return final_mass, (mass - final_mass) / mdot
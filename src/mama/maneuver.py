@@ -6,24 +6,42 @@ import logging
 
 from math import sqrt, pi, cos
 
+import numpy as np
+
 from openmdao.main.api import Component
-from openmdao.lib.datatypes.api import Float, Int, Slot, Enum
+from openmdao.lib.datatypes.api import Float, Int, Slot, Enum, Array
 
 from orbit import Orbit
 
+import gravloss
+import finiteburn
+import dvcache
+import aerocapture
+import transfer
+import lowthrust
+import flyby
+import phasing
+
+from subsystems import IPropulsion
+
 
 class Maneuver(Component):
 
     orbit = Slot(Orbit,
         desc='initial orbit and final orbit (if applicable)')
 
+    final_orbit = Slot(Orbit,
+        desc='final orbit for orbit transfers (Hohmann, Bi-elliptic, Capture with Plane Change)')
+
     # inputs
 
     maneuver_type = Enum('Delta-V',
         ('Departure from Apoapsis', 'Departure from Periapsis',
          'Capture at Apoapsis',     'Capture at Periapsis',
          'Circularize at Apoapsis', 'Circularize at Periapsis',
-         'Delta-V', 'Plane Change'), iotype='in',
+         'Delta-V', 'Plane Change', 'Aerocapture', 'Aerobraking',
+         'Hohmann Transfer', 'Bi-elliptic Transfer', 'Capture with Plane Change',
+         'Low-Thrust Spiral', 'Powered Flyby', 'Phasing'), iotype='in',
         desc='maneuver type')
 
     stage = Int(0, iotype='in',
@@ -61,96 +79,111 @@ class Maneuver(Component):
         desc='C3 incoming/outgoing for maneuver, requires apoapsis and periapsis'
              'to calculate required periapsis velocity change')
 
+    aero_periapsis = Float(0.0, iotype='in',
+        desc='periapsis altitude for aerocapture (vacuum periapsis of approach) '
+             'or aerobraking passes')
+
+    target_apoapsis = Float(0.0, iotype='in',
+        desc='apoapsis altitude at which aerobraking ends')
+
+    ballistic_coefficient = Float(100.0, iotype='in',
+        desc='ballistic coefficient (m/CdA) for aerocapture/aerobraking in kg/m**2')
+
+    nose_radius = Float(1.0, iotype='in',
+        desc='nose radius for aerocapture/aerobraking heating in m')
+
+    max_apoapsis = Float(0.0, iotype='in',
+        desc='upper limit on the intermediate apoapsis altitude for a bi-elliptic '
+             'transfer (defaults to 100 times the final orbit radius)')
+
+    power = Float(0.0, iotype='in',
+        desc='electric power to the thrusters for a low-thrust spiral in kW '
+             '(if zero the thrust of the propulsion system is used)')
+
+    thruster_efficiency = Float(0.6, iotype='in',
+        desc='electric thruster efficiency for a power limited low-thrust spiral')
+
+    vinf_in = Array([0.0, 0.0, 0.0], iotype='in',
+        desc='incoming hyperbolic excess velocity vector for a flyby in km/s')
+
+    vinf_out = Array([0.0, 0.0, 0.0], iotype='in',
+        desc='outgoing hyperbolic excess velocity vector for a flyby in km/s')
+
+    min_flyby_altitude = Float(0.0, iotype='in',
+        desc='minimum allowable periapsis altitude for a flyby')
+
+    phase_angle = Float(0.0, iotype='in',
+        desc='angle by which the target leads the chaser for phasing (degrees)')
+
+    max_phasing_time = Float(1.0, iotype='in',
+        desc='time limit for phasing and rendezvous (in days)')
+
+    max_revolutions = Int(phasing.MAX_REVOLUTIONS, iotype='in',
+        desc='maximum number of revolutions on the phasing orbit')
+
+    min_phasing_altitude = Float(0.0, iotype='in',
+        desc='minimum allowable periapsis altitude of the phasing orbit')
+
     # outputs
 
     burn_time = Float(0.0, iotype='out',
         desc='burn duration (in minutes)')
 
-    def gravity_loss(self, TW, burns=1):
-        """ calculate gravity loss for maneuver
+    passes = Int(0, iotype='out',
+        desc='number of atmospheric passes for aerocapture/aerobraking')
+
+    heat_load = Float(0.0, iotype='out',
+        desc='total stagnation point heat load for aerocapture/aerobraking in J/cm**2')
+
+    dV_saved = Float(0.0, iotype='out',
+        desc='propulsive delta-V saved by aerocapture/aerobraking')
+
+    plane_change = Float(0.0, iotype='out',
+        desc='plane change made at the first burn of a transfer (degrees)')
+
+    intermediate_apoapsis = Float(0.0, iotype='out',
+        desc='optimal intermediate apoapsis altitude of a bi-elliptic transfer')
+
+    trip_time = Float(0.0, iotype='out',
+        desc='duration of a low-thrust spiral (in days)')
+
+    flyby_altitude = Float(0.0, iotype='out',
+        desc='periapsis altitude of a flyby')
+
+    phasing_time = Float(0.0, iotype='out',
+        desc='time to complete phasing and rendezvous (in days)')
+
+    revolutions = Int(0, iotype='out',
+        desc='number of revolutions on the phasing orbit (0 to wait in the initial orbit)')
+
+    def gravity_loss(self, TW, burns=1, Isp=None):
+        """ calculate gravity loss for maneuver using the data set specified
+            by gravloss_data (or the one or two burn data set if not specified)
+            TW may be a scalar or an array of thrust to weight ratios
+            If the data sets do not apply and Isp is specified, the gravity
+            loss is calculated by integrating the finite burn instead.
             TODO: currently only have equations for one or two burn TLI from
                   a circular earth orbit with Isp of 900s
         """
         orbit = self.orbit
-        if orbit.body != 'Earth' or orbit.apoapsis != orbit.periapsis:
-            self.log('Can only compute gravity loss leaving from circular LEO')
-            self.log(str(orbit))
-            return
 
-        # TW    = 0.11
-        # r     = 6785.14
-        # C3    = -1.671
-        # burns = 2
-
-        if burns == 1:
-            m1 = (- 0.001780493 * TW**5
-                  - 0.022793191 * TW**4
-                  + 0.077236216 * TW**3
-                  - 0.088317529 * TW**2
-                  + 0.044187306 * TW**1
-                  - 0.008675645)
-
-            b1 = (- 373.5457107 * TW**5
-                  + 1416.037449 * TW**4
-                  - 2123.882421 * TW**3
-                  + 1586.194924 * TW**2
-                  - 600.5083743 * TW**1
-                  + 96.9251525)
-
-            m2 = (+ 5.236463124 * TW**5
-                  - 17.13945421 * TW**4
-                  + 21.76682131 * TW**3
-                  - 13.46112409 * TW**2
-                  + 4.118567455 * TW**1
-                  - 0.524766446)
-
-            b2 = (- 46715.84466 * TW**5
-                  + 152665.0942 * TW**4
-                  - 193425.3839 * TW**3
-                  + 119181.2715 * TW**2
-                  - 36249.91164 * TW**1
-                  + 4573.564918)
-        elif burns == 2:
-            m1 = (+ 0.065289684 * TW**5
-                  - 0.212965428 * TW**4
-                  + 0.268721507 * TW**3
-                  - 0.164266201 * TW**2
-                  + 0.049233822 * TW**1
-                  - 0.0060403)
-
-            b1 = (- 609.7173222 * TW**5
-                  + 1985.167045 * TW**4
-                  - 2499.028265 * TW**3
-                  + 1522.748139 * TW**2
-                  - 454.2432999 * TW**1
-                  + 55.31565955)
-
-            m2 = (+ 2.310083708 * TW**5
-                  - 7.485235246 * TW**4
-                  + 9.36476806  * TW**3
-                  - 5.658397    * TW**2
-                  + 1.666878713 * TW**1
-                  - 0.198921842)
-
-            b2 = (- 19557.5509  * TW**5
-                  + 63349.30543 * TW**4
-                  - 79217.25722 * TW**3
-                  + 47829.47535 * TW**2
-                  - 14073.25171 * TW**1
-                  + 1676.106499)
+        if self.gravloss_data > 0:
+            data_set = self.gravloss_data
         else:
-            self.log('Can only compute gravity loss for one or two burns but',
-                burns, 'burns were specified')
-            return
+            data_set = burns
 
-        r = orbit.body_radius() + orbit.apoapsis
-        C3 = self.C3
+        if orbit.body == 'Earth' and orbit.apoapsis == orbit.periapsis \
+           and (Isp is None or Isp == 900) and gravloss.has_data_set(data_set):
+            r = orbit.body_radius() + orbit.apoapsis
+            return gravloss.gravity_loss(data_set, TW, r, self.C3)
 
-        m = m1 * r + b1
-        b = m2 * r + b2
-        g_loss = m * C3 + b
+        if Isp is None:
+            self.log('Can only compute gravity loss from data set', data_set,
+                     'leaving from circular LEO (specify Isp for finite burn)')
+            self.log(str(orbit))
+            return
 
-        return g_loss
+        return finiteburn.gravity_loss(orbit, TW, Isp, self.C3, burns)
 
     def calculate_dV(self):
         """ determine the delta-V required for orbit change
@@ -261,23 +294,251 @@ class Maneuver(Component):
             self.log('    dV needed to circularize orbit at periapsis = %1.3f km/s' % dV)
             return dV
 
+        if self.maneuver_type == 'Aerocapture':
+            # given a C3 and an orbit, calculate the dV required to trim the
+            # orbit after a single aerocapture pass into that orbit
+            orbit = self.orbit
+            self.log(orbit)
+
+            dV, dV_saved, heat_load = aerocapture.aerocapture(orbit, self.C3,
+                self.aero_periapsis, self.ballistic_coefficient, self.nose_radius)
+            if np.isnan(dV):
+                self.log('    aerocapture with periapsis of %1.1f km failed to capture'
+                         % self.aero_periapsis)
+                return
+
+            self.passes = 1
+            self.heat_load = float(heat_load)
+            self.dV_saved = float(dV_saved)
+            self.log('    heat load = %1.1f J/cm2' % self.heat_load)
+            self.log('    dV needed after aerocapture with C3 of %4.3f km2/s2 = %1.3f km/s (%1.3f km/s saved)' %
+                (self.C3, dV, self.dV_saved))
+            return float(dV)
+
+        if self.maneuver_type == 'Aerobraking':
+            # given an orbit, calculate the dV required to lower periapsis into
+            # the atmosphere and raise it again after aerobraking to the target apoapsis
+            orbit = self.orbit
+            self.log(orbit)
+
+            dV, dV_saved, passes, heat_load = aerocapture.aerobrake(orbit,
+                self.aero_periapsis, self.target_apoapsis,
+                self.ballistic_coefficient, self.nose_radius)
+            if np.isnan(dV):
+                self.log('    aerobraking with periapsis of %1.1f km failed' % self.aero_periapsis)
+                return
+
+            self.passes = int(passes)
+            self.heat_load = float(heat_load)
+            self.dV_saved = float(dV_saved)
+            self.log('    %d passes, heat load = %1.1f J/cm2' % (self.passes, self.heat_load))
+            self.log('    dV needed to aerobrake to apoapsis of %1.1f km = %1.3f km/s (%1.3f km/s saved)' %
+                (self.target_apoapsis, dV, self.dV_saved))
+            return float(dV)
+
+        if self.maneuver_type in ('Hohmann Transfer', 'Bi-elliptic Transfer'):
+            # given an initial and final orbit, calculate the dV required to
+            # transfer from apoapsis of the initial orbit to apoapsis of the
+            # final orbit, including the change in inclination between them
+            orbit = self.orbit
+            final = self.final_orbit
+            self.log(orbit)
+            self.log(final)
+
+            mu = orbit.body_gravity()
+            R = orbit.body_radius()
+            h1 = max(orbit.apoapsis, orbit.periapsis)
+            h2 = max(final.apoapsis, final.periapsis)
+            di = (final.inclination - orbit.inclination)*pi/180
+
+            if self.maneuver_type == 'Hohmann Transfer':
+                dV, alpha = transfer.hohmann(mu, R + h1, orbit.velocity(h1),
+                                             R + h2, final.velocity(h2), abs(di))
+                self.plane_change = float(alpha)*180/pi
+                self.log('    plane change of %4.3f deg at first burn' % self.plane_change)
+            else:
+                rb_max = R + self.max_apoapsis if self.max_apoapsis > 0 else None
+                dV, rb = transfer.bielliptic(mu, R + h1, orbit.velocity(h1),
+                                             R + h2, final.velocity(h2), abs(di), rb_max)
+                self.intermediate_apoapsis = float(rb) - R
+                self.log('    intermediate apoapsis = %1.1f km' % self.intermediate_apoapsis)
+
+            dV = float(dV)
+            self.log('    dV needed for %s from %1.1f km to %1.1f km = %1.3f km/s' %
+                (self.maneuver_type, h1, h2, dV))
+            return dV
+
+        if self.maneuver_type == 'Capture with Plane Change':
+            # given a C3 and the inclination of the approach (orbit), calculate
+            # the dV required to capture into the final orbit, making the
+            # plane change partly at periapsis and partly at apoapsis
+            orbit = self.orbit
+            final = self.final_orbit
+            self.log(final)
+
+            R = final.body_radius()
+            r_p = R + min(final.apoapsis, final.periapsis)
+            r_a = R + max(final.apoapsis, final.periapsis)
+            di = (final.inclination - orbit.inclination)*pi/180
+
+            dV, alpha = transfer.capture_plane_change(final.body_gravity(), r_p, r_a, self.C3, abs(di))
+            self.plane_change = float(alpha)*180/pi
+            self.log('    plane change of %4.3f deg at periapsis' % self.plane_change)
+
+            dV = float(dV)
+            self.log('    dV needed to enter orbit with C3 of %4.3f km2/s2 and plane change of %4.3f deg = %1.3f km/s' %
+                (self.C3, abs(di)*180/pi, dV))
+            return dV
+
+        if self.maneuver_type == 'Low-Thrust Spiral':
+            # given an initial and final orbit (taken as circular at the
+            # semi-major axis), calculate the Edelbaum dV for a low-thrust
+            # spiral including the change in inclination between them
+            orbit = self.orbit
+            final = self.final_orbit
+            self.log(orbit)
+            self.log(final)
+
+            V0 = orbit.circular_velocity((orbit.apoapsis + orbit.periapsis) / 2)
+            V1 = final.circular_velocity((final.apoapsis + final.periapsis) / 2)
+            di = abs(final.inclination - orbit.inclination)*pi/180
+
+            dV = float(lowthrust.edelbaum(V0, V1, di))
+            self.log('    dV needed for low-thrust spiral from %4.3f km/s to %4.3f km/s '
+                     'with plane change of %4.3f deg = %1.3f km/s' % (V0, V1, di*180/pi, dV))
+            return dV
+
+        if self.maneuver_type == 'Powered Flyby':
+            # given incoming and outgoing Vinf at the orbit body, calculate
+            # the dV required at periapsis of the flyby
+            orbit = self.orbit
+            self.log('    flyby of', orbit.body)
+
+            dV, altitude = flyby.powered_flyby(orbit.body_gravity(), orbit.body_radius(),
+                                               self.vinf_in, self.vinf_out)
+            self.flyby_altitude = float(altitude)
+            self.log('    flyby periapsis altitude = %1.1f km' % self.flyby_altitude)
+            if self.flyby_altitude < self.min_flyby_altitude:
+                self.log('    flyby periapsis is below the minimum altitude of %1.1f km'
+                         % self.min_flyby_altitude)
+                return
+
+            dV = float(dV)
+            self.log('    dV needed for powered flyby = %1.3f km/s' % dV)
+            return dV
+
+        if self.maneuver_type == 'Phasing':
+            # given chaser (orbit) and target (final orbit) orbits, taken as
+            # circular at the semi-major axis, and the phase angle calculate
+            # the lowest dV phasing plan within the time limit
+            orbit = self.orbit
+            final = self.final_orbit
+            self.log(orbit)
+            self.log(final)
+
+            R = orbit.body_radius()
+            dV, time, revs, r_other = phasing.plan(orbit.body_gravity(),
+                R + (orbit.apoapsis + orbit.periapsis) / 2,
+                R + (final.apoapsis + final.periapsis) / 2,
+                self.phase_angle*pi/180, self.max_phasing_time*86400,
+                R + self.min_phasing_altitude, self.max_revolutions)
+            if np.isnan(dV):
+                self.log('    no phasing plan for phase angle of %1.1f deg within %1.2f days'
+                         % (self.phase_angle, self.max_phasing_time))
+                return
+
+            self.phasing_time = float(time) / 86400
+            self.revolutions = int(revs)
+            self.log('    %d revolutions on phasing orbit to %1.1f km, phasing time = %1.3f days' %
+                (self.revolutions, float(r_other) - R, self.phasing_time))
+
+            dV = float(dV)
+            self.log('    dV needed for phasing with phase angle of %1.1f deg = %1.3f km/s' %
+                (self.phase_angle, dV))
+            return dV
+
         self.log('TODO: calculate delta-V for orbit change maneuver', self.maneuver_type)
 
-    def execute(self, spacecraft):
+    def dV_for_C3(self, C3):
+        """ delta-V for this maneuver over an array of C3 (e.g. porkchop grids
+            from lambert.porkchop), same sign convention as calculate_dV
+        """
+        C3 = np.asarray(C3, dtype=float)
+        orbit = self.orbit
+
+        if self.maneuver_type in ('Departure from Apoapsis', 'Capture at Apoapsis'):
+            altitude = orbit.apoapsis
+        elif self.maneuver_type in ('Departure from Periapsis', 'Capture at Periapsis'):
+            altitude = orbit.periapsis
+        else:
+            # delta-V does not depend on C3
+            return np.ones_like(C3) * self.calculate_dV()
+
+        V = orbit.velocity(altitude)
+        Vhyperbolic = np.sqrt(C3 + orbit.escape_velocity(altitude)**2)
+
+        if self.maneuver_type.startswith('Departure'):
+            return Vhyperbolic - V
+        else:
+            return V - Vhyperbolic
+
+    def spiral(self, mass, thrust=None, Isp=None, power=None):
+        """ final mass and trip time (days) of a low-thrust spiral starting
+            at the specified mass, for the specified thrust (kN) or power (kW)
+            and Isp, any of which may be arrays
+        """
+        dV = self.dV if self.dV > 0 else self.calculate_dV()
+        if power is not None:
+            thrust = lowthrust.power_limited_thrust(power, Isp, self.thruster_efficiency)
+        final_mass, trip_time = lowthrust.spiral(dV, mass, thrust, Isp)
+        return final_mass, trip_time / 86400
+
+    def execute(self, spacecraft, planned=False):
         """ calls the spacecraft to do a burn to achieve the delta-V
             required for this maneuver.  If the delta-V is not explicitly
             provided, it is calculated based on the current orbit and
-            the maneuver type.
+            the maneuver type (or taken from the delta-V cache if it has
+            already been calculated for the same orbit, type and C3).
+            If planned, the trip time of a low-thrust spiral has already
+            been calculated (by the phase, which lasts for it).
         """
         if self.dV <= 0.0:
-            self.dV = self.calculate_dV()
+            self.dV = dvcache.cache.get_dV(self)
             self.log('')
 
+        if self.maneuver_type == 'Low-Thrust Spiral' and not planned:
+            self.spiral_time(spacecraft)
+
         self.burn_time = spacecraft.burn(self.dV, self.stage,
             self.bulk_reserve, self.dV_reserve, self.Isp_reserve, self.other_reserve)
 
+        # a low-thrust spiral burns for its whole trip time
+        if self.maneuver_type == 'Low-Thrust Spiral':
+            self.burn_time = self.trip_time * 86400
+
+    def spiral_time(self, spacecraft):
+        """ calculate the trip time of a low-thrust spiral using the main
+            propulsion of the spacecraft (thrust limited by power if specified)
+        """
+        mass = spacecraft.wet_mass
+        if hasattr(spacecraft, 'get_stage'):
+            spacecraft = spacecraft.get_stage(0)
+        prop_system = spacecraft.get(spacecraft.get_children(IPropulsion)[0])
+
+        if self.power > 0:
+            final_mass, trip_time = self.spiral(mass, Isp=prop_system.Isp, power=self.power)
+        else:
+            final_mass, trip_time = self.spiral(mass, prop_system.thrust, prop_system.Isp)
+        self.trip_time = float(trip_time)
+        self.log('    low-thrust spiral trip time = %1.1f days' % self.trip_time)
+
+    def set_logger(self, logger):
+        """ log to the specified logger instead of the global 'mission' logger
+        """
+        self._logger = logger
+
     def log(self, *args):
-        logger = logging.getLogger('mission')
+        logger = getattr(self, '_logger', None) or logging.getLogger('mission')
         msg = ''
         for arg in args:
             msg += str(arg) + ' '
@@ -7,11 +7,19 @@ import logging
 import StringIO
 
 from openmdao.main.api import Component, Assembly
-from openmdao.lib.datatypes.api import Float, Int, Str, Slot, List, Array
+from openmdao.lib.datatypes.api import Float, Int, Str, Slot, List, Array, Bool
 
 from spacecraft import Spacecraft
 from maneuver import Maneuver, Orbit
 
+import kepler
+import j2
+import serialize
+import resultcache
+import results
+import timeline
+import events
+
 
 class Phase(Component):
     """ A phase of a mission. """
@@ -65,6 +73,9 @@ class Phase(Component):
     pickup_stage = Int(0, iotype='in',
         desc='stage to which mass is added')
 
+    events = List(iotype='in',
+        desc='event triggers (events.Trigger) armed during this phase')
+
     beg_mass = Float(0.0, iotype='in',
         desc='mass of spacecraft at beginning of phase')
 
@@ -78,17 +89,47 @@ class Phase(Component):
     end_MET = Float(0.0, iotype='out',
         desc='mission elapsed time at end of phase')
 
+    elapsed = Float(0.0, iotype='out',
+        desc='duration of phase as flown, at least the trip time of a low-thrust spiral')
+
     end_fuel = Float(0.0, iotype='out',
         desc='fuel remaining at end of phase')
 
     end_prop = Array(dtype=Float, iotype='out',
         desc='RCS propellant remaining at end of phase')
 
+    raan_drift = Float(0.0, iotype='out',
+        desc='J2 drift of the right ascension of the ascending node over the phase (degrees)')
+
+    arg_periapsis_drift = Float(0.0, iotype='out',
+        desc='J2 drift of the argument of periapsis over the phase (degrees)')
+
+    end_raan = Float(0.0, iotype='out',
+        desc='right ascension of the ascending node of the phase orbit at end of phase (degrees)')
+
+    end_arg_periapsis = Float(0.0, iotype='out',
+        desc='argument of periapsis of the phase orbit at end of phase (degrees)')
+
+    plane_change_penalty = Float(0.0, iotype='out',
+        desc='plane change needed to restore the orbit plane after J2 drift (degrees)')
+
+    plane_change_dV = Float(0.0, iotype='out',
+        desc='delta-V to make the plane change penalty at apoapsis')
+
     def add_maneuver(self, maneuver):
         """ add a maneuver to the phase
         """
         self.add('maneuver', maneuver)
 
+    def propagate(self, samples=100):
+        """ propagate the vehicle along the phase orbit over the phase duration
+            (starting from periapsis, oriented by the orbit RAAN, inclination and
+            argument of periapsis) at the specified number of samples
+            returns time (s), position (km), velocity (km/s) and true anomaly (rad)
+        """
+        duration = self.elapsed if self.elapsed > 0 else self.duration
+        return kepler.propagate_orbit(self.orbit, duration*86400, samples)
+
     def display(self, output=sys.stdout):
         """ display details about this mission phase.
         """
@@ -115,8 +156,6 @@ class Phase(Component):
         """ Simulates the phase.
         """
 
-        self.logger = logging.getLogger('mission')
-
         self.log('\f')  # form feed, new page for each mission phase
         self.log('MET:', self.beg_MET, 'days')
         self.log('Executing phase "' + self.description + '"',
@@ -125,6 +164,10 @@ class Phase(Component):
 
         self.log('    start mass:', self.parent.spacecraft.wet_mass)
 
+        if getattr(self.parent, 'aborted', False):
+            self.skip()
+            return
+
         # print self.name+'.beg_mass    = ', self.beg_mass
         # print self.name+'.beg_MET     = ', self.beg_MET
 
@@ -136,17 +179,64 @@ class Phase(Component):
         if self.stage >= 0:
             spacecraft = spacecraft.get_stage(self.stage)
 
-        if self.duration > 0:
-            spacecraft.expend_consumables(self.duration)
-            spacecraft.boil_off(self.duration)
+        # fuel and RCS propellant on each stage at the beginning of the phase
+        fuel_before = [stage.get_fuel() for stage in self.parent.spacecraft.stages]
+        prop_before = self.parent.spacecraft.get_prop()
+
+        # state of the spacecraft for the mission timeline
+        samples = getattr(self.parent, 'timeline', None)
+        if samples is not None:
+            samples.sample(self.beg_MET, self.parent.spacecraft)
+
+        # the phasing plan determines the duration of a phasing phase,
+        # whether or not its delta-V is given
+        duration = self.duration
+        if self.maneuver and self.maneuver.maneuver_type == 'Phasing':
+            dV = self.maneuver.calculate_dV()
+            if dV is not None:
+                if self.maneuver.dV <= 0.0:
+                    self.maneuver.dV = dV
+                duration = self.maneuver.phasing_time
+                self.log('    phasing duration:', duration, 'days')
+
+        # a low-thrust spiral lasts for its trip time, from the mass at the
+        # start of the phase
+        spiral = self.maneuver and self.maneuver.maneuver_type == 'Low-Thrust Spiral'
+        if spiral:
+            self.maneuver.spiral_time(spacecraft)
+            if self.maneuver.trip_time > duration:
+                duration = self.maneuver.trip_time
+                self.log('    spiral duration:', duration, 'days')
+        self.elapsed = duration
+
+        if duration > 0:
+            spacecraft.expend_consumables(duration)
+            spacecraft.boil_off(duration, self.orbit)
             mass_effect = True
 
-        # TODO: handle BIGDV (C3 or AeroBraking)
-        # TODO: handle orbit raising (diff apogee/perigee than previous phase)
+        if self.orbit and duration > 0:
+            dRAAN, dArgP, angle, dV = j2.orbit_drift(self.orbit, duration)
+            self.raan_drift = float(dRAAN)
+            self.arg_periapsis_drift = float(dArgP)
+            self.end_raan = float(self.orbit.raan + dRAAN) % 360
+            self.end_arg_periapsis = float(self.orbit.arg_periapsis + dArgP) % 360
+            self.plane_change_penalty = float(angle)
+            self.plane_change_dV = float(dV)
+            self.log('    J2 drift: RAAN %1.3f deg, arg of periapsis %1.3f deg, '
+                     'plane change penalty %1.3f deg (%1.3f km/s)'
+                     % (dRAAN, dArgP, angle, dV))
+
+        # BIGDV (C3 or AeroBraking) is handled by the maneuver type
+        # orbit raising (diff apogee/perigee than previous phase) is handled by
+        # the Hohmann and Bi-elliptic transfer maneuver types
 
         if self.maneuver:
             self.log('')
-            self.maneuver.execute(spacecraft)
+            if samples is not None:
+                before_burn = samples.snapshot(self.parent.spacecraft)
+            self.maneuver.execute(spacecraft, planned=spiral)
+            if samples is not None:
+                after_burn = samples.snapshot(self.parent.spacecraft)
             mass_effect = True
 
         if self.expend_fuel > 0:
@@ -180,9 +270,19 @@ class Phase(Component):
             self.log('')
             self.log(str(self.parent.spacecraft))
 
-        self.end_MET = self.beg_MET + self.duration
+        self.end_MET = self.beg_MET + duration
         self.log('    end MET:', self.end_MET, 'days')
 
+        if samples is not None:
+            if self.maneuver:
+                # the burn runs up to the end of the phase
+                burn_days = min(self.maneuver.burn_time / 86400., duration)
+                samples.add(self.end_MET - burn_days, *before_burn)
+                samples.add(self.end_MET, *after_burn)
+            samples.sample(self.end_MET, self.parent.spacecraft)
+
+        self.trigger_events(samples)
+
         self.end_mass = self.parent.spacecraft.wet_mass
         self.log('    end mass:', self.end_mass)
 
@@ -192,6 +292,10 @@ class Phase(Component):
         self.end_prop = self.parent.spacecraft.get_prop()
         self.log('    end prop:', self.end_prop)
 
+        # record the phase in the mission results table
+        if hasattr(self.parent, 'record'):
+            self.parent.record(self, fuel_before, prop_before)
+
         # print self.name+'.end_mass    = ', self.end_mass
         # print self.name+'.end_MET     = ', self.end_MET
 
@@ -199,8 +303,74 @@ class Phase(Component):
         # for i in range(0, len(self.end_prop)-1):
         #     print self.name+'.end_prop['+str(i)+'] = ', self.end_prop[i]
 
+    def skip(self):
+        """ skip the phase (after the mission is aborted), the spacecraft
+            is unchanged
+        """
+        self.log('    skipped, the mission has been aborted')
+        spacecraft = self.parent.spacecraft
+        fuel_before = [stage.get_fuel() for stage in spacecraft.stages]
+        prop_before = spacecraft.get_prop()
+
+        self.end_MET = self.beg_MET
+        self.elapsed = 0.0
+        self.end_mass = spacecraft.wet_mass
+        self.end_fuel = spacecraft.get_fuel()
+        self.end_prop = prop_before
+
+        if hasattr(self.parent, 'record'):
+            self.parent.record(self, fuel_before, prop_before)
+
+    def trigger_events(self, samples=None):
+        """ detect the event triggers of this phase (and those of the
+            mission that have not yet fired) over the phase and take their
+            actions
+        """
+        spacecraft = self.parent.spacecraft
+        fired = getattr(self.parent, 'fired', None)
+        armed = list(self.events)
+        if fired is not None:
+            done = [trigger for MET, phase, trigger in fired]
+            armed += [trigger for trigger in getattr(self.parent, 'events', [])
+                      if trigger not in done]
+        if len(armed) < 1:
+            return
+
+        names = [stage.name for stage in spacecraft.stages]
+        if samples is not None:
+            state = events.timeline_state(samples, names, self.beg_MET, self.end_MET)
+        else:
+            state = events.state([self.end_MET], [spacecraft.wet_mass], [spacecraft.get_fuel()],
+                                 [[stage.get_fuel() for stage in spacecraft.stages]], names)
+
+        mass_effect = False
+        for trigger, MET in zip(armed, events.crossing(armed, state)):
+            if MET != MET:  # NaN, not met
+                continue
+            self.log('    event at MET %1.3f days, %s' % (MET, trigger))
+            if fired is not None:
+                fired.append((float(MET), self.name, trigger))
+            if trigger.action == 'drop':
+                spacecraft.drop(trigger.target)
+                mass_effect = True
+            elif trigger.action == 'abort':
+                self.parent.aborted = True
+
+        if mass_effect:
+            spacecraft.update_wet_mass()
+            if samples is not None:
+                samples.sample(self.end_MET, spacecraft)
+
+    def set_logger(self, logger):
+        """ log to the specified logger (instead of the global 'mission'
+            logger), for this phase and its maneuver
+        """
+        self._logger = logger
+        if self.maneuver:
+            self.maneuver.set_logger(logger)
+
     def log(self, *args):
-        logger = logging.getLogger('mission')
+        logger = getattr(self, '_logger', None) or logging.getLogger('mission')
         msg = ''
         for arg in args:
             msg += str(arg) + ' '
@@ -218,9 +388,15 @@ class Mission(Assembly):
 
     phases = List(Phase, iotype='in')
 
+    events = List(iotype='in',
+        desc='event triggers (events.Trigger) armed for the whole mission, each fires once')
+
     beg_MET = Float(0.0, iotype='in',
         desc='mission elapsed time at beginning of mission')
 
+    text_log = Bool(True, iotype='in',
+        desc='write the text log of the mission (the results table is always kept)')
+
     def configure(self):
         """ link up the spacecraft and mission phases in order
         """
@@ -251,12 +427,44 @@ class Mission(Assembly):
         self.create_passthrough(phase.name + '.end_prop')
         self.force_execute = True
 
+    def run(self, *args, **kwargs):
+        """ run the mission, unless it has been run before in which case
+            its results are restored from the result cache
+            (pass cache=False to always run the mission)
+        """
+        cache = resultcache.cache if kwargs.pop('cache', True) else None
+        if cache is None:
+            return super(Mission, self).run(*args, **kwargs)
+
+        # the key is that of the definition before the run, which changes
+        # some inputs (such as the delta-V of maneuvers that calculate it);
+        # running the mission again, unchanged since, reuses its key
+        definition = serialize.definition(self)
+        key = cache.key(self, definition)
+        if key == getattr(self, '_end_key', None):
+            key = self.cache_key
+
+        cached = cache.lookup(key)
+        if cached is not None:
+            self.initialize_log()
+            cache.restore(self, cached)
+        else:
+            super(Mission, self).run(*args, **kwargs)
+            cache.store(key, cache.results(self, definition))
+        self.cache_key = key
+        self._end_key = cache.key(self)
+
     def execute(self):
         """ instrumented execute function
         """
 
-        # reset the log
+        # reset the log, the results table and the timeline
         self.initialize_log()
+        self.timeline = timeline.Timeline()
+        self.fired = []  # (MET, phase, trigger) of each event that fired
+        self.aborted = False
+        self.results = results.allocate([phase.name for phase in self.phases],
+                                        len(self.spacecraft.stages))
 
         self.logger.info('=======================================================================================')
         self.logger.info('\nExecuting mission...\n')
@@ -284,6 +492,43 @@ class Mission(Assembly):
         for phase in self.phases:
             phase.display(output=output)
 
+    def record(self, phase, fuel_before, prop_before):
+        """ record the results of a phase in the results table, given the
+            fuel and RCS propellant on each stage at the beginning of the phase
+        """
+        table = getattr(self, 'results', None)
+        if table is None:
+            return
+        row = self.phases.index(phase)
+        stages = len(fuel_before)
+
+        for name in ('beg_MET', 'end_MET', 'beg_mass', 'end_mass', 'end_fuel'):
+            table[name][row] = getattr(phase, name)
+        table['end_prop'][row, :stages] = phase.end_prop
+
+        if phase.maneuver:
+            table['dV'][row] = phase.maneuver.dV
+            table['burn_time'][row] = phase.maneuver.burn_time
+
+        fuel_after = [stage.get_fuel() for stage in self.spacecraft.stages]
+        table['fuel_drawn'][row, :stages] = [b - a for b, a in zip(fuel_before, fuel_after)]
+        table['prop_drawn'][row, :stages] = [b - a for b, a in zip(prop_before, phase.end_prop)]
+
+    def state_at(self, MET):
+        """ mass, fuel and Cg of the spacecraft at the mission elapsed
+            time(s) (days), interpolated from the mission timeline
+            returns a dict of arrays (of the shape of MET, with Cg (..., 3))
+        """
+        if getattr(self, 'timeline', None) is None:
+            raise Exception(self, 'has not been run')
+        return self.timeline.state_at(MET)
+
+    def save_results(self, path):
+        """ save the results table (as CSV if the path ends with .csv,
+            otherwise in numpy's binary format)
+        """
+        results.save(self.results, path)
+
     def add_phase(self, name, phase):
         """ add phase to the mission
         """
@@ -297,12 +542,23 @@ class Mission(Assembly):
 
     def initialize_log(self):
         """ initialize the mission log
+            each run of the mission gets its own logger (not registered with
+            the logging module, so not shared with any other mission) which
+            is passed on to the spacecraft and phases, so that missions can
+            be run concurrently in separate threads
         """
         # if not hasattr(self, 'logger'):   # if you want to see every iteration
-        self.logger = logging.getLogger('mission')
-        for handler in self.logger.handlers:
-            self.logger.removeHandler(handler)
+        self.logger = logging.Logger('mission')
+        self.logger.propagate = False
 
         self.logstr = StringIO.StringIO()
         self.logger.addHandler(logging.StreamHandler(self.logstr))
-        self.logger.setLevel(logging.INFO)
+        if self.text_log:
+            self.logger.setLevel(logging.INFO)
+        else:
+            self.logger.setLevel(logging.WARNING)
+
+        if self.spacecraft is not None:
+            self.spacecraft.set_logger(self.logger)
+        for phase in self.phases:
+            phase.set_logger(self.logger)
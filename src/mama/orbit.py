@@ -7,6 +7,77 @@ from math import sqrt, pi, acos
 from openmdao.main.api import Component
 from openmdao.lib.datatypes.api import Float, Enum
 
+import j2
+
+
+G = 6.67384e-11  # gravitational constant (m^3/kg-s^2)
+
+# mass of each body (kg)
+BODY_MASS = {
+    'Sun':      0.9891e30,
+    'Mercury':  3.30104e23,
+    'Venus':    4.86732e24,
+    'Earth':    5.976e24,   # 5.97219e24,
+    'Mars':     6.41693e23,
+    'Jupiter':  1.89813e27,
+    'Saturn':   5.68319e26,
+    'Uranus':   8.68103e25,
+    'Neptune':  1.0241e26,
+    'Pluto':    1.30900e22,
+    'Moon':     7.35e22     # 7.34767309e22
+}
+
+# mean radius of each body (km)
+BODY_RADIUS = {
+    'Sun':        6.955e5,
+    'Mercury':    2.440e3,
+    'Venus':      6.051e3,
+    'Earth':      6.378e3,
+    'Mars':       3.397e3,
+    'Jupiter':   7.1492e4,
+    'Saturn':    6.0268e4,
+    'Uranus':    2.5559e4,
+    'Neptune':   2.4764e4,
+    'Pluto':      1.160e3,
+    'Moon':       1.738e3
+}
+
+# second zonal harmonic (oblateness) of each body
+BODY_J2 = {
+    'Sun':      2.0e-7,
+    'Mercury':  5.03e-5,
+    'Venus':    4.458e-6,
+    'Earth':    1.08263e-3,
+    'Mars':     1.96045e-3,
+    'Jupiter':  1.4736e-2,
+    'Saturn':   1.6298e-2,
+    'Uranus':   3.343e-3,
+    'Neptune':  3.411e-3,
+    'Pluto':    0.0,
+    'Moon':     2.027e-4
+}
+
+# solar flux at the mean distance of each body from the Sun (W/m**2)
+# http://pveducation.org/pvcdrom/properties-of-sunlight/solar-radiation-in-space
+INSOLATION = {
+    'Mercury':    9116.4,
+    'Venus':      2611.0,
+    'Earth':      1366.1,
+    'Mars':        588.6,
+    'Jupiter':      50.5,
+    'Saturn':       15.04,
+    'Uranus':        3.72,
+    'Neptune':       1.51,
+    'Pluto':         0.878,
+    'Moon':       1366.1
+}
+
+
+def body_gravity(body):
+    """ gravitational parameter of the named body (km^3/s^2)
+    """
+    return G * BODY_MASS[body] / 1e9
+
 
 class Orbit(Component):
     """ Orbit parameters. """
@@ -28,6 +99,12 @@ class Orbit(Component):
     inclination = Float(0, iotype='in',
         desc='inclination')
 
+    raan = Float(0, iotype='in',
+        desc='right ascension of the ascending node (degrees)')
+
+    arg_periapsis = Float(0, iotype='in',
+        desc='argument of periapsis (degrees)')
+
     # constant
     G = Float(6.67384e-11, iotype='out',
         desc='gravitational constant (m^3/kg-s^2)')
@@ -58,53 +135,20 @@ class Orbit(Component):
         return index[self.body]
 
     def body_mass(self):
-        mass = {
-            'Sun':      0.9891e30,
-            'Mercury':  3.30104e23,
-            'Venus':    4.86732e24,
-            'Earth':    5.976e24,   # 5.97219e24,
-            'Mars':     6.41693e23,
-            'Jupiter':  1.89813e27,
-            'Saturn':   5.68319e26,
-            'Uranus':   8.68103e25,
-            'Neptune':  1.0241e26,
-            'Pluto':    1.30900e22,
-            'Moon':     7.35e22     # 7.34767309e22
-        }
-        return mass[self.body]  # kg
+        return BODY_MASS[self.body]  # kg
 
     def body_radius(self):
-        radius = {
-            'Sun':        6.955e8,
-            'Mercury':    2.440e3,
-            'Venus':      6.051e3,
-            'Earth':      6.378e3,
-            'Mars':       3.397e3,
-            'Jupiter':   7.1492e4,
-            'Saturn':    6.0268e4,
-            'Uranus':    2.5559e4,
-            'Neptune':   2.4764e4,
-            'Pluto':      1.160e3,
-            'Moon':       1.738e3
-        }
-        return radius[self.body]  # km
+        return BODY_RADIUS[self.body]  # km
+
+    def body_J2(self):
+        """ second zonal harmonic (oblateness) of the body
+        """
+        return BODY_J2[self.body]
 
     def insolation(self):
         """ http://pveducation.org/pvcdrom/properties-of-sunlight/solar-radiation-in-space
         """
-        insolation = {
-            'Mercury':    9116.4,
-            'Venus':      2611.0,
-            'Earth':      1366.1,
-            'Mars':        588.6,
-            'Jupiter':      50.5,
-            'Saturn':       15.04,
-            'Uranus':        3.72,
-            'Neptune':       1.51,
-            'Pluto':         0.878,
-            'Moon':       1366.1
-        }
-        return insolation[self.body]  # W/m**2
+        return INSOLATION[self.body]  # W/m**2
 
     def body_gravity(self):
         return self.G * self.body_mass() / 1e9
@@ -150,6 +194,21 @@ class Orbit(Component):
         T = 2 * pi * sqrt(a**3 / Mu)
         return T
 
+    def drift(self, duration):
+        """ secular J2 drift of the RAAN and argument of periapsis (degrees)
+            over the specified duration (days, may be an array)
+        """
+        dRAAN, dArgP, angle, dV = j2.orbit_drift(self, duration)
+        return dRAAN, dArgP
+
+    def advance(self, duration):
+        """ advance the RAAN and argument of periapsis by the J2 drift
+            over the specified duration (days)
+        """
+        dRAAN, dArgP = self.drift(duration)
+        self.raan = float(self.raan + dRAAN) % 360
+        self.arg_periapsis = float(self.arg_periapsis + dArgP) % 360
+
     def eclipse(self):
         """ amount of time spent in eclipse during a single orbit
             TODO: derive this
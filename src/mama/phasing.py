@@ -0,0 +1,98 @@
+"""
+   phasing.py
+
+   Rendezvous phasing between circular orbits.
+
+   The chaser flies a number of revolutions on a phasing orbit tangent to
+   its own orbit, with the period chosen so that a Hohmann transfer to the
+   target orbit (if the orbits differ) arrives at the target.  When the
+   orbits differ the chaser may also just wait in its own orbit for the
+   phase angle to drift into place, at no cost in delta-V.
+
+   All revolution counts up to a limit are evaluated at once, for arrays of
+   phase angles, and the lowest delta-V plan within the time limit is kept.
+
+   Radii are in km, velocities in km/s, times in seconds and the phase
+   angle (target ahead of chaser) in radians.
+"""
+
+import numpy as np
+
+from transfer import velocity
+
+
+MAX_REVOLUTIONS = 20
+
+
+def plan(mu, r_chaser, r_target, theta, time_limit, r_min=0.0, max_revs=MAX_REVOLUTIONS):
+    """ lowest delta-V phasing plan from the chaser orbit (radius r_chaser)
+        to rendezvous with a target (radius r_target) that is ahead of the
+        chaser by theta, completing within time_limit, with the phasing
+        orbit staying above r_min.  theta and time_limit may be arrays.
+
+        returns delta-V (phasing plus transfer), total time, number of
+        phasing revolutions (0 for waiting in the chaser orbit) and the
+        radius of the other apsis of the phasing orbit.  Cases with no plan
+        within the time limit are NaN.
+    """
+    theta, time_limit = [np.array(a, dtype=float) for a in np.broadcast_arrays(theta, time_limit)]
+    shape = theta.shape
+    theta = np.mod(theta.ravel(), 2*np.pi)[:, np.newaxis]
+    time_limit = time_limit.ravel()[:, np.newaxis]
+
+    n_c = np.sqrt(mu / r_chaser**3)
+    n_t = np.sqrt(mu / r_target**3)
+    v_c = np.sqrt(mu / r_chaser)
+
+    # Hohmann transfer to the target orbit, the target must lead by
+    # phi at the start of the transfer
+    if r_chaser != r_target:
+        t_H = np.pi * np.sqrt(((r_chaser + r_target)/2)**3 / mu)
+        dV_H = abs(velocity(mu, r_chaser, r_chaser, r_target) - v_c) \
+             + abs(np.sqrt(mu / r_target) - velocity(mu, r_target, r_chaser, r_target))
+    else:
+        t_H = 0.0
+        dV_H = 0.0
+    phi = np.pi - n_t*t_H
+
+    # phasing orbit with k revolutions while the target makes k + m,
+    # with m chosen to keep the phasing period close to the chaser period
+    k = np.arange(1, max_revs + 1, dtype=float)
+    m_0 = np.floor(k * (n_t/n_c - 1))
+    k = np.concatenate((k, k))
+    m = np.concatenate((m_0, m_0 + 1))
+    if r_chaser == r_target:
+        phi = 0.0
+
+    T = (2*np.pi*(k + m) + phi - theta) / (n_t * k)   # phasing period
+    a = (mu * (T / (2*np.pi))**2)**(1.0/3)
+    r_other = 2*a - r_chaser
+    with np.errstate(invalid='ignore'):
+        dV = 2*np.abs(velocity(mu, r_chaser, r_chaser, r_other) - v_c) + dV_H
+    time = k*T + t_H
+    feasible = (T > 0) & (r_other >= r_min) & (time <= time_limit)
+
+    # waiting in the chaser orbit for the phase angle to drift
+    if n_c != n_t:
+        wait = np.mod((theta - phi) * np.sign(n_c - n_t), 2*np.pi) / abs(n_c - n_t)
+        dV = np.hstack((dV_H * np.ones_like(theta), dV))
+        time = np.hstack((wait + t_H, time))
+        feasible = np.hstack((wait + t_H <= time_limit, feasible))
+        k = np.concatenate(([0.0], k))
+        r_other = np.hstack((r_chaser * np.ones_like(theta), r_other))
+    else:
+        r_other = r_other * np.ones_like(time)
+
+    # lowest delta-V feasible plan, then the shortest
+    cost = np.where(feasible, dV, np.inf)
+    lowest = cost <= cost.min(axis=1)[:, np.newaxis] + 1e-9
+    best = np.argmin(np.where(lowest, time, np.inf), axis=1)
+    rows = np.arange(len(best))
+    found = feasible[rows, best]
+
+    dV = np.where(found, dV[rows, best], np.nan)
+    time = np.where(found, time[rows, best], np.nan)
+    r_other = np.where(found, r_other[rows, best], np.nan)
+    revs = np.where(found, k[best], 0).astype(int)
+
+    return dV.reshape(shape), time.reshape(shape), revs.reshape(shape), r_other.reshape(shape)
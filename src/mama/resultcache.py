@@ -0,0 +1,239 @@
+"""
+   resultcache.py
+
+   Content-addressed on-disk cache of mission results.
+
+   The results of a mission depend only on its definition: the phases,
+   maneuvers and orbits, the spacecraft tree and all of their input values.
+   Missions are keyed by a hash of a canonical form of that definition (as
+   captured by serialize.definition before the mission is run) and of the
+   model sources and data files, so results are not reused across changes
+   to the model, and their results (end mass, fuel, RCS propellant and MET,
+   the outputs of each phase and maneuver, the results table, the timeline
+   and the events that fired) are stored as a file per key in a cache
+   directory.  When the directory grows beyond its size
+   limit, the least recently used results are evicted.
+
+   Running a mission changes some of its inputs: the masses of the
+   spacecraft and the delta-V of maneuvers that calculate it.  These are
+   stored with the results, as the inputs that the run changed (see
+   serialize.delta), along with the resource ledger, so a mission restored
+   from the cache is left as a run would leave it.  Its log is empty, since
+   nothing was run.
+
+   The default cache directory is ~/.mama/cache (or $MAMA_CACHE).
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+import cPickle as pickle
+
+import numpy as np
+
+import serialize
+
+
+# change when the format of the results changes, to invalidate previous
+# results (changes to the model are caught by the hash of its sources)
+version = '4'
+
+outputs = ('end_mass', 'end_fuel', 'end_prop', 'end_MET')
+
+
+# hash of the model sources, computed once
+_sources = None
+
+
+def sources():
+    """ hash of the sources of the modules of the package and of its data
+        files (such as the gravity loss table)
+    """
+    global _sources
+    if _sources is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        names = [name for name in os.listdir(directory) if name.endswith('.py')]
+        data = os.path.join(directory, 'data')
+        if os.path.isdir(data):
+            names.extend([os.path.join('data', name) for name in os.listdir(data)])
+        digest = hashlib.sha1()
+        for name in sorted(names):
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(name)
+                digest.update(f.read())
+        _sources = digest.hexdigest()
+    return _sources
+
+
+def canonical(value):
+    """ a canonical (order independent) form of a value, whose repr is
+        stable from run to run
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((canonical(k), canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(v) for v in value)
+    if isinstance(value, np.ndarray):
+        return ('array', str(value.dtype), value.shape, canonical(value.tolist()))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ResultCache(object):
+    """ on-disk cache of mission results, bounded by the total size of
+        the stored results (in bytes)
+    """
+
+    def __init__(self, directory=None, max_size=100*1024*1024):
+        if directory is None:
+            directory = os.environ.get('MAMA_CACHE',
+                os.path.join(os.path.expanduser('~'), '.mama', 'cache'))
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, mission, definition=None):
+        """ cache key for the specified mission (or its definition, if given)
+        """
+        if definition is None:
+            definition = serialize.definition(mission)
+        table = canonical(definition)
+        return hashlib.sha1(version + sources() + repr(table)).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def lookup(self, key):
+        """ get the cached results for the key (None if not cached)
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                results = pickle.load(f)
+            os.utime(path, None)  # most recently used
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return results
+
+    def store(self, key, results):
+        """ add results to the cache, evicting the least recently used
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                pass
+
+        # write to a temporary file and rename, so that concurrent
+        # processes never see a partial file
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as f:
+            pickle.dump(results, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp, self.path(key))
+
+        self.evict()
+
+    def evict(self):
+        """ remove the least recently used results until the cache is
+            within its size limit
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, name))
+
+        size = sum([entry[1] for entry in entries])
+        for mtime, entry_size, name in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            size -= entry_size
+
+    def results(self, mission, template=None):
+        """ the results of a mission that has been run, with the inputs
+            that the run changed if the definition of the mission before
+            the run is given
+        """
+        results = dict((name, getattr(mission, name)) for name in outputs)
+        results['phases'] = [(phase.name, dict((name, getattr(phase, name))
+                                               for name in phase.list_outputs()))
+                             for phase in mission.phases]
+        results['maneuvers'] = [(phase.name, dict((name, getattr(phase.maneuver, name))
+                                                  for name in phase.maneuver.list_outputs()))
+                                for phase in mission.phases if phase.maneuver]
+        results['table'] = getattr(mission, 'results', None)
+        results['timeline'] = getattr(mission, 'timeline', None)
+        results['events'] = getattr(mission, 'fired', [])
+        results['aborted'] = getattr(mission, 'aborted', False)
+        if template is not None:
+            results['inputs'] = serialize.delta(template, mission)
+            results['ledger'] = getattr(mission.spacecraft, 'resource_ledger', None)
+        return results
+
+    def restore(self, mission, results):
+        """ set the outputs of a mission (and its phases and maneuvers), and
+            the inputs that its run changed, from cached results
+        """
+        for phase, (name, values) in zip(mission.phases, results['phases']):
+            for output, value in values.items():
+                setattr(phase, output, value)
+        for name, values in results.get('maneuvers', []):
+            maneuver = getattr(mission, name).maneuver
+            for output, value in values.items():
+                setattr(maneuver, output, value)
+        for name in outputs:
+            setattr(mission, name, results[name])
+        mission.results = results.get('table')
+        mission.timeline = results.get('timeline')
+        mission.fired = results.get('events', [])
+        mission.aborted = results.get('aborted', False)
+
+        changes = results.get('inputs')
+        if changes is not None:
+            serialize.apply(mission, changes)
+            spacecraft = mission.spacecraft
+            ledger = results.get('ledger')
+            spacecraft.resource_ledger = ledger.copy() if ledger is not None else None
+            spacecraft.update_mass_properties()
+            spacecraft.update_wet_mass()
+
+    def stats(self):
+        """ get cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits':     self.hits,
+                'misses':   self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """ remove all cached results and clear statistics
+        """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+# default cache used by Mission.run
+cache = ResultCache()
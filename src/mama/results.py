@@ -0,0 +1,94 @@
+"""
+   results.py
+
+   Per-phase mission results table.
+
+   A Mission preallocates a numpy structured array with a row per phase,
+   which each phase fills in as it executes: beginning and end MET and
+   mass, fuel and RCS propellant remaining, the maneuver delta-V and burn
+   time and the fuel and RCS propellant drawn from each stage (negative if
+   it was added).  Per-stage fields are subarrays with a column per stage.
+
+   The table can be saved in numpy's binary format (and memory-mapped when
+   it is loaded) or streamed as CSV, with a column per stage for per-stage
+   fields.
+"""
+
+import sys
+
+import numpy as np
+
+
+def dtype(stages):
+    """ dtype of the results table for a spacecraft with the specified
+        number of stages
+    """
+    stages = max(stages, 1)
+    return np.dtype([
+        ('phase',      'S32'),
+        ('beg_MET',    'f8'),
+        ('end_MET',    'f8'),
+        ('beg_mass',   'f8'),
+        ('end_mass',   'f8'),
+        ('end_fuel',   'f8'),
+        ('end_prop',   'f8', (stages,)),
+        ('dV',         'f8'),
+        ('burn_time',  'f8'),
+        ('fuel_drawn', 'f8', (stages,)),
+        ('prop_drawn', 'f8', (stages,)),
+    ])
+
+
+def allocate(phases, stages):
+    """ an empty results table for the named phases
+    """
+    table = np.zeros(len(phases), dtype=dtype(stages))
+    table['phase'] = phases
+    return table
+
+
+def columns(table):
+    """ column names with per-stage fields expanded (e.g. end_prop_0)
+    """
+    names = []
+    for name in table.dtype.names:
+        shape = table.dtype.fields[name][0].shape
+        if shape:
+            names.extend(['%s_%d' % (name, i) for i in range(shape[0])])
+        else:
+            names.append(name)
+    return names
+
+
+def write_csv(table, output=sys.stdout):
+    """ stream the results table as CSV
+    """
+    print >>output, ','.join(columns(table))
+    for row in table:
+        values = []
+        for name in table.dtype.names:
+            value = row[name]
+            if name == 'phase':
+                values.append(str(value))
+            elif np.ndim(value):
+                values.extend([repr(float(v)) for v in value])
+            else:
+                values.append(repr(float(value)))
+        print >>output, ','.join(values)
+
+
+def save(table, path):
+    """ save the results table, as CSV if the path ends with .csv or else
+        in numpy's binary format
+    """
+    if path.endswith('.csv'):
+        with open(path, 'w') as output:
+            write_csv(table, output)
+    else:
+        np.save(path, table)
+
+
+def load(path):
+    """ memory-map a results table saved in numpy's binary format
+    """
+    return np.load(path, mmap_mode='r')
@@ -0,0 +1,111 @@
+"""
+   rollup.py
+
+   Memoization of subsystem mass roll-ups.
+
+   The wet mass and mass properties (moments, moments of inertia and Cg)
+   of a subsystem depend only on its own location and dry mass, the mass
+   properties of its items and the roll-ups of the subsystems within it.
+   Each subsystem is given a Merkle hash of those values, where the
+   subsystems within it contribute their own hashes, so identical subtrees
+   have identical hashes whether they are in different design variants or
+   are the same subtree in repeated phases.  Roll-ups are cached on the
+   hash in a bounded LRU cache shared by all subsystems, so an identical
+   subtree is only rolled up once.  The cache is safe to use from multiple
+   threads.
+
+   Each subsystem also keeps its own hash until it is told (by trait change
+   notifications) that one of its items or inputs has changed, which
+   forgets the hash of the subsystem and of every subsystem containing it.
+   A roll-up of an unchanged subtree is then a single cache lookup, without
+   visiting or hashing anything below it.
+
+   The wet mass alone (Subsystem.update_wet_mass, after every burn and
+   drop) is rolled up the same way.  It is cached on the same hashes, as
+   an entry of its own that the full roll-up also stores, so the sums of
+   unchanged subtrees are not repeated either.
+"""
+
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+
+# traits of items and subsystems that the hashes depend on
+item_traits = ('mass', 'Mx', 'My', 'Mz', 'Ioxx', 'Ioyy', 'Iozz')
+subsystem_traits = ('x', 'y', 'z', 'dry_mass')
+
+
+def item_hash(name, item, fluid):
+    """ hash of the mass properties of an item
+    """
+    return hashlib.sha1(repr((name, fluid, float(item.mass),
+                              float(item.Mx), float(item.My), float(item.Mz),
+                              float(item.Ioxx), float(item.Ioyy), float(item.Iozz)))).hexdigest()
+
+
+def subsystem_hash(subsystem, items, children):
+    """ Merkle hash of a subsystem given the hashes of its items and of the
+        subsystems within it (as lists of (name, hash))
+    """
+    return hashlib.sha1(repr((float(subsystem.x), float(subsystem.y), float(subsystem.z),
+                              float(subsystem.dry_mass), items, children))).hexdigest()
+
+
+class RollupCache(object):
+    """ bounded LRU cache of subsystem roll-ups
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """ get the cached roll-up for the key (None if not cached)
+        """
+        with self._lock:
+            if key in self._entries:
+                value = self._entries.pop(key)
+                self._entries[key] = value  # most recently used
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def store(self, key, rollup):
+        """ add a roll-up to the cache, evicting the least recently used
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = rollup
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """ get cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits':     self.hits,
+                'misses':   self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'size':     len(self._entries),
+                'maxsize':  self.maxsize,
+            }
+
+    def clear(self):
+        """ clear cached roll-ups and statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# default cache used by Subsystem.rollup (None disables memoization)
+cache = RollupCache()
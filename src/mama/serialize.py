@@ -0,0 +1,266 @@
+"""
+   serialize.py
+
+   Compact serialization of spacecraft and missions.
+
+   Pickling an OpenMDAO assembly pickles everything hanging off of it
+   (trait metadata, workflows, loggers and their buffers).  Instead, the
+   definition of a Spacecraft, Stage, Subsystem or Mission is captured as
+   a table of the objects in its tree, each with its class, the values of
+   its (unconnected) inputs and its links to other objects, children that
+   it owns as well as slots that refer to objects elsewhere in the tree
+   (such as an orbit shared by several maneuvers).  The object is rebuilt
+   from the definition by creating each object and linking them up again.
+
+   dumps and loads turn an object into a blob and back.  They are not
+   hooked into pickle, so pickling or copying an object still carries its
+   outputs and run time state.
+
+   A definition is pickled and compressed into a blob, which can be sent
+   to each worker of a process pool once.  The cases to be run are then
+   sent to the workers as deltas: the inputs (by path) that differ from
+   the template, typically a few hundred bytes per case.
+"""
+
+import cPickle as pickle
+import multiprocessing
+import zlib
+
+import numpy as np
+
+
+# lists of children that are added with a method of the parent
+adders = {
+    'stages': 'add_stage',
+    'phases': 'add_phase',
+}
+
+
+def _is_container(value):
+    return hasattr(value, 'list_containers')
+
+
+def definition(root):
+    """ the definition of an object and the tree of objects below it,
+        a list of (class, inputs, links, lists) for each object (root first)
+        with links as (name, index, owned)
+    """
+    table = []
+    index = {}
+
+    def visit(obj):
+        if id(obj) in index:
+            return index[id(obj)]
+        i = len(table)
+        index[id(obj)] = i
+        table.append(None)
+
+        klass = (obj.__class__.__module__, obj.__class__.__name__)
+
+        inputs = {}
+        for name in obj.list_inputs(connected=False):
+            value = getattr(obj, name)
+            if _is_container(value) or name in adders:
+                continue
+            inputs[name] = value
+
+        links = []
+        driver = getattr(obj, 'driver', None)
+        for name in obj.list_containers():
+            child = getattr(obj, name)
+            if child is None or child is driver:
+                continue
+            links.append((name, visit(child), child.parent is obj))
+
+        lists = []
+        for attr in adders:
+            if hasattr(obj, attr):
+                lists.append((attr, [child.name for child in getattr(obj, attr)]))
+
+        table[i] = (klass, inputs, links, lists)
+        return i
+
+    visit(root)
+    return table
+
+
+def paths(table):
+    """ path of each object in a definition (by ownership, from the root)
+        objects that are only referred to by slots take the path of the
+        first slot that refers to them
+    """
+    result = [None] * len(table)
+    result[0] = ''
+
+    def join(i, name):
+        return result[i] + '.' + name if result[i] else name
+
+    while True:
+        # follow ownership as far as it goes
+        found = True
+        while found:
+            found = False
+            for i, (klass, inputs, links, lists) in enumerate(table):
+                if result[i] is None:
+                    continue
+                for name, child, owned in links:
+                    if owned and result[child] is None:
+                        result[child] = join(i, name)
+                        found = True
+
+        # then the first slot to an object without a path
+        slots = [(i, name, child) for i, (klass, inputs, links, lists) in enumerate(table)
+                                  if result[i] is not None
+                                  for name, child, owned in links
+                                  if not owned and result[child] is None]
+        if not slots:
+            return result
+        i, name, child = slots[0]
+        result[child] = join(i, name)
+
+
+def build(table):
+    """ rebuild an object (and the tree below it) from its definition
+        children that the object creates itself (in its constructor or
+        configure) are reused, otherwise they are created and added
+    """
+    objects = [None] * len(table)
+
+    def create(i):
+        module, name = table[i][0]
+        module = __import__(module, fromlist=[name])
+        objects[i] = getattr(module, name)()
+        return objects[i]
+
+    def attach(i):
+        obj = objects[i]
+        klass, inputs, links, lists = table[i]
+        owned = [(name, child) for name, child, own in links if own]
+        listed = dict((name, attr) for attr, names in lists for name in names)
+        ordered = [(name, child) for attr, names in lists for name in names
+                                 for n, child in owned if n == name]
+        ordered.extend([(name, child) for name, child in owned if name not in listed])
+
+        for name, child in ordered:
+            existing = getattr(obj, name, None)
+            if existing is not None and \
+               (existing.__class__.__module__, existing.__class__.__name__) == table[child][0]:
+                objects[child] = existing
+            else:
+                create(child)
+                if name in listed:
+                    getattr(obj, adders[listed[name]])(name, objects[child])
+                else:
+                    obj.add(name, objects[child])
+            attach(child)
+
+    # owned objects from the root down, then any objects that are only
+    # referred to by slots
+    create(0)
+    attach(0)
+    for i in range(len(table)):
+        if objects[i] is None:
+            create(i)
+            attach(i)
+
+    for obj, (klass, inputs, links, lists) in zip(objects, table):
+        for name, child, owned in links:
+            if not owned:
+                setattr(obj, name, objects[child])
+        for name, value in inputs.items():
+            setattr(obj, name, value)
+
+    return objects[0]
+
+
+def dumps(obj):
+    """ the compressed definition of an object
+    """
+    return zlib.compress(pickle.dumps(definition(obj), pickle.HIGHEST_PROTOCOL))
+
+
+def decode(blob):
+    """ the definition in a compressed blob
+    """
+    return pickle.loads(zlib.decompress(blob))
+
+
+def loads(blob):
+    """ rebuild an object from its compressed definition
+    """
+    return build(decode(blob))
+
+
+def _equal(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+
+def delta(template, obj):
+    """ the inputs of an object that differ from a template (an object or
+        its definition) with the same structure, as a dict of path: value
+    """
+    if not isinstance(template, list):
+        template = definition(template)
+    table = definition(obj)
+    if [entry[0] for entry in table] != [entry[0] for entry in template]:
+        raise Exception(obj, 'does not have the same structure as the template')
+
+    changes = {}
+    for path, (klass, inputs, links, lists), (k, base, l, s) in zip(paths(table), table, template):
+        for name, value in inputs.items():
+            if name not in base or not _equal(value, base[name]):
+                changes[path + '.' + name if path else name] = value
+    return changes
+
+
+def apply(obj, changes):
+    """ set the inputs of an object given by a delta
+    """
+    for path, value in changes.items():
+        names = path.split('.')
+        target = obj
+        for name in names[:-1]:
+            target = getattr(target, name)
+        setattr(target, names[-1], value)
+    return obj
+
+
+# template definition, set once in each worker process
+_template = None
+
+
+def _initialize(blob):
+    global _template
+    _template = decode(blob)
+
+
+def _evaluate(task):
+    evaluate, changes = task
+    return evaluate(apply(build(_template), changes))
+
+
+def run(template, cases, evaluate, processes=None):
+    """ evaluate each case in a pool of processes (processes=None uses all
+        cores, 1 disables), where the cases are deltas from the template
+        (an object or its blob) that are applied to a fresh copy of it
+
+        evaluate must be a module level function (so that it can be sent to
+        the pool) that runs the object and returns its result
+    """
+    blob = template if isinstance(template, str) else dumps(template)
+
+    if processes == 1 or len(cases) < 2:
+        _initialize(blob)
+        return [_evaluate((evaluate, changes)) for changes in cases]
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes, _initialize, (blob,))
+    try:
+        results = pool.map(_evaluate, [(evaluate, changes) for changes in cases])
+    finally:
+        pool.close()
+        pool.join()
+    return results
@@ -8,10 +8,37 @@ import StringIO
 from subsystem import Subsystem
 from openmdao.lib.datatypes.api import Str, Float, Int, List, Slot
 
-from subsystems import IPropulsion, IRCS, IFuelSystem
+from subsystems import IPropulsion, IRCS, IFuelSystem, IExpendable
 from openmdao.main.mp_support import has_interface
 
-from math import exp
+import numpy as np
+
+import staging
+import boiloff
+from ledger import Ledger
+
+
+g = 9.8062E-3  # gravitational constant
+
+
+def fuel_required(mass, dV, Isp, bulk_reserve=0., dV_reserve=0., Isp_reserve=0., other_reserve=0.):
+    """ nominal fuel burn (PMNOM) and fuel burn with reserves (PROP) for the
+        specified delta-V, by the rocket equation (works on arrays)
+    """
+    res1 = bulk_reserve
+    res2 = 1.0 + dV_reserve
+    res3 = 1.0 - Isp_reserve
+    res4 = other_reserve
+
+    # use rocket equation to calculate nominal fuel burn
+    fuel_nominal = mass * (1.-(1./np.exp(dV/(Isp*g))))
+
+    res1 = fuel_nominal * res1
+    res2 = mass*(1.0-(1.0/np.exp(dV*res2/(Isp*g))))-fuel_nominal
+    res3 = mass*(1.0-(1.0/np.exp(dV/(Isp*res3*g))))-fuel_nominal
+    res4 = fuel_nominal * res4
+
+    return fuel_nominal, fuel_nominal + res1 + res2 + res3 + res4
 
 
 class Stage(Subsystem):
@@ -20,17 +47,40 @@ class Stage(Subsystem):
     crew_count = Int(0, iotype='in',
         desc='number of crew members for this stage')
 
+    def ledger(self):
+        """ the resource ledger of the spacecraft and the index of this
+            stage in it (None if the stage is not on a spacecraft with a ledger)
+        """
+        ledger = getattr(self.parent, 'resource_ledger', None)
+        if ledger is None or self.name not in ledger.stages:
+            return None, None
+        return ledger, ledger.index(self.name)
+
+    def post(self, resource, amount):
+        """ credit (or debit, if negative) an amount of a resource of this
+            stage in the resource ledger and update the wet mass of the stage
+            and the spacecraft from it
+            returns False if there is no ledger
+        """
+        ledger, index = self.ledger()
+        if ledger is None:
+            return False
+        ledger.credit(index, resource, amount)
+        self.wet_mass = ledger.stage_wet_mass(index)
+        self.parent.wet_mass = ledger.wet_mass()
+        return True
+
     def drop_mass(self, mass):
-        """ add to fixed mass of stage
-            TODO: implement a payload or cargo mass
+        """ remove from fixed mass of stage
         """
-        self.dry_mass = self.dry_mass - mass
+        if not self.post('fixed', -mass):
+            self.dry_mass = self.dry_mass - mass
 
     def pickup_mass(self, mass):
-        """ remove from fixed mass of stage
-            TODO: implement a payload or cargo mass
+        """ add to fixed mass of stage
         """
-        self.dry_mass = self.dry_mass + mass
+        if not self.post('fixed', mass):
+            self.dry_mass = self.dry_mass + mass
 
     def get_fuel(self):
         """ get the mass of fuel on the specified stage
@@ -57,9 +107,11 @@ class Stage(Subsystem):
             raise Exception(self, 'has multiple fuel tanks')
         else:
             fuelsystem = self.get(fuelsystem[0])
+            before = fuelsystem.get_fuel()
             fuelsystem.add_fuel()
             # fuelsystem.tank.display()
-            self.update_wet_mass()
+            if not self.post('fuel', fuelsystem.get_fuel() - before):
+                self.update_wet_mass()
 
     def expend_fuel(self, fuel):
         """ remove the specified mass of fuel from the specified stage
@@ -73,7 +125,8 @@ class Stage(Subsystem):
             fuelsystem = self.get(fuelsystem[0])
             self.log('    expending', fuel, 'kg of fuel from', self.name, fuelsystem.name)
             fuelsystem.expend_fuel(fuel)
-            self.update_wet_mass()
+            if not self.post('fuel', -fuel):
+                self.update_wet_mass()
 
     def get_prop(self):
         """ get the mass of RCS propellant on the specified stage
@@ -99,9 +152,11 @@ class Stage(Subsystem):
             self.log(self.name, 'has multiple RCS')
         else:
             propsystem = self.get(propsystem[0])
+            before = propsystem.get_prop()
             propsystem.add_prop()
             # propsystem.display()
-            self.update_wet_mass()
+            if not self.post('prop', propsystem.get_prop() - before):
+                self.update_wet_mass()
 
     def expend_prop(self, prop):
         """ remove the specified mass of RCS prop from the specified stage
@@ -115,22 +170,28 @@ class Stage(Subsystem):
             propsystem = self.get(propsystem[0])
             self.log('    expending', prop, 'kg of prop from', self.name, propsystem.name)
             propsystem.expend_prop(prop)
-            self.update_wet_mass()
+            if not self.post('prop', -prop):
+                self.update_wet_mass()
 
     def expend_consumables(self, duration):
         """ calculates and jettisons crew consumable mass
         """
         if self.crew_count > 0:
-            consumption = self.crew_consumable_rate * duration * self.crew_count
+            rate = getattr(self.parent, 'crew_consumable_rate', 0.0)
+            consumption = rate * duration * self.crew_count
             self.log('    expending consumables from', self.name, consumption)
-            self.drop_mass(consumption)
+            if not self.post('consumables', -consumption):
+                self.dry_mass = self.dry_mass - consumption
 
-    def boil_off(self, duration):
+    def boil_off(self, duration, orbit=None):
         """ calculates and expends fuel boil-off based on duration
+            (and the orbit, for cryogenic tanks)
         """
-        fuel_systems = self.get_children(IFuelSystem)
-        for fuel_system in fuel_systems:
-            self.get(fuel_system).boil_off(duration)
+        before = self.get_fuel()
+        for stage, fuel_system, mass in boiloff.boil_off([self], duration, orbit):
+            self.log('    boil-off from', self.name, fuel_system.name, mass)
+        if not self.post('fuel', self.get_fuel() - before):
+            self.update_wet_mass()
 
     def burn(self, dV, stage=None, bulk_reserve=0., dV_reserve=0., Isp_reserve=0., other_reserve=0.):
         """ calculates the nominal propellant required for the specified delta-V (PMNOM).
@@ -153,25 +214,10 @@ class Stage(Subsystem):
         self.log('    burning fuel from %s %s' % (self.name, prop_system.name),
                 '(thrust = %1.1f, Isp = %1.1f) for delta-V of %1.3f' % (thrust, Isp, dV))
 
-        res1 = bulk_reserve
-        res2 = 1.0 + dV_reserve
-        res3 = 1.0 - Isp_reserve
-        res4 = other_reserve
-
         mass = self.wet_mass
 
-        g = 9.8062E-3  # gravitational constant
-
-        # use rocket equation to calculate nominal fuel burn
-        fuel_nominal = mass * (1.-(1./exp(dV/(Isp*g))))
-
-        res1 = fuel_nominal * res1
-        res2 = mass*(1.0-(1.0/exp(dV*res2/(Isp*g))))-fuel_nominal
-        res3 = mass*(1.0-(1.0/exp(dV/(Isp*res3*g))))-fuel_nominal
-        res4 = fuel_nominal * res4
-
-        fuel_nominal = fuel_nominal
-        fuel_burn = fuel_nominal + res1 + res2 + res3 + res4
+        fuel_nominal, fuel_burn = fuel_required(mass, dV, Isp,
+            bulk_reserve, dV_reserve, Isp_reserve, other_reserve)
 
         self.log('    nominal fuel burn = %1.3f' % fuel_nominal)
         self.log('    fuel burn with reserve = %1.3f' % fuel_burn)
@@ -224,8 +270,10 @@ class Spacecraft(Subsystem):
         """ instrumented execute function
         """
         self.log('\nExecuting spacecraft:', self.description)
+        self.resource_ledger = None
         self.add_fuel()  # fill all fuel tanks to capacity
         super(Spacecraft, self).execute()
+        self.resource_ledger = Ledger.open(self)
         self.log('')
         self.log(self.__str__())
 
@@ -253,6 +301,18 @@ class Spacecraft(Subsystem):
         #         total_boiloff += ss.total_boiloff
         # print '  total boil_off =', total_boiloff
 
+    def update_wet_mass(self):
+        """ Update the wet mass of the spacecraft and its stages from the
+            resource ledger (or the subsystem tree, if there is no ledger)
+        """
+        ledger = getattr(self, 'resource_ledger', None)
+        if ledger is None:
+            super(Spacecraft, self).update_wet_mass()
+            return
+        for stage, wet_mass in zip(self.stages, ledger.stage_wet_mass()):
+            stage.wet_mass = wet_mass
+        self.wet_mass = ledger.wet_mass()
+
     def get_total_inertia(self):
         self.get_mass_properties
         self.Cgrocket = self.Cg
@@ -333,9 +393,25 @@ class Spacecraft(Subsystem):
         self.update_wet_mass()
 
     def drop(self, subsystem):
-        """ drop the specified subsystem and update masses
+        """ drop the specified subsystem (given by its path, starting with
+            the stage) and update masses
         """
-        self.get(subsystem).drop()
+        names = subsystem.split('.')
+        stage = self.get_stage(names[0])
+        expendable = self.get(subsystem)
+
+        # the mass removed is whatever the drop takes out of the stage, from
+        # cargo if the ledger counted it as cargo (see Ledger.open)
+        stage.update_wet_mass()
+        before = stage.wet_mass
+        expendable.drop()
+        stage.update_wet_mass()
+        removed = before - stage.wet_mass
+
+        if len(names) == 2 and has_interface(expendable, IExpendable):
+            stage.post('cargo', -removed)
+        else:
+            stage.post('fixed', -removed)
         self.update_wet_mass()
 
     def pickup_mass(self, stage, mass):
@@ -348,18 +424,59 @@ class Spacecraft(Subsystem):
         """ calculates and jettisons crew consumable mass
         """
         for stage in self.stages:
-            if stage.crew_count > 0:
-                consumption = self.crew_consumable_rate * duration * stage.crew_count
-                self.log('    expending consumables from', stage.name, consumption)
-                stage.drop_mass(consumption)
+            stage.expend_consumables(duration)
 
-    def boil_off(self, duration):
+    def boil_off(self, duration, orbit=None):
         """ calculates and expends fuel boil-off based on duration
+            (and the orbit, for cryogenic tanks, which are all calculated at once)
         """
-        for stage in self.stages:
-            fuel_systems = stage.get_children(IFuelSystem)
-            for fuel_system in fuel_systems:
-                stage.get(fuel_system).boil_off(duration)
+        before = np.array([stage.get_fuel() for stage in self.stages])
+        for stage, fuel_system, mass in boiloff.boil_off(self.stages, duration, orbit):
+            self.log('    boil-off from', stage.name, fuel_system.name, mass)
+        if getattr(self, 'resource_ledger', None) is not None:
+            after = np.array([stage.get_fuel() for stage in self.stages])
+            self.resource_ledger.credit(np.arange(len(self.stages)), 'fuel', after - before)
+        self.update_wet_mass()
+
+    def clone(self):
+        """ a lightweight copy-on-write clone of the spacecraft, with its
+            current mass state (the spacecraft must have been executed)
+        """
+        from clone import SpacecraftStructure
+        return SpacecraftStructure(self).clone()
+
+    def optimize_staging(self, dV, payload=None):
+        """ calculates the fuel load for each stage that delivers the payload
+            through the specified delta-V with the least total mass, using the
+            structural fraction (dry / (dry + fuel)) of each fueled stage and
+            the Isp of the main propulsion.  Stages are burned from the forward
+            stage back to the core stage (as in burn), and the payload defaults
+            to the mass of the stages without fuel.
+            Returns the fuel for each stage (in stage order) and the payload fraction.
+        """
+        fueled = [i for i, stage in enumerate(self.stages) if stage.get_fuel() > 0]
+        if len(fueled) < 1:
+            raise Exception(self, 'has no fueled stages')
+        burn_order = fueled[::-1]
+
+        epsilon = [self.stages[i].dry_mass / (self.stages[i].dry_mass + self.stages[i].get_fuel())
+                   for i in burn_order]
+
+        core = self.get_stage(0)
+        prop_system = core.get(core.get_children(IPropulsion)[0])
+
+        n, payload_fraction = staging.optimize(dV, [prop_system.Isp]*len(burn_order), epsilon)
+        if payload is None:
+            payload = sum([stage.wet_mass for i, stage in enumerate(self.stages) if i not in fueled])
+        prop, gross = staging.propellant(payload, n, epsilon)
+
+        fuel = [0.0] * len(self.stages)
+        for k, i in enumerate(burn_order):
+            fuel[i] = float(prop[k])
+            self.log('    optimal fuel for %s = %1.1f' % (self.stages[i].name, fuel[i]))
+        self.log('    payload fraction for delta-V of %1.3f = %1.4f' % (dV, payload_fraction))
+
+        return fuel, float(payload_fraction)
 
     def burn(self, dV, stage, bulk_reserve=0., dV_reserve=0., Isp_reserve=0., other_reserve=0.):
         """ calculates the nominal propellant required for the specified delta-V (PMNOM).
@@ -387,26 +504,11 @@ class Spacecraft(Subsystem):
         self.log('    burning fuel from %s %s' % (prop_stage.name, prop_system.name),
                 '(thrust = %1.1f, Isp = %1.1f) for delta-V of %1.3f' % (thrust, Isp, dV))
 
-        res1 = bulk_reserve
-        res2 = 1.0 + dV_reserve
-        res3 = 1.0 - Isp_reserve
-        res4 = other_reserve
-
         mass = self.wet_mass
         self.log('    initial mass =', mass)
 
-        g = 9.8062E-3  # gravitational constant
-
-        # use rocket equation to calculate nominal fuel burn
-        fuel_nominal = mass * (1.-(1./exp(dV/(Isp*g))))
-
-        res1 = fuel_nominal * res1
-        res2 = mass*(1.0-(1.0/exp(dV*res2/(Isp*g))))-fuel_nominal
-        res3 = mass*(1.0-(1.0/exp(dV/(Isp*res3*g))))-fuel_nominal
-        res4 = fuel_nominal * res4
-
-        fuel_nominal = fuel_nominal
-        fuel_burn = fuel_nominal + res1 + res2 + res3 + res4
+        fuel_nominal, fuel_burn = fuel_required(mass, dV, Isp,
+            bulk_reserve, dV_reserve, Isp_reserve, other_reserve)
 
         self.log('    nominal fuel burn = %1.3f' % fuel_nominal)
         self.log('    fuel burn with reserve = %1.3f' % fuel_burn)
@@ -0,0 +1,92 @@
+"""
+   staging.py
+
+   Optimal propellant split for serial stages.
+
+   For stages burned in sequence, each with exhaust velocity c = Isp g and
+   structural fraction e = dry / (dry + propellant), the payload delivered
+   through a total delta-V is maximized (by the method of Lagrange
+   multipliers) when the stage mass ratios are
+
+       n_k = (c_k L - 1) / (c_k e_k L)
+
+   with the multiplier L chosen so that sum(c_k ln n_k) = delta-V.  L is
+   found by bisection for whole arrays of candidate stage combinations at
+   once, so many architectures can be ranked in a single call.
+
+   Stage arrays have the stages along the last axis, in the order in which
+   they are burned.  Units are km/s, seconds (Isp) and kg.
+"""
+
+import numpy as np
+
+
+g = 9.8062E-3  # gravitational constant (km/s^2), as used by Spacecraft.burn
+
+ITERATIONS = 64  # bisection iterations on 1/L
+
+
+def optimize(dV, Isp, epsilon):
+    """ optimal stage mass ratios (initial / final mass of each stage burn)
+        and the payload fraction (payload / initial mass) for the specified
+        delta-V, Isp and structural fractions, which may be arrays
+
+        cases where the delta-V can not be reached have NaN results
+    """
+    Isp, epsilon = np.broadcast_arrays(np.asarray(Isp, dtype=float),
+                                       np.asarray(epsilon, dtype=float))
+    c = Isp * g
+    dV = np.asarray(dV, dtype=float) * np.ones(c.shape[:-1])
+
+    # every stage must have a mass ratio above one, which bounds 1/L
+    s_lo = np.zeros(dV.shape)
+    s_hi = (c * (1 - epsilon)).min(axis=-1)
+
+    def total(s):
+        n = (c - s[..., np.newaxis]) / (c * epsilon)
+        return (c * np.log(n)).sum(axis=-1)
+
+    # the delta-V decreases as 1/L increases from zero (all stages at their
+    # maximum mass ratio of 1/epsilon)
+    feasible = total(s_lo) > dV
+    for i in range(ITERATIONS):
+        s = (s_lo + s_hi) / 2
+        high = total(s) > dV
+        s_lo = np.where(high, s, s_lo)
+        s_hi = np.where(high, s_hi, s)
+    s = (s_lo + s_hi) / 2
+
+    n = (c - s[..., np.newaxis]) / (c * epsilon)
+    payload_fraction = ((1 - n*epsilon) / (n * (1 - epsilon))).prod(axis=-1)
+
+    n = np.where(feasible[..., np.newaxis], n, np.nan)
+    payload_fraction = np.where(feasible, payload_fraction, np.nan)
+    return n, payload_fraction
+
+
+def propellant(payload, n, epsilon):
+    """ propellant mass for each stage, and the gross mass, to deliver the
+        payload with the specified stage mass ratios and structural fractions
+    """
+    n, epsilon = np.broadcast_arrays(np.asarray(n, dtype=float),
+                                     np.asarray(epsilon, dtype=float))
+    mass = np.asarray(payload, dtype=float) * np.ones(n.shape[:-1])
+    prop = np.zeros(n.shape)
+
+    # size the stages from the last burned to the first
+    for k in range(n.shape[-1] - 1, -1, -1):
+        stage = mass * (n[..., k] - 1) / (1 - n[..., k]*epsilon[..., k])
+        prop[..., k] = stage * (1 - epsilon[..., k])
+        mass = mass + stage
+
+    return prop, mass
+
+
+def rank(dV, Isp, epsilon):
+    """ indices of candidate stage combinations (rows of Isp and epsilon)
+        from the highest to the lowest payload fraction, infeasible last,
+        and the payload fractions
+    """
+    n, payload_fraction = optimize(dV, Isp, epsilon)
+    order = np.argsort(np.where(np.isnan(payload_fraction), -np.inf, payload_fraction))[::-1]
+    return order, payload_fraction
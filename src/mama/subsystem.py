@@ -12,6 +12,8 @@ from openmdao.main.api import Assembly, Component
 from openmdao.lib.datatypes.api import Str, Float, List
 from openmdao.main.mp_support import has_interface
 
+import rollup
+
 
 class MassItem(Component):
     """ a component that computes mass properties for an item within a subsystem
@@ -242,17 +244,25 @@ class Subsystem(Assembly):
 
     def update_wet_mass(self):
         """ Update the wet mass of the subsystem to account for fuel burn, etc.
-            (without re-executing everything)
+            (without re-executing everything, or updating mass properties)
         """
-        self.wet_mass = 0
+        if rollup.cache is not None:
+            self.roll_up(mass_properties=False)
+            return
 
         subsystems = self.get_children(Subsystem)
+        for subsystem in subsystems:
+            self.get(subsystem).update_wet_mass()
+        self.sum_wet_mass(subsystems, self.get_children(MassItem))
+
+    def sum_wet_mass(self, subsystems, items):
+        """ sum the wet mass of the subsystem from its subsystems and items
+        """
+        self.wet_mass = 0
+
         if len(subsystems) > 0:
-            for subsystem in subsystems:
-                self.get(subsystem).update_wet_mass()
             self.wet_mass += self.summation(subsystems, 'wet_mass')
 
-        items = self.get_children(MassItem)
         # self.wet_mass += self.summation(items, 'mass')
         for item in items:
             self.wet_mass += self.get(item).mass
@@ -261,6 +271,18 @@ class Subsystem(Assembly):
             self.wet_mass = self.dry_mass
 
     def update_mass_properties(self):
+        if rollup.cache is not None:
+            self.roll_up()
+            return
+
+        subsystems = self.get_children(Subsystem)
+        for name in subsystems:
+            self.get(name).update_mass_properties()
+        self.sum_mass_properties(subsystems, self.get_children(MassItem))
+
+    def sum_mass_properties(self, subsystems, items):
+        """ sum the mass properties of the subsystem from its subsystems and items
+        """
         self.Mx = 0
         self.My = 0
         self.Mz = 0
@@ -269,11 +291,9 @@ class Subsystem(Assembly):
         self.Iozz = 0
 
         # roll up properties from subsystems
-        subsystems = self.get_children(Subsystem)
         if len(subsystems) > 0:
             for name in subsystems:
                 subsystem = self.get(name)
-                subsystem.update_mass_properties()
                 self.Mx += subsystem.wet_mass*(subsystem.Cg[0] + self.x)
                 self.My += subsystem.wet_mass*(subsystem.Cg[1] + self.y)
                 self.Mz += subsystem.wet_mass*(subsystem.Cg[2] + self.z)
@@ -282,7 +302,6 @@ class Subsystem(Assembly):
                 self.Iozz += subsystem.Iozz
 
         # roll up properties from equipment and fluids
-        items = self.get_children(MassItem)
         if len(items) > 0:
             for name in items:
                 item = self.get(name)
@@ -300,6 +319,73 @@ class Subsystem(Assembly):
         else:
             self.Cg = [0.0, 0.0, 0.0]
 
+    def roll_up(self, mass_properties=True):
+        """ update the wet mass and (unless told otherwise) the mass
+            properties of the subsystem and all subsystems within it, reusing
+            the roll-up of any identical subtree from the shared roll-up cache
+            the hash of the subtree is kept until an item or input of the
+            subtree changes, so unchanged subtrees are not visited again
+            (a subtree whose wet mass alone was rolled up is visited again for
+            its mass properties)
+            returns the Merkle hash of the subtree
+        """
+        names = self.list_containers()
+        known = getattr(self, '_rollup_key', None)
+        if known is not None and known[0] == id(self) and known[1] == names and \
+           (known[3] or not mass_properties):
+            key = known[2]
+        else:
+            subsystems = self.get_children(Subsystem)
+            children = [(name, self.get(name).roll_up(mass_properties)) for name in subsystems]
+
+            item_hashes = []
+            for name in self.get_children(MassItem):
+                item = self.get(name)
+                for trait in rollup.item_traits:
+                    item.on_trait_change(self._rollup_modified, trait)
+                item_hashes.append((name, rollup.item_hash(name, item, isinstance(item, Fluid))))
+
+            key = rollup.subsystem_hash(self, item_hashes, children)
+            for trait in rollup.subsystem_traits:
+                self.on_trait_change(self._rollup_modified, trait)
+            self._rollup_key = (id(self), names, key, mass_properties)
+        self.subtree_hash = key
+
+        if not mass_properties:
+            wet_mass = rollup.cache.lookup(key + ':wet_mass')
+            if wet_mass is None:
+                self.sum_wet_mass(self.get_children(Subsystem), self.get_children(MassItem))
+                rollup.cache.store(key + ':wet_mass', self.wet_mass)
+            else:
+                self.wet_mass = wet_mass
+            return key
+
+        values = rollup.cache.lookup(key)
+        if values is None:
+            subsystems = self.get_children(Subsystem)
+            items = self.get_children(MassItem)
+            self.sum_wet_mass(subsystems, items)
+            self.sum_mass_properties(subsystems, items)
+            rollup.cache.store(key, (self.wet_mass, self.Mx, self.My, self.Mz,
+                                     self.Ioxx, self.Ioyy, self.Iozz, tuple(self.Cg)))
+            rollup.cache.store(key + ':wet_mass', self.wet_mass)
+        else:
+            (self.wet_mass, self.Mx, self.My, self.Mz,
+             self.Ioxx, self.Ioyy, self.Iozz, Cg) = values
+            self.Cg = list(Cg)
+
+        return key
+
+    def _rollup_modified(self):
+        """ forget the roll-up hash of this subsystem and the subsystems
+            containing it, when one of its items or inputs changes
+        """
+        subsystem = self
+        while isinstance(subsystem, Subsystem) and \
+              getattr(subsystem, '_rollup_key', None) is not None:
+            subsystem._rollup_key = None
+            subsystem = subsystem.parent
+
     Cgrocket = List([0.0, 0.0, 0.0], iotype='in',
         desc='center of gravity for entire system')
 
@@ -333,8 +419,18 @@ class Subsystem(Assembly):
                 self.Iyy += item.dry_mass*((item.x - self.Cgrocket[0])**2 + (item.z - self.Cgrocket[2])**2)
                 self.Izz += item.dry_mass*((item.x - self.Cgrocket[0])**2 + (item.y - self.Cgrocket[1])**2)
 
+    def set_logger(self, logger):
+        """ log to the specified logger (instead of the global 'mission'
+            logger), for this subsystem and all subsystems within it
+        """
+        self._logger = logger
+        for name in self.list_containers():
+            child = self.get(name)
+            if hasattr(child, 'set_logger'):
+                child.set_logger(logger)
+
     def log(self, *args):
-        logger = logging.getLogger('mission')
+        logger = getattr(self, '_logger', None) or logging.getLogger('mission')
         msg = ''
         for arg in args:
             msg += str(arg) + ' '
@@ -4,7 +4,7 @@
 
 from openmdao.lib.datatypes.api import *
 
-from subsystem import Subsystem
+from subsystem import Subsystem, Equipment
 
 from zope.interface import Interface, Attribute, implements
 
@@ -53,6 +53,21 @@ class IFuelSystem(Interface):
         """
 
 
+class ICryogenicTank(Interface):
+    """Interface for a fuel system with cryogenic propellant that boils off
+       (see boiloff, dome_ecc, absorptivity and emissivity are optional)"""
+
+    propellant = Attribute("Propellant (LH2, LO2 or LCH4)")
+
+    diameter = Attribute("Outer diameter of the tank (m)")
+
+    length = Attribute("Overall length of the tank, including domes (m)")
+
+    insulation_thickness = Attribute("Thickness of the insulation (m)")
+
+    insulation_conductivity = Attribute("Effective conductivity of the insulation (W/m/K)")
+
+
 class IExpendable(Interface):
     """ Interface for a component/subsystem than can be jettisoned. """
 
@@ -0,0 +1,108 @@
+"""
+   fixtures.py
+
+   Subsystems and missions shared by the tests.
+"""
+
+from zope.interface import implements
+
+from openmdao.lib.datatypes.api import Float
+
+from mama.subsystem import Subsystem, Equipment, Fluid
+from mama.subsystems import IPropulsion, IFuelSystem, CargoSubsystem
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Mission, Phase
+
+
+class Engine(Subsystem):
+    """ a simple main engine """
+
+    implements(IPropulsion)
+
+    thrust = Float(100.0, iotype='in')
+    Isp = Float(450.0, iotype='in')
+    cooldown_burn = Float(0.0, iotype='in')
+
+    def configure(self):
+        self.add('engine', Equipment(300.0))
+        super(Engine, self).configure()
+
+
+class Tank(Subsystem):
+    """ a simple fuel tank """
+
+    implements(IFuelSystem)
+
+    capacity = Float(0.0, iotype='in')
+
+    def configure(self):
+        self.add('tank', Equipment(1000.0))
+        self.add('fuel', Fluid())
+        super(Tank, self).configure()
+
+    def get_fuel(self):
+        return self.fuel.mass
+
+    def add_fuel(self, fuel=None):
+        self.fuel.mass = self.capacity
+
+    def expend_fuel(self, fuel):
+        self.fuel.mass = self.fuel.mass - fuel
+
+    def available_fuel(self):
+        return self.fuel.mass
+
+    def boil_off(self, duration):
+        pass
+
+
+class CoastMission(Mission):
+    """ a crewed two stage spacecraft coasting for a month, then arriving """
+
+    def configure(self):
+        core = Stage()
+        core.crew_count = 4
+        core.add('structure', Equipment(10000.0))
+        payload = Stage()
+        payload.add('payload', Equipment(2000.0))
+
+        spacecraft = Spacecraft()
+        spacecraft.crew_consumable_rate = 10.0
+        spacecraft.add_stage('core', core)
+        spacecraft.add_stage('payload', payload)
+        self.add('spacecraft', spacecraft)
+
+        coast = Phase()
+        coast.description = 'coast'
+        coast.duration = 30.0
+        self.add_phase('coast', coast)
+
+        arrive = Phase()
+        arrive.description = 'arrive'
+        arrive.duration = 5.0
+        self.add_phase('arrive', arrive)
+
+        super(CoastMission, self).configure()
+
+
+class DeliveryMission(Mission):
+    """ a spacecraft that delivers its cargo and returns home """
+
+    def configure(self):
+        core = Stage()
+        core.add('structure', Equipment(10000.0))
+        core.add('cargo', CargoSubsystem())
+        core.cargo.mass_cargo = 2000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', core)
+        self.add('spacecraft', spacecraft)
+
+        for name, duration in (('coast', 30.0), ('loiter', 20.0),
+                               ('depart', 10.0), ('home', 10.0)):
+            phase = Phase()
+            phase.description = name
+            phase.duration = duration
+            self.add_phase(name, phase)
+
+        super(DeliveryMission, self).configure()
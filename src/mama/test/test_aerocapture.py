@@ -0,0 +1,82 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama import aerocapture
+
+
+class AerocaptureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_aerocapture(self):
+        # aerocapture into Mars 250 x 33840 km orbit with Vinf = 5.31 km/s
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 33840
+        MEO.periapsis = 250
+
+        # sweep the entry corridor, too shallow does not capture, too steep
+        # drops the apoapsis too low
+        entry = np.linspace(30, 70, 41)
+        dV, dV_saved, heat_load = aerocapture.aerocapture(MEO, 5.31**2, entry, 100.0)
+        captured = ~np.isnan(dV)
+        self.assertTrue(captured.any())
+        self.assertFalse(captured[-1])
+        self.assertTrue(np.all(dV_saved[captured] > 0))
+        self.assertTrue(np.all(heat_load > 0))
+
+        maneuver = Maneuver()
+        maneuver.orbit = MEO
+        maneuver.maneuver_type = 'Aerocapture'
+        maneuver.C3 = 5.31**2
+        maneuver.aero_periapsis = entry[captured][0]
+        maneuver.ballistic_coefficient = 100.0
+        dV = maneuver.calculate_dV()
+        self.assertEqual(maneuver.passes, 1)
+        self.assertTrue(maneuver.dV_saved > 1.0)
+        self.assertTrue(dV > 0)
+
+    def test_aerobraking(self):
+        # aerobrake from Mars 250 x 33840 km orbit down to 1000 km apoapsis
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 33840
+        MEO.periapsis = 250
+
+        dV, dV_saved, passes, heat_load = aerocapture.aerobrake(MEO, [110, 120], 1000.0, 50.0)
+        self.assertTrue(np.all(passes > 1))
+        self.assertTrue(passes[1] > passes[0])  # fewer passes lower in the atmosphere
+        self.assertTrue(np.all(dV < dV_saved))
+
+        # the last passes, once the apoapsis is low in the atmosphere, end
+        # at apoapsis rather than running on until impact
+        dV, dV_saved, passes, heat_load = aerocapture.aerobrake(MEO, 110, 400.0, 50.0)
+        self.assertFalse(np.isnan(dV))
+        self.assertTrue(1 < passes < aerocapture.MAX_PASSES)
+        self.assertTrue(dV < dV_saved)
+
+        # an orbit without an atmosphere
+        LLO = Orbit()
+        LLO.body = 'Moon'
+        LLO.apoapsis = 300
+        LLO.periapsis = 100
+        self.assertRaises(Exception, aerocapture.aerobrake, LLO, 50, 200, 50.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
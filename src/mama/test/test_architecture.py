@@ -0,0 +1,97 @@
+import unittest
+
+import StringIO
+import logging
+
+from math import log
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import architecture
+from mama.architecture import Engine, Tank, Architecture
+
+
+engines = [
+    Engine('RL10',    99.2,  465.5, 0.0,  301.0),
+    Engine('NTR',    111.2,  900.0, 0.03, 2400.0),
+    Engine('Hydrazine', 0.4, 230.0, 0.0,  5.0),
+]
+
+tanks = [
+    Tank('small',   5000.0,  600.0),
+    Tank('medium', 20000.0, 1800.0),
+    Tank('large',  60000.0, 5000.0),
+]
+
+
+def evaluate(arch):
+    """ stand-in for building the spacecraft and running the mission,
+        returns the fuel capacity of the architecture
+    """
+    return sum([tank.capacity for tank in arch.tanks])
+
+
+class ArchitectureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_bound(self):
+        # a single stage is the ideal rocket equation
+        dV, gross = architecture.bound(engines, tanks, np.array([0]), np.array([[1]]), 10000.0)
+        assert_rel_error(self, gross[0], 10000.0 + 301.0 + 1800.0 + 20000.0, 0.0001)
+        assert_rel_error(self, dV[0], 465.5*architecture.g*log(gross[0]/(gross[0] - 20000.0)), 0.0001)
+
+        # two stages, the forward stage is dropped when it is empty
+        dV2, gross2 = architecture.bound(engines, tanks, np.array([0]), np.array([[1, 1]]), 10000.0)
+        m1 = gross2[0] - 20000.0 - 1800.0
+        assert_rel_error(self, dV2[0], 465.5*architecture.g*(log(gross2[0]/(gross2[0] - 20000.0))
+                                                             + log(m1/(m1 - 20000.0))), 0.0001)
+
+    def test_prune(self):
+        # 3 engines with 1 to 3 stages of 3 tank options is 117 candidates,
+        # of which the partial stacks that can not make it are not enumerated
+        survivors, gross, count = architecture.prune(engines, tanks, [1, 2, 3], 4.0, 10000.0, min_TW=0.1)
+        self.assertTrue(count < 3*(3 + 9 + 27))
+        self.assertTrue(0 < len(survivors) < count)
+        self.assertTrue(np.all(np.diff(gross) >= 0))
+
+        # the low thrust engine does not meet the thrust to weight limit
+        self.assertTrue(all([arch.engine.name != 'Hydrazine' for arch in survivors]))
+
+        # every survivor meets the delta-V by the ideal bound
+        index = dict((e, i) for i, e in enumerate(engines))
+        for arch in survivors:
+            dV, mass = architecture.bound(engines, tanks, np.array([index[arch.engine]]),
+                                          np.array([[tanks.index(t) for t in arch.tanks]]), 10000.0)
+            self.assertTrue(dV[0] >= 4.0)
+
+        # and the survivors are those of the exhaustive enumeration
+        expected = []
+        for engine, tank in architecture.candidates(engines, tanks, [1, 2, 3]):
+            dV, mass = architecture.bound(engines, tanks, engine, tank, 10000.0)
+            TW = np.array([e.thrust for e in engines])[engine] / (mass * architecture.g)
+            for i in np.flatnonzero((dV >= 4.0) & (TW >= 0.1)):
+                expected.append(Architecture(engines[engine[i]], tuple(tanks[j] for j in tank[i])))
+        self.assertEqual(sorted(survivors), sorted(expected))
+
+    def test_search(self):
+        results, count = architecture.search(engines, tanks, [1, 2], 6.0, 10000.0, evaluate,
+                                             min_TW=0.1, processes=2)
+        self.assertTrue(len(results) > 0)
+        for arch, capacity in results:
+            self.assertEqual(capacity, evaluate(arch))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.batch import BatchMission
+from mama.events import Trigger
+from mama.maneuver import Maneuver
+from mama.subsystems import CargoSubsystem
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Mission, Phase
+from mama.test.fixtures import Engine, Tank
+
+
+class DepartureMission(Mission):
+    """ a two stage spacecraft that departs, then delivers its cargo """
+
+    def configure(self):
+        core = Stage()
+        core.add('engine', Engine())
+        core.add('tank', Tank())
+        core.tank.capacity = 20000.0
+        core.add('payload', CargoSubsystem())
+        core.payload.mass_cargo = 5000.0
+        core.crew_count = 2
+
+        drop = Stage()
+        drop.add('tank', Tank())
+        drop.tank.capacity = 10000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.crew_consumable_rate = 5.0
+        spacecraft.add_stage('core', core)
+        spacecraft.add_stage('drop', drop)
+        self.add('spacecraft', spacecraft)
+
+        depart = Phase()
+        depart.description = 'depart'
+        depart.duration = 2.0
+        depart.add_maneuver(Maneuver())
+        depart.maneuver.dV = 1.0
+        self.add_phase('depart', depart)
+
+        coast = Phase()
+        coast.description = 'coast'
+        coast.duration = 30.0
+        coast.drop_subsystem = 'core.payload'
+        self.add_phase('coast', coast)
+
+        arrive = Phase()
+        arrive.description = 'arrive'
+        arrive.duration = 1.0
+        arrive.add_maneuver(Maneuver())
+        arrive.maneuver.dV = 0.5
+        self.add_phase('arrive', arrive)
+
+        super(DepartureMission, self).configure()
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_variants(self):
+        # each variant matches the mission flown on its own
+        dV = np.array([0.5, 1.0, 2.0])
+        payload = np.array([5000.0, 3000.0, 1000.0])
+
+        mission = DepartureMission()
+        batch = BatchMission(mission, 3)
+        batch.vary('depart.dV', dV)
+        batch.vary('core.payload.cargo', payload)
+        table = batch.run()
+        self.assertEqual(table.shape, (3, 3))
+
+        for i in range(3):
+            mission = DepartureMission()
+            mission.depart.maneuver.dV = dV[i]
+            mission.spacecraft.core.payload.mass_cargo = payload[i]
+            mission.run(cache=False)
+            for column, phase in enumerate(mission.phases):
+                assert_rel_error(self, table['end_mass'][i, column], phase.end_mass, 0.000001)
+                assert_rel_error(self, table['end_fuel'][i, column], phase.end_fuel, 0.000001)
+            assert_rel_error(self, table['burn_time'][i, 0], mission.depart.maneuver.burn_time, 0.000001)
+
+        # fuel is drawn from the drop stage first
+        self.assertTrue(table['fuel_drawn'][0, 0, 1] > 0)
+        assert_rel_error(self, table['fuel_drawn'][0, 0, 0], 0.0, 0.000001)
+
+    def test_events(self):
+        # abort the variants that run the core stage dry
+        mission = DepartureMission()
+        mission.events = [Trigger('fuel.core', '<', 0.0, 'abort')]
+        batch = BatchMission(mission, 3)
+        batch.vary('depart.dV', [1.0, 4.0, 8.0])
+        table = batch.run()
+
+        self.assertEqual(batch.aborted.tolist(), [False, False, True])
+        MET, phase, trigger = batch.fired[0]
+        self.assertEqual(phase, 'depart')
+        self.assertTrue(np.isnan(MET[0]) and MET[2] <= 2.0)
+
+        # the aborted variant skips the rest of the mission
+        assert_rel_error(self, table['end_MET'][2, 2], 2.0, 0.000001)
+        assert_rel_error(self, table['end_MET'][0, 2], 33.0, 0.000001)
+        assert_rel_error(self, table['end_mass'][2, 2], table['end_mass'][2, 0], 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import StringIO
+import logging
+
+from math import pi, sqrt
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import boiloff
+from mama.orbit import Orbit
+from mama.ephemeris import AU
+
+
+class BoiloffTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_area(self):
+        # a sphere, and a cylinder with hemispherical domes
+        assert_rel_error(self, boiloff.tank_area(2.0, 2.0, 0.0), 4*pi, 0.000001)
+        assert_rel_error(self, boiloff.tank_area(2.0, 6.0, 0.0), 4*pi + 2*pi*4.0, 0.000001)
+
+        # 8.4 m diameter LH2 tank with 2:1 elliptical domes
+        assert_rel_error(self, boiloff.tank_area(8.4, 17.22, sqrt(2)/2), 477.59, 0.0001)
+
+    def test_losses(self):
+        # heat leak through the insulation at the sunlit temperature
+        T_sun = boiloff.sunlit_temperature(1366.1, 0.14, 0.9)
+        assert_rel_error(self, T_sun, 174.95, 0.0001)
+
+        loss = boiloff.losses([20000.0, 20000.0], [465.0, 465.0], [0.05, 0.05], [5e-5, 5e-5],
+                              ['LH2', 'LO2'], 30.0)
+        Q = 465.0 * 5e-5 / 0.05 * (T_sun - 20.3)
+        assert_rel_error(self, loss[0], Q / 446.0e3 * 30 * 86400, 0.000001)
+        self.assertTrue(loss[1] > loss[0])
+
+        # losses are linear in time, limited by the propellant in the tank,
+        # and are less when part of the time is spent in eclipse
+        durations = np.array([[10.0], [100.0], [1000.0]])
+        sweep = boiloff.losses([5000.0], [465.0], [0.05], [5e-5], ['LH2'], durations)
+        assert_rel_error(self, sweep[1, 0], 10*sweep[0, 0], 0.000001)
+        self.assertEqual(sweep[2, 0], 5000.0)
+
+        shaded = boiloff.losses(20000.0, 465.0, 0.05, 5e-5, 'LH2', 30.0, eclipse=0.4)
+        self.assertTrue(shaded[0] < loss[0])
+
+    def test_orbit(self):
+        # about 40% of a low Earth orbit is in eclipse
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 407
+        LEO.periapsis = 407
+        insolation, eclipse = boiloff.environment(LEO)
+        self.assertEqual(insolation, 1366.1)
+        self.assertTrue(0.35 < eclipse < 0.40)
+
+    def test_heliocentric(self):
+        # in orbit about the Sun the insolation depends on the distance
+        cruise = Orbit('Sun')
+        cruise.apoapsis = AU - cruise.body_radius()
+        cruise.periapsis = AU - cruise.body_radius()
+        insolation, eclipse = boiloff.environment(cruise)
+        assert_rel_error(self, insolation, 1366.1, 0.000001)
+        self.assertEqual(eclipse, 0.0)
+
+        # falling off with the square of the distance, on average
+        cruise.apoapsis = 1.524*AU - cruise.body_radius()
+        insolation, eclipse = boiloff.environment(cruise)
+        assert_rel_error(self, insolation, 1366.1/(1.262*sqrt(1.524)), 0.001)
+        self.assertEqual(eclipse, 0.0)
+
+        # so the boil-off of a tank is less than at 1 AU
+        far = boiloff.losses(20000.0, 465.0, 0.05, 5e-5, 'LH2', 30.0, insolation, eclipse)
+        near = boiloff.losses(20000.0, 465.0, 0.05, 5e-5, 'LH2', 30.0)
+        self.assertTrue(0 < far[0] < near[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+import StringIO
+import logging
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.subsystems import CargoSubsystem
+from mama.spacecraft import Spacecraft, Stage
+from mama.test.fixtures import Engine, Tank
+
+
+def build():
+    """ a two stage spacecraft with cargo on the core stage """
+    core = Stage()
+    core.add('engine', Engine())
+    core.add('tank', Tank())
+    core.tank.capacity = 20000.0
+    core.add('payload', CargoSubsystem())
+    core.payload.mass_cargo = 5000.0
+
+    drop = Stage()
+    drop.add('tank', Tank())
+    drop.tank.capacity = 10000.0
+
+    spacecraft = Spacecraft()
+    spacecraft.add_stage('core', core)
+    spacecraft.add_stage('drop', drop)
+    spacecraft.run()
+    return spacecraft
+
+
+class CloneTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_burn(self):
+        # a clone burns and drops mass just like the spacecraft
+        spacecraft = build()
+        clone = spacecraft.clone()
+        assert_rel_error(self, clone.wet_mass, spacecraft.wet_mass, 0.000001)
+        self.assertEqual(sorted(clone.structure.paths),
+                         ['core.engine.engine', 'core.payload.cargo', 'core.tank.fuel',
+                          'core.tank.tank', 'drop.tank.fuel', 'drop.tank.tank'])
+
+        burn_time = spacecraft.burn(3.0, 0)
+        assert_rel_error(self, clone.burn(3.0, 0), burn_time, 0.000001)
+        assert_rel_error(self, clone.get_fuel('drop'), spacecraft.get_fuel('drop'), 0.000001)
+        assert_rel_error(self, clone.get_fuel(0), spacecraft.get_fuel(0), 0.000001)
+
+        spacecraft.drop('core.payload')
+        clone.drop('core.payload')
+        assert_rel_error(self, clone.wet_mass, spacecraft.wet_mass, 0.000001)
+        self.assertEqual(clone.get_item_mass('core.payload.cargo'), 0.0)
+
+    def test_drop(self):
+        # only expendable subsystems can be dropped, the fuel in a tank
+        # stays with the fuel state of its stage
+        spacecraft = build()
+        clone = spacecraft.clone()
+        self.assertEqual(clone.structure.expendable, frozenset(['core.payload']))
+
+        clone.burn(3.0, 0)
+        wet_mass = clone.wet_mass
+        self.assertRaises(Exception, clone.drop, 'drop.tank')
+        self.assertRaises(Exception, clone.drop, 'core.engine')
+        self.assertEqual(clone.wet_mass, wet_mass)
+
+        clone.drop('core.payload')
+        assert_rel_error(self, wet_mass - clone.wet_mass, 5000.0, 0.000001)
+
+    def test_copy_on_write(self):
+        # clones share the initial state until they change it
+        structure = build().clone().structure
+        first = structure.clone()
+        second = structure.clone()
+        self.assertTrue(first._state['fuel'] is second._state['fuel'])
+
+        first.expend_fuel('core', 1000.0)
+        self.assertEqual(first.changed(), ['fuel'])
+        self.assertTrue(first._state['dry'] is second._state['dry'])
+        assert_rel_error(self, second.wet_mass - first.wet_mass, 1000.0, 0.000001)
+        self.assertEqual(structure.state['fuel'][0], 20000.0)
+
+        # a clone of a clone shares the changed state, until either one
+        # changes it again
+        third = first.clone()
+        self.assertTrue(third._state['fuel'] is first._state['fuel'])
+        third.expend_fuel('core', 1000.0)
+        assert_rel_error(self, first.get_fuel('core'), 19000.0, 0.000001)
+        assert_rel_error(self, third.get_fuel('core'), 18000.0, 0.000001)
+
+        # the structure is read only
+        self.assertRaises(ValueError, structure.state['dry'].__setitem__, 0, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import os
+import shutil
+import tempfile
+import StringIO
+import logging
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.dvcache import DeltaVCache
+
+
+class DeltaVCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def make_maneuver(self, C3):
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 407
+        LEO.periapsis = 407
+
+        maneuver = Maneuver()
+        maneuver.orbit = LEO
+        maneuver.maneuver_type = 'Departure from Apoapsis'
+        maneuver.C3 = C3
+        return maneuver
+
+    def test_lru(self):
+        cache = DeltaVCache(maxsize=2)
+
+        # same orbit and C3 as SKB 6/30/00 TMI
+        dV = cache.get_dV(self.make_maneuver(14.06))
+        assert_rel_error(self, dV, 3.805, 0.005)
+        dV = cache.get_dV(self.make_maneuver(14.06))
+        assert_rel_error(self, dV, 3.805, 0.005)
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+        # least recently used entry is evicted
+        cache.get_dV(self.make_maneuver(13.41))
+        cache.get_dV(self.make_maneuver(10.30))
+        self.assertEqual(cache.stats()['size'], 2)
+        self.assertEqual(cache.lookup(cache.key(self.make_maneuver(14.06))), None)
+
+    def test_table(self):
+        table_dir = tempfile.mkdtemp()
+        try:
+            cache = DeltaVCache()
+            cache.get_dV(self.make_maneuver(13.41))
+            path = os.path.join(table_dir, 'dV.npy')
+            cache.save_table(path)
+
+            shared = DeltaVCache(table=path)
+            dV = shared.get_dV(self.make_maneuver(13.41))
+            assert_rel_error(self, dV, 3.776, 0.005)
+            self.assertEqual(shared.stats()['table_hits'], 1)
+            self.assertEqual(shared.stats()['misses'], 0)
+        finally:
+            shutil.rmtree(table_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import os
+import shutil
+import tempfile
+import StringIO
+import logging
+
+import numpy as np
+
+from mama import ephemeris
+
+
+class EphemerisTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+        self.table_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        ephemeris.load_table(None)
+        shutil.rmtree(self.table_dir)
+        print self.logstr.getvalue()
+        pass
+
+    def test_mean_elements(self):
+        # Earth is about 1 AU from the sun, moving at about 30 km/s
+        r, v = ephemeris.state('Earth', [0.0, 180.0])
+        distance = np.sqrt((r**2).sum(axis=1)) / ephemeris.AU
+        speed = np.sqrt((v**2).sum(axis=1))
+        self.assertTrue(np.all(np.abs(distance - 1.0) < 0.02))
+        self.assertTrue(np.all(np.abs(speed - 29.8) < 0.6))
+
+    def test_table(self):
+        path = os.path.join(self.table_dir, 'ephemeris.bin')
+        ephemeris.main([path, '--start', '2020-01-01', '--stop', '2022-01-01'])
+
+        table = ephemeris.load_table(path)
+        epochs = np.linspace(table.start, table.stop, 1001)
+
+        # interpolated states match the mean elements closely
+        for body in ('Mercury', 'Earth', 'Mars', 'Jupiter'):
+            r, v = ephemeris.state(body, epochs)
+            r0, v0 = ephemeris.mean_state(body, epochs)
+            self.assertTrue(np.abs(r - r0).max() < 100.0)     # km
+            self.assertTrue(np.abs(v - v0).max() < 0.01)      # km/s
+
+        # epochs outside of the table fall back to the mean elements
+        r, v = ephemeris.state('Mars', [table.stop + 10])
+        r0, v0 = ephemeris.mean_state('Mars', [table.stop + 10])
+        self.assertTrue(np.all(r == r0))
+
+        self.assertRaises(ValueError, table.state, 'Mars', [table.stop + 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.events import Trigger, state, detect, crossing
+from mama.test.fixtures import DeliveryMission
+
+
+class EventsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_detect(self):
+        triggers = [Trigger('fuel.core', '<', 300.0, 'drop', 'core.tank'),
+                    Trigger('MET', '>=', 9.5, 'abort'),
+                    Trigger('margin', '<', 0.0, 'abort')]
+        samples = state([0.0, 9.0, 10.0], [1000.0, 1000.0, 800.0], [500.0, 500.0, 300.0],
+                        [[500.0], [500.0], [250.0]], ['core'])
+
+        met = detect(triggers, samples)
+        self.assertEqual(met.tolist(), [[False, False, True],
+                                        [False, False, True],
+                                        [False, False, False]])
+
+        # times are interpolated to the crossing
+        times = crossing(triggers, samples)
+        assert_rel_error(self, times[0], 9.8, 0.000001)
+        assert_rel_error(self, times[1], 9.5, 0.000001)
+        self.assertTrue(np.isnan(times[2]))
+
+        self.assertRaises(Exception, Trigger, 'fuel', '=', 0.0, 'abort')
+        self.assertRaises(Exception, Trigger, 'fuel', '<', 0.0, 'drop')
+
+    def test_batch(self):
+        # a variant of the mission in each row
+        fuel = np.array([[500.0, 500.0, 250.0],
+                         [500.0, 400.0, 350.0],
+                         [500.0, 200.0, 100.0]])
+        samples = state([0.0, 9.0, 10.0], fuel + 1000.0, fuel, fuel[..., np.newaxis], ['core'])
+
+        times = crossing([Trigger('fuel.core', '<', 300.0, 'drop', 'core.tank')], samples)
+        self.assertEqual(times.shape, (1, 3))
+        assert_rel_error(self, times[0, 0], 9.8, 0.000001)
+        self.assertTrue(np.isnan(times[0, 1]))
+        assert_rel_error(self, times[0, 2], 6.0, 0.000001)
+
+    def test_mission(self):
+        # jettison the cargo during the loiter, then abort the trip home
+        mission = DeliveryMission()
+        mission.events = [Trigger('MET', '>=', 40.0, 'drop', 'core.cargo')]
+        mission.depart.events = [Trigger('mass', '<', 11000.0, 'abort')]
+        mission.run(cache=False)
+
+        self.assertEqual([(phase, str(trigger)) for MET, phase, trigger in mission.fired],
+                         [('loiter', 'when MET >= 40: drop core.cargo'),
+                          ('depart', 'when mass < 11000: abort')])
+        assert_rel_error(self, mission.fired[0][0], 40.0, 0.000001)
+        self.assertTrue(mission.aborted)
+
+        assert_rel_error(self, mission.fired[1][0], 50.0, 0.000001)
+        assert_rel_error(self, mission.loiter.end_mass, 10000.0, 0.000001)
+
+        # the trip home is skipped
+        assert_rel_error(self, mission.end_MET, 60.0, 0.000001)
+        assert_rel_error(self, mission.end_mass, 10000.0, 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import StringIO
+import logging
+
+from math import sin, cos, asin
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama import flyby
+
+
+class FlybyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_powered_flyby(self):
+        earth = Orbit()
+        mu, R = earth.body_gravity(), earth.body_radius()
+
+        # an unpowered flyby at 500 km with Vinf of 5 km/s
+        e = 1 + (R + 500)*5.0**2/mu
+        delta = 2*asin(1/e)
+        vinf_in = [5.0, 0.0, 0.0]
+        vinf_out = [5.0*cos(delta), 5.0*sin(delta), 0.0]
+
+        dV, altitude = flyby.powered_flyby(mu, R, vinf_in, vinf_out)
+        self.assertTrue(dV[0] < 1e-6)
+        assert_rel_error(self, altitude[0], 500.0, 0.0001)
+
+        # speeding up through the same turn needs a burn and a lower periapsis
+        vinf_fast = [6.0*cos(delta), 6.0*sin(delta), 0.0]
+        dV, altitude = flyby.powered_flyby(mu, R, [vinf_in, vinf_in], [vinf_out, vinf_fast])
+        self.assertEqual(dV.shape, (2,))
+        self.assertTrue(dV[1] > 0.1)
+        self.assertTrue(altitude[1] < 500.0)
+
+    def test_maneuver(self):
+        MOI = Orbit()
+        MOI.body = 'Mars'
+
+        # Mars can turn Vinf of 3 km/s through about 63 deg at 1000 km
+        mu, R = MOI.body_gravity(), MOI.body_radius()
+        e = 1 + (R + 1000)*3.0**2/mu
+        delta = 2*asin(1/e)
+
+        swingby = Maneuver()
+        swingby.orbit = MOI
+        swingby.maneuver_type = 'Powered Flyby'
+        swingby.vinf_in = np.array([3.0, 0.0, 0.0])
+        swingby.vinf_out = np.array([3.2*cos(delta), 3.2*sin(delta), 0.0])
+        swingby.min_flyby_altitude = 200
+        dV = swingby.calculate_dV()
+        assert_rel_error(self, dV, 0.112, 0.01)
+        assert_rel_error(self, swingby.flyby_altitude, 726.4, 0.01)
+
+        # too sharp a turn can not be made above the minimum altitude
+        swingby.vinf_out = np.array([-3.0, 0.1, 0.0])
+        self.assertEqual(swingby.calculate_dV(), None)
+
+        # the body constants are the same as those of the orbit
+        dV, altitude = flyby.body_flyby('Mars', [3.0, 0.0, 0.0],
+                                        [3.2*cos(delta), 3.2*sin(delta), 0.0])
+        assert_rel_error(self, dV[0], 0.112, 0.01)
+        assert_rel_error(self, altitude[0], 726.4, 0.01)
+
+    def test_sequence(self):
+        # score a grid of Earth-Venus-Earth sequences in one call
+        launch = np.arange(0.0, 40.0, 10.0)
+        epochs = np.column_stack((launch, launch + 150, launch + 400))
+        C3, flyby_dV, Vinf, altitudes = flyby.sequence(['Earth', 'Venus', 'Earth'], epochs)
+        self.assertEqual(C3.shape, (4,))
+        self.assertEqual(altitudes.shape, (4, 1))
+        self.assertTrue(np.all(C3 > 0))
+
+        # encounters out of order are not valid
+        C3, flyby_dV, Vinf, altitudes = flyby.sequence(['Earth', 'Venus', 'Earth'], [[0, -1, 400]])
+        self.assertTrue(np.isnan(flyby_dV[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
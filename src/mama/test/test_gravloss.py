@@ -1,10 +1,19 @@
 import unittest
 
+import os
+import shutil
+import tempfile
 import StringIO
 import logging
 
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
 from mama.orbit import Orbit
 from mama.maneuver import Maneuver
+from mama import gravloss
+from mama import finiteburn
 
 
 class GravLossTestCase(unittest.TestCase):
@@ -50,6 +59,100 @@ class GravLossTestCase(unittest.TestCase):
         print templ % (maneuver.orbit.apoapsis, maneuver.C3, TW,
                        maneuver.gravity_loss(TW, burns=2))
 
+    def test_gravity_loss_table(self):
+        # check coefficient table against the original one and two burn fits
+
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 407
+        LEO.periapsis = 407
+
+        maneuver = Maneuver()
+        maneuver.orbit = LEO
+        maneuver.C3 = -1.671
+
+        assert_rel_error(self, maneuver.gravity_loss(0.11, burns=1), 355.627, 0.0001)
+        assert_rel_error(self, maneuver.gravity_loss(0.11, burns=2), 108.805, 0.0001)
+
+        # gravloss_data takes precedence over number of burns
+        maneuver.gravloss_data = 1
+        assert_rel_error(self, maneuver.gravity_loss(0.11, burns=2), 355.627, 0.0001)
+
+        # no fit available for data set 3
+        maneuver.gravloss_data = 3
+        self.assertEqual(maneuver.gravity_loss(0.11), None)
+
+        # evaluate a sweep of T/W and C3 in one call
+        TW = np.array([[0.11], [0.3]])
+        C3 = np.array([-1.671, 10.0])
+        g_loss = gravloss.gravity_loss(2, TW, 6785., C3)
+        self.assertEqual(g_loss.shape, (2, 2))
+        assert_rel_error(self, g_loss[0, 0], 108.805, 0.0001)
+        assert_rel_error(self, g_loss[0, 1], 169.813, 0.0001)
+        assert_rel_error(self, g_loss[1, 0], 14.525, 0.0001)
+        assert_rel_error(self, g_loss[1, 1], 23.138, 0.0001)
+
+        # data sets without a fit are rejected
+        self.assertRaises(ValueError, gravloss.gravity_loss, 0, 0.11, 6785., -1.671)
+        self.assertRaises(ValueError, gravloss.gravity_loss, [2, 3], 0.11, 6785., -1.671)
+
+    def test_finite_burn(self):
+        # integrated gravity loss should be close to the two burn fit
+        # and should be cached for subsequent evaluations
+
+        cache_dir = tempfile.mkdtemp()
+        cache = finiteburn.GravityLossCache(os.path.join(cache_dir, 'gravloss'))
+
+        try:
+            LEO = Orbit()
+            LEO.body = 'Earth'
+            LEO.apoapsis = 407
+            LEO.periapsis = 407
+
+            TW = np.array([0.14, 0.165, 0.2])
+            g_loss = finiteburn.gravity_loss(LEO, TW, 900., -1.671, burns=2, cache=cache)
+            fit = gravloss.gravity_loss(2, TW, 6785.14, -1.671)
+            for i in range(len(TW)):
+                assert_rel_error(self, g_loss[i], fit[i], 0.05)
+
+            g_loss = finiteburn.gravity_loss(LEO, TW, 900., -1.671, burns=1, cache=cache)
+            fit = gravloss.gravity_loss(1, TW, 6785.14, -1.671)
+            for i in range(len(TW)):
+                assert_rel_error(self, g_loss[i], fit[i], 0.05)
+
+            key = cache.key('Earth', 1, 0.14, 900., -1.671, 407, 407)
+            self.assertEqual(cache.get(key), g_loss[0])
+
+            # the integration is converged in the number of steps
+            mu = LEO.body_gravity()
+            r_p = LEO.body_radius() + 407
+            v_p = np.sqrt(mu/r_p)
+            coarse = finiteburn.integrate(mu, r_p, v_p, 0.11, 900., -1.671, burns=2)
+            steps = finiteburn.STEPS
+            try:
+                finiteburn.STEPS = 4*steps
+                fine = finiteburn.integrate(mu, r_p, v_p, 0.11, 900., -1.671, burns=2)
+            finally:
+                finiteburn.STEPS = steps
+            self.assertTrue(abs(coarse - fine) < 0.01)
+            assert_rel_error(self, coarse, 126.89, 0.001)
+
+            # gravity loss for any body, computed through the maneuver
+            LMO = Orbit()
+            LMO.body = 'Mars'
+            LMO.apoapsis = 250
+            LMO.periapsis = 250
+
+            maneuver = Maneuver()
+            maneuver.orbit = LMO
+            maneuver.C3 = 10.0
+            self.assertEqual(maneuver.gravity_loss(0.2), None)
+
+            g_loss = finiteburn.gravity_loss(LMO, [0.2, 2.0], 450., 10.0, cache=cache)
+            self.assertTrue(g_loss[0] > g_loss[1] > 0)
+        finally:
+            shutil.rmtree(cache_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
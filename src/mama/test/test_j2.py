@@ -0,0 +1,89 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama import j2
+
+
+class J2TestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_rates(self):
+        orbit = Orbit()
+        mu, R, J2 = orbit.body_gravity(), orbit.body_radius(), orbit.body_J2()
+
+        # ISS regresses about 5 deg/day
+        raan_rate, arg_periapsis_rate = j2.rates(mu, R, J2, 400, 400, 51.6)
+        assert_rel_error(self, raan_rate, -5.00, 0.005)
+
+        # sun-synchronous orbit at 800 km precesses 360 deg/year
+        raan_rate, arg_periapsis_rate = j2.rates(mu, R, J2, 800, 800, 98.6)
+        assert_rel_error(self, raan_rate, 360/365.2422, 0.001)
+
+        # no apsidal drift at the critical inclination
+        raan_rate, arg_periapsis_rate = j2.rates(mu, R, J2, 400, 4000, 63.435)
+        self.assertTrue(abs(arg_periapsis_rate) < 1e-4)
+
+        # arrays of orbits
+        raan_rate, arg_periapsis_rate = j2.rates(mu, R, J2, np.array([400, 800]),
+                                                 np.array([400, 800]), np.array([[51.6], [98.6]]))
+        self.assertEqual(raan_rate.shape, (2, 2))
+        assert_rel_error(self, raan_rate[1, 1], 360/365.2422, 0.001)
+
+    def test_drift(self):
+        # Mars 250 x 33840 km orbit over a range of loiter durations
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 33840
+        MEO.periapsis = 250
+        MEO.inclination = 30
+
+        duration = np.array([1.0, 10.0, 100.0])
+        dRAAN, dArgP, angle, dV = j2.orbit_drift(MEO, duration)
+        assert_rel_error(self, dRAAN[1], 10*dRAAN[0], 0.0001)
+        self.assertTrue(np.all(dRAAN < 0))
+        self.assertTrue(np.all(np.diff(angle) > 0))
+        self.assertTrue(np.all(np.diff(dV) > 0))
+
+        # the plane change penalty is the angle between the planes
+        assert_rel_error(self, angle[2], j2.plane_angle(30, 0, 30, dRAAN[2]), 0.0001)
+        assert_rel_error(self, j2.plane_angle(30, 0, 30, 10), 4.995, 0.001)
+
+        dRAAN, dArgP = MEO.drift(10.0)
+        assert_rel_error(self, dRAAN, -2.334, 0.001)
+        assert_rel_error(self, dArgP, 3.706, 0.001)
+
+        # the drift is independent of the initial orientation
+        MEO.raan = 45
+        MEO.arg_periapsis = 90
+        dRAAN, dArgP, angle, dV = j2.orbit_drift(MEO, duration)
+        assert_rel_error(self, angle[2], j2.plane_angle(30, 45, 30, 45 + dRAAN[2]), 0.0001)
+        assert_rel_error(self, dRAAN[1], -2.334, 0.001)
+
+        # which advances the orbit orientation
+        MEO.advance(10.0)
+        assert_rel_error(self, MEO.raan, 45 - 2.334, 0.001)
+        assert_rel_error(self, MEO.arg_periapsis, 90 + 3.706, 0.001)
+        MEO.raan = 1
+        MEO.advance(10.0)
+        assert_rel_error(self, MEO.raan, 360 + 1 - 2.334, 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
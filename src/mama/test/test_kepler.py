@@ -0,0 +1,77 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama import kepler
+
+
+class KeplerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_solve_kepler(self):
+        M = np.linspace(0, 2*np.pi, 1001)
+        for e in (0.0, 0.3, 0.9, 0.99):
+            E = kepler.solve_kepler(M, e)
+            error = E - e*np.sin(E) - np.remainder(M, 2*np.pi)
+            self.assertTrue(np.abs(error).max() < 1e-10)
+
+    def test_propagate_orbit(self):
+        # Mars 250 x 33840 km orbit (SKB 10/9/92)
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 250
+        MEO.periapsis = 33840
+
+        T = MEO.period()
+        t, r, v, nu = kepler.propagate_orbit(MEO, T, samples=3)
+
+        # periapsis, apoapsis and back to periapsis
+        radius = np.sqrt((r**2).sum(axis=1))
+        speed = np.sqrt((v**2).sum(axis=1))
+        assert_rel_error(self, radius[0], MEO.body_radius() + 250, 0.0001)
+        assert_rel_error(self, radius[1], MEO.body_radius() + 33840, 0.0001)
+        assert_rel_error(self, radius[2], MEO.body_radius() + 250, 0.0001)
+        assert_rel_error(self, speed[0], MEO.velocity(250), 0.0001)
+        assert_rel_error(self, speed[1], MEO.velocity(33840), 0.0001)
+        assert_rel_error(self, nu[1], np.pi, 0.0001)
+
+        # energy is conserved
+        mu, a, e = kepler.elements(MEO)
+        t, r, v, nu = kepler.propagate_orbit(MEO, 86400, samples=1000)
+        energy = (v**2).sum(axis=1)/2 - mu/np.sqrt((r**2).sum(axis=1))
+        self.assertTrue(np.abs(energy + mu/(2*a)).max() < 1e-9)
+
+        # the orbit is oriented by its RAAN, inclination and argument of
+        # periapsis: ascending node on y and periapsis at the highest latitude
+        MEO.raan = 90
+        MEO.inclination = 30
+        MEO.arg_periapsis = 90
+        t, r, v, nu = kepler.propagate_orbit(MEO, T, samples=3)
+        r_p = MEO.body_radius() + 250
+        assert_rel_error(self, r[0, 0], -r_p*np.cos(np.radians(30)), 0.0001)
+        assert_rel_error(self, r[0, 2], r_p*np.sin(np.radians(30)), 0.0001)
+        self.assertTrue(abs(r[0, 1]) < 1e-6*r_p)
+
+        # the angular momentum is normal to the orbit plane
+        h = np.cross(r[0], v[0])
+        assert_rel_error(self, h[2]/np.sqrt((h**2).sum()), np.cos(np.radians(30)), 0.0001)
+
+
+if __name__ == '__main__':
+    unittest.main()
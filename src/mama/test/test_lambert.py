@@ -0,0 +1,85 @@
+import unittest
+
+import StringIO
+import logging
+
+from datetime import datetime
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama import ephemeris
+from mama import lambert
+
+
+class LambertTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_lambert(self):
+        # check against Curtis, Orbital Mechanics for Engineering Students, example 5.2
+        v1, v2 = lambert.solve([5000, 10000, 2100], [-14600, 2500, 7000], 3600, 398600)
+        assert_rel_error(self, v1[0, 0], -5.9925, 0.0001)
+        assert_rel_error(self, v1[0, 1],  1.9254, 0.0001)
+        assert_rel_error(self, v1[0, 2],  3.2456, 0.0001)
+        assert_rel_error(self, v2[0, 0], -3.3125, 0.0001)
+        assert_rel_error(self, v2[0, 1], -4.1966, 0.0001)
+        assert_rel_error(self, v2[0, 2], -0.3853, 0.0001)
+
+    def test_porkchop(self):
+        # Mars 2020 launched 7/30/2020 and arrived 2/18/2021 with a C3 of about 14.4 km2/s2
+        departure = ephemeris.days_past_J2000(datetime(2020, 7, 30))
+        arrival = ephemeris.days_past_J2000(datetime(2021, 2, 18))
+
+        C3, Vinf = lambert.porkchop('Earth', 'Mars', departure + np.arange(-10, 11),
+                                    arrival + np.arange(-10, 11))
+        self.assertEqual(C3.shape, (21, 21))
+        assert_rel_error(self, C3[10, 10], 14.4, 0.05)
+
+        # arrival before departure is not a transfer
+        C3, Vinf = lambert.porkchop('Earth', 'Mars', [arrival], [departure])
+        self.assertTrue(np.isnan(C3[0, 0]))
+
+    def test_total_dV(self):
+        # delta-V over C3 grids should match the single point calculation
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 407
+        LEO.periapsis = 407
+
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 250
+        MEO.periapsis = 33840
+
+        TMI = Maneuver()
+        TMI.orbit = LEO
+        TMI.maneuver_type = 'Departure from Apoapsis'
+
+        MOC = Maneuver()
+        MOC.orbit = MEO
+        MOC.maneuver_type = 'Capture at Apoapsis'
+
+        C3 = np.array([[14.06, 13.41]])
+        Vinf = np.array([[5.31, np.sqrt(6.35)]])
+        dV = lambert.total_dV(TMI, MOC, C3, Vinf)
+
+        # SKB 6/30/00 and SKB 10/9/92
+        assert_rel_error(self, dV[0, 0], 3.805 + 2.563, 0.005)
+        assert_rel_error(self, dV[0, 1], 3.776 + 0.837, 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.ledger import Ledger
+from mama.subsystem import Subsystem, Equipment
+from mama.subsystems import CargoSubsystem
+from mama.spacecraft import Spacecraft, Stage
+
+
+class LedgerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_postings(self):
+        ledger = Ledger(['core', 'lander'])
+        ledger.credit('core', 'fuel', 5000.0)
+        ledger.credit(1, 'fixed', 2000.0)
+        ledger.debit('core', 'fuel', 1500.0)
+        assert_rel_error(self, ledger.get('core', 'fuel'), 3500.0, 0.000001)
+        assert_rel_error(self, ledger.stage_wet_mass('lander'), 2000.0, 0.000001)
+        assert_rel_error(self, ledger.wet_mass(), 5500.0, 0.000001)
+
+        # post to many stages at once (repeated stages accumulate)
+        ledger.debit(np.array([0, 1, 1]), 'consumables', [10.0, 20.0, 30.0])
+        assert_rel_error(self, ledger.get('lander', 'consumables'), -50.0, 0.000001)
+        self.assertEqual(list(ledger.stage_wet_mass()), [3490.0, 1950.0])
+
+        # copies are independent
+        copy = ledger.copy()
+        copy.debit('core', 'fuel', 3500.0)
+        assert_rel_error(self, ledger.get('core', 'fuel'), 3500.0, 0.000001)
+
+    def test_spacecraft(self):
+        core = Stage()
+        core.add('structure', Equipment(10000.0))
+        core.add('cargo', CargoSubsystem())
+        core.cargo.mass_cargo = 2000.0
+        core.crew_count = 2
+
+        spacecraft = Spacecraft()
+        spacecraft.crew_consumable_rate = 5.0
+        spacecraft.add_stage('core', core)
+        spacecraft.run()
+
+        ledger = spacecraft.resource_ledger
+        assert_rel_error(self, ledger.get('core', 'cargo'), 2000.0, 0.000001)
+        assert_rel_error(self, ledger.get('core', 'fixed'), 10000.0, 0.000001)
+
+        # consumables, drops and pickups all change the wet mass
+        spacecraft.expend_consumables(10.0)
+        assert_rel_error(self, spacecraft.wet_mass, 11900.0, 0.000001)
+
+        spacecraft.drop('core.cargo')
+        assert_rel_error(self, ledger.get('core', 'cargo'), 0.0, 0.000001)
+        assert_rel_error(self, spacecraft.wet_mass, 9900.0, 0.000001)
+
+        spacecraft.pickup_mass('core', 500.0)
+        assert_rel_error(self, spacecraft.wet_mass, 10400.0, 0.000001)
+        assert_rel_error(self, core.wet_mass, 10400.0, 0.000001)
+
+    def test_drop(self):
+        # a drop removes the mass it takes out of the stage, from the column
+        # the mass was counted in
+        module = Subsystem()
+        module.add('frame', Equipment(500.0))
+        module.add('cargo', CargoSubsystem())
+        module.cargo.mass_cargo = 1000.0
+
+        core = Stage()
+        core.add('structure', Equipment(10000.0))
+        core.add('module', module)
+        core.add('cargo', CargoSubsystem())
+        core.cargo.mass_cargo = 2000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', core)
+        spacecraft.run()
+
+        ledger = spacecraft.resource_ledger
+        assert_rel_error(self, ledger.get('core', 'cargo'), 2000.0, 0.000001)
+        assert_rel_error(self, ledger.get('core', 'fixed'), 11500.0, 0.000001)
+
+        # nested cargo was counted as fixed mass
+        spacecraft.drop('core.module.cargo')
+        assert_rel_error(self, ledger.get('core', 'cargo'), 2000.0, 0.000001)
+        assert_rel_error(self, ledger.get('core', 'fixed'), 10500.0, 0.000001)
+        assert_rel_error(self, spacecraft.wet_mass, 12500.0, 0.000001)
+
+        # dropping it again removes nothing more
+        spacecraft.drop('core.module.cargo')
+        assert_rel_error(self, spacecraft.wet_mass, 12500.0, 0.000001)
+
+        spacecraft.drop('core.cargo')
+        assert_rel_error(self, ledger.get('core', 'cargo'), 0.0, 0.000001)
+        assert_rel_error(self, spacecraft.wet_mass, 10500.0, 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
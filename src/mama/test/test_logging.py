@@ -0,0 +1,120 @@
+import unittest
+
+import StringIO
+import logging
+import threading
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Phase
+from mama.test.fixtures import CoastMission, DeliveryMission
+
+
+class LoggingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_concurrent(self):
+        # maneuvers with their own loggers, computed in separate threads,
+        # only log to their own logger
+        logs = []
+        threads = []
+
+        def calculate(maneuver):
+            for i in range(20):
+                maneuver.calculate_dV()
+
+        for body in ('Earth', 'Mars', 'Venus', 'Jupiter'):
+            orbit = Orbit()
+            orbit.body = body
+            orbit.apoapsis = 500
+            orbit.periapsis = 500
+
+            maneuver = Maneuver()
+            maneuver.orbit = orbit
+            maneuver.maneuver_type = 'Departure from Periapsis'
+            maneuver.C3 = 10
+
+            logger = logging.Logger(body)
+            logstr = StringIO.StringIO()
+            logger.addHandler(logging.StreamHandler(logstr))
+            logger.setLevel(logging.INFO)
+            maneuver.set_logger(logger)
+            logs.append((body, logstr))
+
+            threads.append(threading.Thread(target=calculate, args=(maneuver,)))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for body, logstr in logs:
+            lines = [line for line in logstr.getvalue().splitlines() if line.startswith('Orbiting')]
+            self.assertEqual(len(lines), 20)
+            self.assertTrue(all([line.startswith('Orbiting ' + body) for line in lines]))
+
+        # nothing went to the global logger
+        self.assertEqual(self.logstr.getvalue(), '')
+
+    def test_concurrent_missions(self):
+        # missions run in separate threads only log their own phases
+        missions = [CoastMission(), DeliveryMission(), CoastMission(), DeliveryMission()]
+        for n, mission in enumerate(missions):
+            for phase in mission.phases:
+                phase.description = 'mission %d %s' % (n, phase.name)
+
+        threads = [threading.Thread(target=mission.run, kwargs={'cache': False})
+                   for mission in missions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for n, mission in enumerate(missions):
+            lines = [line for line in mission.logstr.getvalue().splitlines()
+                     if line.startswith('Executing phase')]
+            self.assertEqual(len(lines), len(mission.phases))
+            for line, phase in zip(lines, mission.phases):
+                self.assertTrue(line.startswith('Executing phase "mission %d %s"' % (n, phase.name)))
+
+        # nothing went to the global logger
+        self.assertEqual(self.logstr.getvalue(), '')
+
+    def test_propagation(self):
+        # a logger set on the spacecraft or a phase is passed on to its
+        # stages and maneuver
+        logger = logging.Logger('mission')
+        logstr = StringIO.StringIO()
+        logger.addHandler(logging.StreamHandler(logstr))
+        logger.setLevel(logging.INFO)
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', Stage())
+        spacecraft.set_logger(logger)
+        self.assertTrue(spacecraft.core._logger is logger)
+
+        phase = Phase()
+        phase.add_maneuver(Maneuver())
+        phase.set_logger(logger)
+        self.assertTrue(phase.maneuver._logger is logger)
+
+        spacecraft.core.log('stage message')
+        phase.maneuver.log('maneuver message')
+        self.assertTrue('stage message' in logstr.getvalue())
+        self.assertTrue('maneuver message' in logstr.getvalue())
+        self.assertEqual(self.logstr.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
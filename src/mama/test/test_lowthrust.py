@@ -0,0 +1,129 @@
+import unittest
+
+import StringIO
+import logging
+
+from math import sqrt, exp
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Mission, Phase
+from mama import lowthrust
+from mama.test.fixtures import Engine, Tank
+
+
+class SpiralMission(Mission):
+    """ an electric propulsion spacecraft spiralling out from LEO """
+
+    def configure(self):
+        core = Stage()
+        core.add('engine', Engine())
+        core.engine.thrust = 0.002
+        core.engine.Isp = 1800.0
+        core.add('tank', Tank())
+        core.tank.capacity = 2000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', core)
+        self.add('spacecraft', spacecraft)
+
+        spiral = Phase()
+        spiral.description = 'spiral'
+        spiral.duration = 10.0
+        spiral.add_maneuver(Maneuver())
+        spiral.maneuver.maneuver_type = 'Low-Thrust Spiral'
+        spiral.maneuver.dV = 5.95
+        self.add_phase('spiral', spiral)
+
+        super(SpiralMission, self).configure()
+
+
+class LowThrustTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_edelbaum(self):
+        mu = 398600.4418
+        V0, V1 = sqrt(mu/6678.0), sqrt(mu/42164.0)
+
+        # without a plane change the spiral dV is the difference in velocity
+        assert_rel_error(self, lowthrust.edelbaum(V0, V1, 0.0), V0 - V1, 0.0001)
+
+        # LEO to GEO with a 28.5 deg plane change
+        assert_rel_error(self, lowthrust.edelbaum(V0, V1, np.radians(28.5)), 5.951, 0.001)
+
+    def test_spiral(self):
+        # 5, 10 and 20 kW at 60% efficiency with Isp of 1800 and 3000 s
+        Isp = np.array([1800.0, 3000.0])
+        thrust = lowthrust.power_limited_thrust(np.array([[5.0], [10.0], [20.0]]), Isp)
+        assert_rel_error(self, thrust[0, 0], 0.00034, 0.001)
+
+        final_mass, trip_time = lowthrust.spiral(5.951, 1000.0, thrust, Isp)
+        self.assertEqual(trip_time.shape, (3, 2))
+        assert_rel_error(self, final_mass[0], 1000.0*exp(-5.951/(1800*lowthrust.g)), 0.0001)
+
+        # trip time is inversely proportional to power
+        assert_rel_error(self, trip_time[0, 0], 2*trip_time[1, 0], 0.0001)
+        assert_rel_error(self, trip_time[0, 0], 4*trip_time[2, 0], 0.0001)
+        assert_rel_error(self, trip_time[0, 0]/86400, 172.0, 0.001)
+
+    def test_maneuver(self):
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 300
+        LEO.periapsis = 300
+        LEO.inclination = 28.5
+
+        GEO = Orbit()
+        GEO.body = 'Earth'
+        GEO.apoapsis = 35786
+        GEO.periapsis = 35786
+        GEO.inclination = 0
+
+        spiral = Maneuver()
+        spiral.orbit = LEO
+        spiral.final_orbit = GEO
+        spiral.maneuver_type = 'Low-Thrust Spiral'
+        dV = spiral.calculate_dV()
+        assert_rel_error(self, dV, 5.95, 0.005)
+
+        # trip times for a range of power levels
+        power = np.linspace(5, 50, 10)
+        final_mass, trip_time = spiral.spiral(1000.0, Isp=1800.0, power=power)
+        self.assertEqual(trip_time.shape, power.shape)
+        self.assertTrue(np.all(np.diff(trip_time) < 0))
+        assert_rel_error(self, final_mass, 1000.0*exp(-dV/(1800*lowthrust.g)), 0.0001)
+
+    def test_spiral_phase(self):
+        # the spiral burns for its trip time, which extends the phase
+        mission = SpiralMission()
+        mission.run()
+
+        phase = mission.spiral
+        trip_time = phase.maneuver.trip_time
+        self.assertTrue(trip_time > phase.duration)
+        assert_rel_error(self, phase.maneuver.burn_time, trip_time*86400, 0.000001)
+        assert_rel_error(self, phase.elapsed, trip_time, 0.000001)
+        assert_rel_error(self, phase.end_MET - phase.beg_MET, trip_time, 0.000001)
+        self.assertEqual(phase.duration, 10.0)
+
+        # the trip time is calculated once, at the start of the phase
+        self.assertEqual(mission.logstr.getvalue().count('low-thrust spiral trip time'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
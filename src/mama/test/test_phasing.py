@@ -0,0 +1,142 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Mission, Phase
+from mama import phasing
+from mama.test.fixtures import Engine, Tank
+
+
+class RendezvousMission(Mission):
+    """ a spacecraft phasing for rendezvous with the ISS """
+
+    def configure(self):
+        core = Stage()
+        core.add('engine', Engine())
+        core.add('tank', Tank())
+        core.tank.capacity = 2000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', core)
+        self.add('spacecraft', spacecraft)
+
+        ISS = Orbit()
+        ISS.apoapsis = 400
+        ISS.periapsis = 400
+
+        rendezvous = Phase()
+        rendezvous.description = 'rendezvous'
+        rendezvous.duration = 3.0
+        rendezvous.add_maneuver(Maneuver())
+        rendezvous.maneuver.orbit = ISS
+        rendezvous.maneuver.final_orbit = ISS
+        rendezvous.maneuver.maneuver_type = 'Phasing'
+        rendezvous.maneuver.phase_angle = 30
+        rendezvous.maneuver.min_phasing_altitude = 200
+        self.add_phase('rendezvous', rendezvous)
+
+        super(RendezvousMission, self).configure()
+
+
+class PhasingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_plan(self):
+        mu = 398600.4418
+        R = 6378.0
+        r = R + 400
+
+        # same orbit, target ahead or behind, within one day
+        dV, time, revs, r_other = phasing.plan(mu, r, r, np.radians([30, -30]), 86400.0, R + 200)
+        self.assertTrue(np.all(time <= 86400.0))
+        self.assertTrue(r_other[0] < r)   # drop down to catch up
+        self.assertTrue(r_other[1] > r)   # climb up to fall back
+
+        # one burn in and one out of the phasing orbit
+        T = time[0] / revs[0]
+        a = (mu * (T / (2*np.pi))**2)**(1.0/3)
+        assert_rel_error(self, dV[0], 2*(np.sqrt(mu/r) - np.sqrt(mu*(2/r - 1/a))), 0.0001)
+
+        # more time allows more revolutions and less delta-V
+        dV, time, revs, r_other = phasing.plan(mu, r, r, np.radians(30), [86400.0, 5*86400.0], R + 200)
+        self.assertTrue(dV[1] < dV[0])
+        self.assertTrue(revs[1] > revs[0])
+
+    def test_different_orbits(self):
+        mu = 398600.4418
+        R = 6378.0
+
+        # a chaser below the target can wait for the phase angle to drift
+        # and then make a Hohmann transfer
+        dV, time, revs, r_other = phasing.plan(mu, R + 300, R + 400, np.radians([30, 90, 200]),
+                                               2*86400.0, R + 150)
+        self.assertTrue(np.all(revs == 0))
+        assert_rel_error(self, dV[0], 0.0572, 0.001)
+
+        # unless there is not enough time
+        dV, time, revs, r_other = phasing.plan(mu, R + 300, R + 400, np.radians(200),
+                                               0.3*86400.0, R + 150)
+        self.assertTrue(np.isnan(dV))
+
+    def test_maneuver(self):
+        ISS = Orbit()
+        ISS.apoapsis = 400
+        ISS.periapsis = 400
+
+        rendezvous = Maneuver()
+        rendezvous.orbit = ISS
+        rendezvous.final_orbit = ISS
+        rendezvous.maneuver_type = 'Phasing'
+        rendezvous.phase_angle = 30
+        rendezvous.max_phasing_time = 1.0
+        rendezvous.min_phasing_altitude = 200
+
+        dV = rendezvous.calculate_dV()
+        assert_rel_error(self, dV, 0.0286, 0.01)
+        self.assertTrue(rendezvous.phasing_time <= 1.0)
+        self.assertEqual(rendezvous.revolutions, 15)
+
+    def test_phase(self):
+        # the phase lasts for the phasing time, leaving its duration input
+        mission = RendezvousMission()
+        mission.run(cache=False)
+
+        phase = mission.rendezvous
+        phasing_time = phase.maneuver.phasing_time
+        self.assertTrue(0 < phasing_time <= 1.0)
+        assert_rel_error(self, phase.maneuver.dV, 0.0286, 0.01)
+        assert_rel_error(self, phase.elapsed, phasing_time, 0.000001)
+        assert_rel_error(self, phase.end_MET - phase.beg_MET, phasing_time, 0.000001)
+        self.assertEqual(phase.duration, 3.0)
+
+        # also when the delta-V is given
+        mission = RendezvousMission()
+        mission.rendezvous.maneuver.dV = 0.05
+        mission.run(cache=False)
+
+        phase = mission.rendezvous
+        self.assertEqual(phase.maneuver.dV, 0.05)
+        assert_rel_error(self, phase.elapsed, phasing_time, 0.000001)
+        self.assertEqual(phase.duration, 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+
+import StringIO
+import logging
+import shutil
+import tempfile
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import resultcache
+from mama.subsystem import Equipment
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.spacecraft import Spacecraft, Stage
+from mama.mission import Mission, Phase
+from mama.test.fixtures import CoastMission, Engine, Tank
+
+
+class DepartureMission(Mission):
+    """ a spacecraft that departs from Earth orbit, with a calculated delta-V """
+
+    def configure(self):
+        core = Stage()
+        core.add('structure', Equipment(10000.0))
+        core.add('engine', Engine())
+        core.add('tank', Tank())
+        core.tank.capacity = 20000.0
+
+        spacecraft = Spacecraft()
+        spacecraft.add_stage('core', core)
+        self.add('spacecraft', spacecraft)
+
+        orbit = Orbit()
+        orbit.body = 'Earth'
+        orbit.apoapsis = 500
+        orbit.periapsis = 500
+
+        depart = Phase()
+        depart.description = 'depart'
+        depart.duration = 1.0
+        depart.add_maneuver(Maneuver())
+        depart.maneuver.orbit = orbit
+        depart.maneuver.maneuver_type = 'Departure from Periapsis'
+        depart.maneuver.C3 = 10
+        self.add_phase('depart', depart)
+
+        super(DepartureMission, self).configure()
+
+
+class ResultCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+        # use a temporary cache
+        self.directory = tempfile.mkdtemp()
+        self.default = resultcache.cache
+        resultcache.cache = resultcache.ResultCache(self.directory)
+
+    def tearDown(self):
+        resultcache.cache = self.default
+        shutil.rmtree(self.directory)
+        print self.logstr.getvalue()
+        pass
+
+    def test_key(self):
+        # identical missions have the same key, any input changes it
+        cache = resultcache.cache
+        mission = CoastMission()
+        self.assertEqual(cache.key(mission), cache.key(CoastMission()))
+
+        changed = CoastMission()
+        changed.coast.duration = 31.0
+        self.assertNotEqual(cache.key(mission), cache.key(changed))
+
+        changed = CoastMission()
+        changed.spacecraft.core.structure.mass = 10001.0
+        self.assertNotEqual(cache.key(mission), cache.key(changed))
+
+        # as does a change to the model sources
+        sources = resultcache._sources
+        try:
+            resultcache._sources = 'changed'
+            self.assertNotEqual(cache.key(mission), cache.key(CoastMission()))
+        finally:
+            resultcache._sources = sources
+
+    def test_run(self):
+        # the second run of the same mission is restored from the cache
+        mission = CoastMission()
+        mission.run()
+        self.assertEqual(resultcache.cache.stats()['misses'], 1)
+        assert_rel_error(self, mission.end_MET, 35.0, 0.000001)
+
+        again = CoastMission()
+        again.run()
+        self.assertEqual(resultcache.cache.stats()['hits'], 1)
+        assert_rel_error(self, again.end_MET, mission.end_MET, 0.000001)
+        assert_rel_error(self, again.end_mass, mission.end_mass, 0.000001)
+        assert_rel_error(self, again.coast.end_MET, mission.coast.end_MET, 0.000001)
+
+        # the spacecraft is left in its end state, with an empty log
+        assert_rel_error(self, again.spacecraft.wet_mass, mission.spacecraft.wet_mass, 0.000001)
+        assert_rel_error(self, again.spacecraft.core.wet_mass,
+                         mission.spacecraft.core.wet_mass, 0.000001)
+        self.assertTrue(again.spacecraft.wet_mass < 12000.0)
+        self.assertEqual(again.logstr.getvalue(), '')
+
+        # unless told otherwise
+        again = CoastMission()
+        again.run(cache=False)
+        self.assertEqual(resultcache.cache.stats()['hits'], 1)
+
+    def test_calculated_dV(self):
+        # a maneuver that calculates its delta-V changes the mission, which
+        # is still cached under its definition before the run
+        mission = DepartureMission()
+        key = resultcache.cache.key(mission)
+        mission.run()
+        self.assertEqual(mission.cache_key, key)
+        maneuver = mission.depart.maneuver
+        self.assertTrue(maneuver.dV > 0)
+        self.assertTrue(maneuver.burn_time > 0)
+
+        # so running it again, or an identical mission, is a hit
+        mission.run()
+        self.assertEqual(resultcache.cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+        again = DepartureMission()
+        again.run()
+        self.assertEqual(resultcache.cache.stats()['hits'], 2)
+        self.assertEqual(again.cache_key, key)
+
+        # which restores the delta-V and the outputs of the maneuver
+        assert_rel_error(self, again.depart.maneuver.dV, maneuver.dV, 0.000001)
+        assert_rel_error(self, again.depart.maneuver.burn_time, maneuver.burn_time, 0.000001)
+        assert_rel_error(self, again.spacecraft.wet_mass, mission.spacecraft.wet_mass, 0.000001)
+
+    def test_evict(self):
+        # the least recently used results are evicted
+        cache = resultcache.ResultCache(self.directory, max_size=1)
+        cache.store('a', {'end_mass': 1.0})
+        cache.store('b', {'end_mass': 2.0})
+        self.assertEqual(cache.lookup('a'), None)
+        self.assertEqual(cache.lookup('b'), None)
+
+        cache.max_size = 10000
+        cache.store('a', {'end_mass': 1.0})
+        cache.store('b', {'end_mass': 2.0})
+        self.assertEqual(cache.lookup('a'), {'end_mass': 1.0})
+        self.assertEqual(cache.lookup('b'), {'end_mass': 2.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
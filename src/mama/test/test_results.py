@@ -0,0 +1,75 @@
+import unittest
+
+import StringIO
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import results
+from mama.test.fixtures import CoastMission
+
+
+class ResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        print self.logstr.getvalue()
+        pass
+
+    def test_table(self):
+        # per-stage fields have a column per stage
+        table = results.allocate(['launch', 'coast'], 3)
+        self.assertEqual(table.shape, (2,))
+        self.assertEqual(table['end_prop'].shape, (2, 3))
+        self.assertEqual(results.columns(table)[:7],
+                         ['phase', 'beg_MET', 'end_MET', 'beg_mass', 'end_mass', 'end_fuel', 'end_prop_0'])
+
+        table['end_MET'] = [1.0, 31.5]
+        table['fuel_drawn'][0] = [100.0, 0.0, 25.0]
+        output = StringIO.StringIO()
+        results.write_csv(table, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2].split(',')[:3], ['coast', '0.0', '31.5'])
+
+        # binary tables are memory-mapped when loaded
+        path = os.path.join(self.directory, 'results.npy')
+        results.save(table, path)
+        loaded = results.load(path)
+        self.assertTrue(np.all(loaded == table))
+
+    def test_mission(self):
+        # each phase records its results in the mission results table
+        mission = CoastMission()
+        mission.text_log = False
+        mission.run(cache=False)
+
+        table = mission.results
+        self.assertEqual(list(table['phase']), ['coast', 'arrive'])
+        assert_rel_error(self, table['end_MET'][1], 35.0, 0.000001)
+        assert_rel_error(self, table['beg_MET'][1], table['end_MET'][0], 0.000001)
+        assert_rel_error(self, table['end_mass'][1], mission.end_mass, 0.000001)
+        self.assertEqual(mission.logstr.getvalue(), '')
+
+        path = os.path.join(self.directory, 'results.csv')
+        mission.save_results(path)
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
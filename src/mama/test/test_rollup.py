@@ -0,0 +1,152 @@
+import unittest
+
+import StringIO
+import logging
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import rollup
+from mama.subsystem import Subsystem, Equipment, Fluid
+from mama.spacecraft import Spacecraft, Stage
+
+
+def build(payload=5000.0):
+    """ a spacecraft with a habitat and a payload on one stage """
+    habitat = Subsystem()
+    habitat.add('structure', Equipment(8000.0))
+    habitat.structure.radius = 2.0
+    habitat.structure.length = 6.0
+    habitat.add('water', Fluid(1500.0))
+    habitat.water.x = 1.0
+
+    cargo = Subsystem()
+    cargo.x = 6.0
+    cargo.add('payload', Equipment(payload))
+    cargo.payload.radius = 1.5
+    cargo.payload.length = 3.0
+
+    core = Stage()
+    core.add('habitat', habitat)
+    core.add('cargo', cargo)
+
+    spacecraft = Spacecraft()
+    spacecraft.add_stage('core', core)
+    spacecraft.run()
+    return spacecraft
+
+
+class RollupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+        # use an empty cache
+        self.default = rollup.cache
+        rollup.cache = rollup.RollupCache()
+
+    def tearDown(self):
+        rollup.cache = self.default
+        print self.logstr.getvalue()
+        pass
+
+    def test_variants(self):
+        # variants that differ in one subsystem share the other subtrees
+        first = build(5000.0)
+        first.update_mass_properties()
+        self.assertEqual(rollup.cache.stats()['hits'], 0)
+
+        second = build(6000.0)
+        rollup.cache.clear()
+        first.update_mass_properties()
+        second.update_mass_properties()
+        self.assertEqual(second.core.habitat.subtree_hash, first.core.habitat.subtree_hash)
+        self.assertNotEqual(second.core.cargo.subtree_hash, first.core.cargo.subtree_hash)
+        self.assertNotEqual(second.subtree_hash, first.subtree_hash)
+
+        # only the habitat is reused by the second variant
+        stats = rollup.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        assert_rel_error(self, second.wet_mass - first.wet_mass, 1000.0, 0.000001)
+
+    def test_unchanged(self):
+        # an unchanged subtree is not hashed again, a change is picked up
+        spacecraft = build()
+        spacecraft.update_mass_properties()
+        habitat = spacecraft.core.habitat.subtree_hash
+        cargo = spacecraft.core.cargo.subtree_hash
+        wet_mass = spacecraft.wet_mass
+
+        hashes = []
+        item_hash = rollup.item_hash
+        try:
+            rollup.item_hash = lambda *args: hashes.append(args[0]) or item_hash(*args)
+            spacecraft.update_mass_properties()
+            self.assertEqual(hashes, [])
+
+            spacecraft.core.cargo.payload.mass = 6000.0
+            spacecraft.update_mass_properties()
+            self.assertEqual(hashes, ['payload'])
+        finally:
+            rollup.item_hash = item_hash
+
+        self.assertEqual(spacecraft.core.habitat.subtree_hash, habitat)
+        self.assertNotEqual(spacecraft.core.cargo.subtree_hash, cargo)
+        assert_rel_error(self, spacecraft.wet_mass - wet_mass, 1000.0, 0.000001)
+
+        # the wet mass alone is rolled up without the mass properties, and
+        # only the changed subtree is summed again
+        core = spacecraft.core
+        wet_mass, moment = core.wet_mass, core.Mx
+        core.habitat.water.mass = 500.0
+        hashes = []
+        try:
+            rollup.item_hash = lambda *args: hashes.append(args[0]) or item_hash(*args)
+            core.update_wet_mass()
+        finally:
+            rollup.item_hash = item_hash
+        self.assertEqual(sorted(hashes), ['structure', 'water'])
+        assert_rel_error(self, wet_mass - core.wet_mass, 1000.0, 0.000001)
+        self.assertEqual(core.Mx, moment)
+
+        # the wet mass of subtrees rolled up before is found in the cache
+        hits = rollup.cache.stats()['hits']
+        core.habitat.water.mass = 1500.0
+        core.update_wet_mass()
+        self.assertEqual(rollup.cache.stats()['hits'], hits + 3)
+        assert_rel_error(self, core.wet_mass, wet_mass, 0.000001)
+
+        # and the mass properties are still brought up to date afterwards
+        core.habitat.water.mass = 500.0
+        core.update_wet_mass()
+        spacecraft.update_mass_properties()
+        self.assertNotEqual(core.Mx, moment)
+
+        rollup.cache = None
+        other = build(6000.0)
+        other.core.habitat.water.mass = 500.0
+        other.update_mass_properties()
+        assert_rel_error(self, core.Mx, other.core.Mx, 0.000001)
+
+    def test_uncached(self):
+        # the cached roll-up is the same as the full roll-up
+        spacecraft = build()
+        spacecraft.update_mass_properties()
+        spacecraft.update_mass_properties()
+        self.assertTrue(rollup.cache.stats()['hits'] > 0)
+        cached = [spacecraft.wet_mass, spacecraft.Mx, spacecraft.Ioyy] + list(spacecraft.Cg)
+
+        rollup.cache = None
+        spacecraft = build()
+        spacecraft.update_wet_mass()
+        spacecraft.update_mass_properties()
+        uncached = [spacecraft.wet_mass, spacecraft.Mx, spacecraft.Ioyy] + list(spacecraft.Cg)
+        for a, b in zip(cached, uncached):
+            assert_rel_error(self, a, b, 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
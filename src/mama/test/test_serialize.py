@@ -0,0 +1,103 @@
+import unittest
+
+import StringIO
+import logging
+import cPickle as pickle
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import serialize
+from mama.subsystem import Equipment
+from mama.spacecraft import Spacecraft, Stage
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama.test.fixtures import Tank
+
+
+def build():
+    """ a two stage spacecraft """
+    core = Stage()
+    core.add('tank', Tank())
+    core.tank.capacity = 20000.0
+    core.add('structure', Equipment(2000.0))
+
+    drop = Stage()
+    drop.add('tank', Tank())
+    drop.tank.capacity = 10000.0
+
+    spacecraft = Spacecraft()
+    spacecraft.description = 'two stage'
+    spacecraft.add_stage('core', core)
+    spacecraft.add_stage('drop', drop)
+    return spacecraft
+
+
+def evaluate(spacecraft):
+    """ run the spacecraft and return its wet mass """
+    spacecraft.run()
+    return spacecraft.wet_mass
+
+
+class SerializeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_dumps(self):
+        # a serialized spacecraft is rebuilt with the same structure and inputs
+        spacecraft = build()
+        copy = serialize.loads(serialize.dumps(spacecraft))
+        self.assertEqual(copy.description, 'two stage')
+        self.assertEqual([stage.name for stage in copy.stages], ['core', 'drop'])
+        self.assertEqual(copy.drop.tank.capacity, 10000.0)
+        assert_rel_error(self, evaluate(copy), evaluate(spacecraft), 0.000001)
+
+    def test_delta(self):
+        # a case is sent as the inputs that differ from the template
+        template = serialize.definition(build())
+        spacecraft = build()
+        spacecraft.core.tank.capacity = 25000.0
+        spacecraft.core.structure.mass = 2500.0
+        changes = serialize.delta(template, spacecraft)
+        self.assertEqual(changes, {'core.tank.capacity': 25000.0,
+                                   'core.structure.mass': 2500.0})
+        self.assertTrue(len(pickle.dumps(changes, pickle.HIGHEST_PROTOCOL)) < 200)
+
+        copy = serialize.apply(serialize.build(template), changes)
+        self.assertEqual(serialize.delta(template, copy), changes)
+
+    def test_slot(self):
+        # an object only referred to by a slot is reached through the slot
+        LEO = Orbit()
+        LEO.apoapsis = 400
+        LEO.periapsis = 400
+
+        maneuver = Maneuver()
+        maneuver.orbit = LEO
+        template = serialize.definition(maneuver)
+
+        LEO.apoapsis = 500
+        changes = serialize.delta(template, maneuver)
+        self.assertEqual(changes, {'orbit.apoapsis': 500})
+
+        copy = serialize.apply(serialize.build(template), changes)
+        self.assertEqual(copy.orbit.apoapsis, 500)
+
+    def test_run(self):
+        # cases evaluated in a pool of processes
+        cases = [{'core.tank.capacity': capacity} for capacity in (20000.0, 25000.0, 30000.0)]
+        results = serialize.run(build(), cases, evaluate, processes=2)
+        assert_rel_error(self, results[1] - results[0], 5000.0, 0.000001)
+        assert_rel_error(self, results[2] - results[0], 10000.0, 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
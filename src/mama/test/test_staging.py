@@ -0,0 +1,68 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama import staging
+
+
+class StagingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_identical_stages(self):
+        # identical stages share the delta-V equally
+        n, payload_fraction = staging.optimize(9.0, [300, 300, 300], [0.1, 0.1, 0.1])
+        assert_rel_error(self, n[0], np.exp(9.0/(3*300*staging.g)), 0.0001)
+        assert_rel_error(self, n[2], n[0], 0.0001)
+
+    def test_optimum(self):
+        # two stages, compare against a brute force search along the
+        # curve of constant delta-V
+        c1, c2 = 300*staging.g, 450*staging.g
+        e1, e2 = 0.08, 0.12
+        n, payload_fraction = staging.optimize(8.0, [300, 450], [e1, e2])
+        assert_rel_error(self, payload_fraction, 0.072229, 0.0001)
+
+        n1 = np.linspace(1.01, 1/e1 - 0.001, 10001)
+        n2 = np.exp((8.0 - c1*np.log(n1)) / c2)
+        brute = (1 - n1*e1)/(n1*(1 - e1)) * (1 - n2*e2)/(n2*(1 - e2))
+        brute[n2 >= 1/e2] = 0
+        self.assertTrue(brute.max() <= payload_fraction)
+        assert_rel_error(self, brute.max(), payload_fraction, 0.0001)
+
+        # sizing the stages reproduces the payload fraction and the delta-V
+        prop, gross = staging.propellant(1000.0, n, [e1, e2])
+        assert_rel_error(self, 1000.0/gross, payload_fraction, 0.0001)
+        second = 1000.0 + prop[1]/(1 - e2)
+        dV = c1*np.log(gross/(gross - prop[0])) + c2*np.log(second/(second - prop[1]))
+        assert_rel_error(self, dV, 8.0, 0.0001)
+
+    def test_rank(self):
+        # rank candidate engine and structure combinations
+        Isp = np.array([[300, 300], [450, 450], [300, 450], [450, 300]])
+        epsilon = np.array([[0.1, 0.1], [0.1, 0.1], [0.1, 0.1], [0.1, 0.1]])
+        order, payload_fraction = staging.rank(8.0, Isp, epsilon)
+        self.assertEqual(order[0], 1)
+        self.assertEqual(order[-1], 0)
+
+        # delta-V beyond the reach of the stages is infeasible
+        n, payload_fraction = staging.optimize(30.0, [300, 300], [0.1, 0.1])
+        self.assertTrue(np.isnan(payload_fraction))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import StringIO
+import logging
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.timeline import Timeline
+from mama.test.fixtures import DeliveryMission
+
+
+class TimelineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_interpolate(self):
+        # a coast, then a burn of one day that ends with a drop
+        timeline = Timeline()
+        timeline.add(0.0,  1000.0, 500.0, [1.0, 0.0, 0.0])
+        timeline.add(9.0,  1000.0, 500.0, [1.0, 0.0, 0.0])
+        timeline.add(10.0,  800.0, 300.0, [2.0, 0.0, 0.0])
+        timeline.add(10.0,  700.0, 300.0, [3.0, 0.0, 0.0])
+
+        state = timeline.state_at(np.array([-1.0, 5.0, 9.5, 10.0, 20.0]))
+        assert_rel_error(self, state['mass'][0], 1000.0, 0.000001)
+        assert_rel_error(self, state['mass'][1], 1000.0, 0.000001)
+        assert_rel_error(self, state['mass'][2],  900.0, 0.000001)
+        assert_rel_error(self, state['fuel'][2],  400.0, 0.000001)
+        assert_rel_error(self, state['Cg'][2, 0],   1.5, 0.000001)
+
+        # the state after the last sample at the same time
+        assert_rel_error(self, state['mass'][3],  700.0, 0.000001)
+        assert_rel_error(self, state['mass'][4],  700.0, 0.000001)
+        self.assertEqual(state['Cg'].shape, (5, 3))
+
+        # scalar times
+        assert_rel_error(self, float(timeline.state_at(9.5)['mass']), 900.0, 0.000001)
+
+    def test_mission(self):
+        # the cargo is dropped at the end of the coast
+        mission = DeliveryMission()
+        mission.coast.drop_subsystem = 'core.cargo'
+        mission.run(cache=False)
+
+        state = mission.state_at([15.0, 29.999, 30.0, 40.0])
+        assert_rel_error(self, state['mass'][0], 12000.0, 0.000001)
+        assert_rel_error(self, state['mass'][1], 12000.0, 0.000001)
+        assert_rel_error(self, state['mass'][2], 10000.0, 0.000001)
+        assert_rel_error(self, state['mass'][3], mission.end_mass, 0.000001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+
+import StringIO
+import logging
+
+from math import sqrt, pi
+
+import numpy as np
+
+from openmdao.util.testutil import assert_rel_error
+
+from mama.orbit import Orbit
+from mama.maneuver import Maneuver
+from mama import transfer
+
+
+class TransferTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # initialize 'mission' logger
+        self.logger = logging.getLogger('mission')
+        self.logstr = StringIO.StringIO()
+        self.logger.addHandler(logging.StreamHandler(self.logstr))
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        print self.logstr.getvalue()
+        pass
+
+    def test_hohmann(self):
+        # coplanar Hohmann transfer from 300 km LEO to GEO is about 3.89 km/s
+        mu = 398600.4418
+        r1, r2 = 6678.0, 42164.0
+        v1, v2 = sqrt(mu/r1), sqrt(mu/r2)
+        dV, alpha = transfer.hohmann(mu, r1, v1, r2, v2)
+        assert_rel_error(self, dV, 3.893, 0.001)
+
+        # with a plane change from Cape Canaveral, most of the 28.5 degrees
+        # is made at GEO but a little (about 2.2 deg) is made at LEO
+        dV, alpha = transfer.hohmann(mu, r1, v1, r2, v2, np.radians([0, 28.5]))
+        assert_rel_error(self, dV[1], 4.231, 0.001)
+        assert_rel_error(self, alpha[1]*180/pi, 2.2, 0.01)
+
+        # splitting the plane change is better than doing it all at GEO
+        vt2 = transfer.velocity(mu, r2, r1, r2)
+        all_at_GEO = (transfer.velocity(mu, r1, r1, r2) - v1) \
+                   + transfer.combined_burn(vt2, v2, np.radians(28.5))
+        self.assertTrue(dV[1] < all_at_GEO)
+
+    def test_bielliptic(self):
+        # for a radius ratio above 15.58 a bi-elliptic transfer beats a
+        # Hohmann transfer if the intermediate apoapsis is large enough
+        mu = 398600.4418
+        r1 = 6678.0
+        r2 = 20*r1
+        v1, v2 = sqrt(mu/r1), sqrt(mu/r2)
+        hohmann, alpha = transfer.hohmann(mu, r1, v1, r2, v2)
+        bielliptic, rb = transfer.bielliptic(mu, r1, v1, r2, v2, 0.0, 200*r1)
+        self.assertTrue(bielliptic < hohmann)
+
+        # and with a large plane change even for LEO to GEO
+        r2 = 42164.0
+        v2 = sqrt(mu/r2)
+        hohmann, alpha = transfer.hohmann(mu, r1, v1, r2, v2, np.radians(60))
+        bielliptic, rb = transfer.bielliptic(mu, r1, v1, r2, v2, np.radians(60))
+        self.assertTrue(bielliptic < hohmann)
+        self.assertTrue(rb > r2)
+
+    def test_maneuvers(self):
+        LEO = Orbit()
+        LEO.body = 'Earth'
+        LEO.apoapsis = 300
+        LEO.periapsis = 300
+        LEO.inclination = 28.5
+
+        GEO = Orbit()
+        GEO.body = 'Earth'
+        GEO.apoapsis = 35786
+        GEO.periapsis = 35786
+        GEO.inclination = 0
+
+        GTO = Maneuver()
+        GTO.orbit = LEO
+        GTO.final_orbit = GEO
+        GTO.maneuver_type = 'Hohmann Transfer'
+        hohmann = GTO.calculate_dV()
+        assert_rel_error(self, hohmann, 4.23, 0.005)
+        assert_rel_error(self, GTO.plane_change, 2.2, 0.05)
+
+        # limited to GEO the bi-elliptic transfer makes the whole plane change at GEO
+        GTO.maneuver_type = 'Bi-elliptic Transfer'
+        GTO.max_apoapsis = 35786
+        bielliptic = GTO.calculate_dV()
+        assert_rel_error(self, GTO.intermediate_apoapsis, 35786, 0.0001)
+        assert_rel_error(self, bielliptic, 4.257, 0.005)
+        self.assertTrue(bielliptic > hohmann)
+
+        # capture into Mars 250 x 33840 km orbit, changing inclination by
+        # 30 deg is cheap when most of it is made at apoapsis
+        approach = Orbit()
+        approach.body = 'Mars'
+        approach.inclination = 0
+
+        MEO = Orbit()
+        MEO.body = 'Mars'
+        MEO.apoapsis = 33840
+        MEO.periapsis = 250
+        MEO.inclination = 30
+
+        MOC = Maneuver()
+        MOC.orbit = MEO
+        MOC.maneuver_type = 'Capture at Periapsis'
+        MOC.C3 = 5.31**2
+        capture = -MOC.calculate_dV()
+
+        MOC.orbit = approach
+        MOC.final_orbit = MEO
+        MOC.maneuver_type = 'Capture with Plane Change'
+        dV = MOC.calculate_dV()
+        self.assertTrue(dV > capture)
+        self.assertTrue(dV < capture + 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+   timeline.py
+
+   Time-indexed spacecraft state over a mission.
+
+   As a mission runs, the state of the spacecraft (wet mass, fuel and Cg)
+   is sampled at the beginning of each phase, at the start and end of the
+   phase's burn and at the end of the phase (after any fuel or propellant
+   is expended and mass dropped or picked up).  Burns run up to the end of
+   the phase, for their burn time (or for the whole phase if it is shorter,
+   phases with no duration burn instantaneously), so that the mass falls
+   linearly during the burn as it does for a constant thrust.
+
+   The fuel on each stage is kept with each sample, for the event
+   triggers of mission phases (see events).
+
+   The state at any mission elapsed time is found by bisection of the
+   sample times and linear interpolation between the samples around it.
+   Where several samples have the same time (such as at the end of a
+   phase) the state after the last of them is used.  Before the beginning
+   and after the end of the mission the state is the first or last sample.
+"""
+
+import numpy as np
+
+
+class Timeline(object):
+    """ samples of the spacecraft state at mission elapsed times (days)
+    """
+
+    def __init__(self):
+        self._samples = []
+        self._stage_fuel = []
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, MET, mass, fuel, Cg, stage_fuel=None):
+        """ add a sample of the spacecraft state (samples must be added in
+            time order), with the fuel on each stage (if not given, all of
+            the fuel is taken to be on one stage)
+        """
+        self._samples.append((MET, mass, fuel, Cg[0], Cg[1], Cg[2]))
+        self._stage_fuel.append(list(stage_fuel) if stage_fuel is not None else [fuel])
+        self._arrays = None
+
+    def snapshot(self, spacecraft):
+        """ the current mass, fuel, Cg and fuel on each stage of the spacecraft
+            (with a resource ledger, the mass is that of the ledger but the Cg
+            is still rolled up from the subsystem tree, so it does not move
+            for changes that are only posted to the ledger: crew consumables
+            and fixed mass dropped or picked up)
+        """
+        spacecraft.update_mass_properties()
+        spacecraft.update_wet_mass()
+        return (spacecraft.wet_mass, spacecraft.get_fuel(), list(spacecraft.Cg),
+                [stage.get_fuel() for stage in spacecraft.stages])
+
+    def sample(self, MET, spacecraft):
+        """ add a sample of the current state of the spacecraft
+        """
+        self.add(MET, *self.snapshot(spacecraft))
+
+    def arrays(self):
+        """ sample times, mass, fuel and Cg (N, 3) as arrays
+        """
+        if self._arrays is None:
+            samples = np.array(self._samples, dtype=float).reshape(-1, 6)
+            self._arrays = (samples[:, 0], samples[:, 1], samples[:, 2], samples[:, 3:])
+        return self._arrays
+
+    def stage_fuel(self):
+        """ fuel on each stage at each sample time (N, stages)
+        """
+        return np.array(self._stage_fuel, dtype=float).reshape(len(self._samples), -1)
+
+    def state_at(self, MET):
+        """ mass, fuel and Cg of the spacecraft at the mission elapsed time(s)
+            returns a dict of arrays (of the shape of MET, with Cg (..., 3))
+        """
+        times, mass, fuel, Cg = self.arrays()
+        if len(times) < 1:
+            raise Exception('the mission has not been run')
+
+        MET = np.asarray(MET, dtype=float)
+        if len(times) < 2:
+            i = np.zeros(MET.shape, dtype=int)
+            j = i
+            fraction = np.zeros(MET.shape)
+        else:
+            # sample at or before each time, and the one after it
+            i = np.clip(np.searchsorted(times, MET, side='right') - 1, 0, len(times) - 1)
+            j = np.minimum(i + 1, len(times) - 1)
+            span = times[j] - times[i]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fraction = np.where(span > 0, (MET - times[i]) / span, 0.0)
+            fraction = np.clip(fraction, 0.0, 1.0)
+
+        return {
+            'MET':  MET,
+            'mass': mass[i] + fraction*(mass[j] - mass[i]),
+            'fuel': fuel[i] + fraction*(fuel[j] - fuel[i]),
+            'Cg':   Cg[i] + fraction[..., np.newaxis]*(Cg[j] - Cg[i]),
+        }
@@ -0,0 +1,123 @@
+"""
+   transfer.py
+
+   Orbit to orbit transfers with plane change.
+
+   Hohmann and bi-elliptic transfers between two orbits about the same
+   body, and capture from a hyperbolic approach with a plane change.
+   The split of the plane change between burns and the intermediate
+   apoapsis of the bi-elliptic transfer are found by golden section
+   search, run for whole arrays of cases at once.
+
+   Radii are in km, velocities in km/s and angles in radians.
+"""
+
+from math import sqrt
+
+import numpy as np
+
+
+ITERATIONS = 60  # golden section iterations
+
+invphi = (sqrt(5) - 1) / 2
+
+
+def golden_section(f, a, b, iterations=ITERATIONS):
+    """ minimize f over the intervals [a, b], where a and b are arrays of
+        independent intervals and f is evaluated elementwise on arrays
+        returns the location and value of the minima
+    """
+    a, b = [np.array(x, dtype=float) for x in np.broadcast_arrays(a, b)]
+    c = b - invphi*(b - a)
+    d = a + invphi*(b - a)
+    fc = f(c)
+    fd = f(d)
+    for i in range(iterations):
+        left = fc < fd
+        # minimum is in [a, d] where left, else in [c, b]
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        x = np.where(left, b - invphi*(b - a), a + invphi*(b - a))
+        fx = f(x)
+        c, d, fc, fd = (np.where(left, x, d), np.where(left, c, x),
+                        np.where(left, fx, fd), np.where(left, fc, fx))
+    x = (a + b) / 2
+    return x, f(x)
+
+
+def velocity(mu, r, r_p, r_a):
+    """ velocity at radius r on the orbit with the given periapsis
+        and apoapsis radius (vis-viva)
+    """
+    return np.sqrt(mu * (2/r - 2/(r_p + r_a)))
+
+
+def combined_burn(v1, v2, angle):
+    """ delta-V to change velocity magnitude from v1 to v2 while turning
+        through the specified angle
+    """
+    return np.sqrt(np.maximum(v1**2 + v2**2 - 2*v1*v2*np.cos(angle), 0.0))
+
+
+def hohmann(mu, r1, v1, r2, v2, di=0.0):
+    """ Hohmann transfer from radius r1 (at velocity v1 on the initial
+        orbit) to radius r2 (at velocity v2 on the final orbit) with
+        a plane change di split optimally between the two burns
+
+        returns total delta-V and the plane change made at the first burn
+    """
+    r1, v1, r2, v2, di = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                               for x in (r1, v1, r2, v2, di)])
+    vt1 = velocity(mu, r1, r1, r2)
+    vt2 = velocity(mu, r2, r1, r2)
+
+    def total(alpha):
+        return combined_burn(v1, vt1, alpha) + combined_burn(vt2, v2, di - alpha)
+
+    alpha, dV = golden_section(total, np.zeros_like(di), di)
+    return dV, alpha
+
+
+def bielliptic(mu, r1, v1, r2, v2, di=0.0, rb_max=None):
+    """ bi-elliptic transfer from radius r1 (at velocity v1 on the initial
+        orbit) to radius r2 (at velocity v2 on the final orbit) through an
+        intermediate apoapsis rb, with the plane change di made at rb where
+        the velocity is lowest
+
+        rb is optimized between max(r1, r2) and rb_max (defaults to 100 r2)
+        returns total delta-V and the intermediate apoapsis radius
+    """
+    r1, v1, r2, v2, di = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                               for x in (r1, v1, r2, v2, di)])
+    if rb_max is None:
+        rb_max = 100 * r2
+
+    def total(rb):
+        dV1 = np.abs(velocity(mu, r1, r1, rb) - v1)
+        dV2 = combined_burn(velocity(mu, rb, r1, rb), velocity(mu, rb, r2, rb), di)
+        dV3 = np.abs(v2 - velocity(mu, r2, r2, rb))
+        return dV1 + dV2 + dV3
+
+    rb, dV = golden_section(total, np.maximum(r1, r2), rb_max)
+    return dV, rb
+
+
+def capture_plane_change(mu, r_p, r_a, C3, di):
+    """ capture from a hyperbolic approach with the specified C3 into the
+        orbit with periapsis radius r_p and apoapsis radius r_a, with the
+        plane change di split optimally between the capture burn at
+        periapsis and a burn at apoapsis
+
+        returns total delta-V and the plane change made at periapsis
+    """
+    r_p, r_a, C3, di = np.broadcast_arrays(*[np.asarray(x, dtype=float)
+                                             for x in (r_p, r_a, C3, di)])
+    Vh = np.sqrt(C3 + 2*mu/r_p)
+    Vp = velocity(mu, r_p, r_p, r_a)
+    Va = velocity(mu, r_a, r_p, r_a)
+
+    def total(alpha):
+        return combined_burn(Vh, Vp, alpha) + combined_burn(Va, Va, di - alpha)
+
+    alpha, dV = golden_section(total, np.zeros_like(di), di)
+    return dV, alpha